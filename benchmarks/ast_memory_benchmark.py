@@ -0,0 +1,55 @@
+import timeit
+
+from benchmarks.programs import generate_program
+from benchmarks.token_memory_benchmark import peak_memory
+from compiler.ast import Expression
+from compiler.ast_arena import AstArena
+from compiler.builtin_type import builtin_types
+from compiler.ir_generator import generate_ir
+from compiler.parser import parse
+from compiler.token import Tokens
+from compiler.tokenizer import tokenize
+from compiler.type_checker import typecheck
+
+
+def to_arena(expression: Expression) -> AstArena:
+    arena = AstArena()
+    arena.add(expression)
+    return arena
+
+
+def main() -> None:
+    """Compares the memory of the dataclass AST against the arena and
+    times typecheck and IR generation over both."""
+    source_code = generate_program(3_000)
+    tokens = list(tokenize(source_code))
+
+    # Peak memory of building each from the same token list
+    ast_bytes = peak_memory(lambda: parse(Tokens(tokens)))
+    expression = parse(Tokens(tokens))
+    arena_bytes = peak_memory(lambda: to_arena(expression))
+    nodes = len(to_arena(expression))
+
+    print(f"{nodes:,} nodes")
+    print(f"dataclass AST: {ast_bytes / 1e6:8.2f} MB ({ast_bytes / nodes:.0f} B/node)")
+    print(
+        f"AstArena:      {arena_bytes / 1e6:8.2f} MB ({arena_bytes / nodes:.0f} B/node)"
+    )
+
+    arena = to_arena(expression)
+    typecheck(expression)
+
+    for name, root in [("dataclass AST", expression), ("AstArena view", arena.view(0))]:
+        seconds = [
+            min(timeit.repeat(lambda: typecheck(root), number=1, repeat=3)),
+            min(
+                timeit.repeat(
+                    lambda: generate_ir(builtin_types, root), number=1, repeat=3
+                )
+            ),
+        ]
+        print(f"{name}: typecheck {seconds[0]:.3f} s, generate_ir {seconds[1]:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
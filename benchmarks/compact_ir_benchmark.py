@@ -0,0 +1,58 @@
+import timeit
+import tracemalloc
+from typing import Callable, TypeVar
+
+from benchmarks.programs import generate_program
+from compiler.assembly_generator import generate_assembly
+from compiler.builtin_type import builtin_types
+from compiler.compact_ir import CompactIr
+from compiler.ir_generator import generate_ir
+from compiler.parser import parse
+from compiler.token import Tokens
+from compiler.tokenizer import tokenize
+from compiler.type_checker import typecheck
+
+T = TypeVar("T")
+
+
+def retained_memory(f: Callable[[], T]) -> tuple[T, int]:
+    """Returns the result of `f` and the memory it still holds."""
+    tracemalloc.start()
+    result = f()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def main() -> None:
+    """Compares the memory of the IR as objects and as a CompactIr,
+    and times generating it and the assembly from it."""
+    expression = parse(Tokens(tokenize(generate_program(20_000))))
+    typecheck(expression)
+
+    instructions, objects_bytes = retained_memory(
+        lambda: generate_ir(builtin_types, expression)
+    )
+    code, compact_bytes = retained_memory(lambda: CompactIr(instructions))
+    n = len(instructions)
+
+    print(f"{n:,} instructions")
+    print(
+        f"Instruction objects: {objects_bytes / 1e6:6.2f} MB ({objects_bytes / n:.0f} B)"
+    )
+    print(
+        f"CompactIr:           {compact_bytes / 1e6:6.2f} MB ({compact_bytes / n:.0f} B)"
+    )
+
+    for name, phase in [
+        ("generate IR", lambda: generate_ir(builtin_types, expression)),
+        ("encode CompactIr", lambda: CompactIr(instructions)),
+        ("asm from objects", lambda: generate_assembly(instructions)),
+        ("asm from CompactIr", lambda: generate_assembly(code)),
+    ]:
+        seconds = min(timeit.repeat(phase, number=1, repeat=3))
+        print(f"{name:20} {seconds:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
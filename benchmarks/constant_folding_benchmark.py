@@ -0,0 +1,72 @@
+import os
+import subprocess
+import tempfile
+import timeit
+
+from compiler.assembler import assemble
+from compiler.assembly_generator import generate_assembly
+from compiler.ast import Expression
+from compiler.builtin_type import builtin_types
+from compiler.constant_folder import fold_constants
+from compiler.ir_generator import generate_ir
+from compiler.parser import parse
+from compiler.token import Tokens
+from compiler.tokenizer import tokenize
+from compiler.type_checker import typecheck
+from tests.assembler_test import cases
+
+# A loop whose body has constant subexpressions, like code with
+# configuration values written out
+loop_program = """
+var i = 0;
+var s = 0;
+while i < 100000000 and not (1 > 2) do {
+    s = s + i * (60 * 60 * 24) % (1000 + 7) - (2 * 3 * 7);
+    if 1 < 2 then i = i + 1 else i = i + 2;
+}
+s
+"""
+
+
+def typechecked(source_code: str) -> Expression:
+    expression = parse(Tokens(tokenize(source_code)))
+    typecheck(expression)
+    return expression
+
+
+def folded(source_code: str) -> Expression:
+    return fold_constants(typechecked(source_code)).expression
+
+
+def main() -> None:
+    """Counts the IR of the assembler test programs with and without
+    constant folding, and times a compiled loop with both."""
+    corpus = [source_code for source_code, _ in cases()]
+
+    for name, front_end in [("unfolded", typechecked), ("folded", folded)]:
+        count = sum(
+            len(generate_ir(builtin_types, front_end(source_code)))
+            for source_code in corpus
+        )
+        print(f"{name:9} {len(corpus)} programs, {count} IR instructions")
+
+    with tempfile.TemporaryDirectory(prefix="compiler_") as workdir:
+        for name, front_end in [("unfolded", typechecked), ("folded", folded)]:
+            program_path = os.path.join(workdir, name)
+            instructions = generate_ir(builtin_types, front_end(loop_program))
+            assemble(generate_assembly(instructions), program_path)
+
+            seconds = min(
+                timeit.repeat(
+                    lambda: subprocess.run(program_path, stdout=subprocess.DEVNULL),
+                    number=1,
+                    repeat=5,
+                )
+            )
+            print(
+                f"{name:9} loop: {len(instructions)} IR instructions, run {seconds:.3f} s"
+            )
+
+
+if __name__ == "__main__":
+    main()
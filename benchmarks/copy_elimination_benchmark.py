@@ -0,0 +1,82 @@
+import os
+import subprocess
+import tempfile
+import timeit
+
+from compiler.assembler import assemble
+from compiler.assembly_generator import generate_assembly
+from compiler.builtin_type import builtin_types
+from compiler.ir import Copy, Instruction
+from compiler.ir_generator import generate_ir
+from compiler.parser import parse
+from compiler.token import Tokens
+from compiler.tokenizer import tokenize
+from compiler.type_checker import typecheck
+from tests.assembler_test import cases
+
+loop_program = """
+var i = 0;
+var s = 0;
+while i < 100000000 do {
+    s = s + i * 3;
+    i = i + 1;
+}
+s
+"""
+
+
+def instructions_of(source_code: str) -> list[Instruction]:
+    expression = parse(Tokens(tokenize(source_code)))
+    typecheck(expression)
+    return generate_ir(builtin_types, expression)
+
+
+def run_time(programs: list[str], workdir: str) -> float:
+    """Returns the time to run the compiled programs once each."""
+    for i, instructions in enumerate(programs):
+        assemble(instructions, os.path.join(workdir, f"p{i}"))
+
+    def run() -> None:
+        for i in range(len(programs)):
+            subprocess.run(os.path.join(workdir, f"p{i}"), stdout=subprocess.DEVNULL)
+
+    return min(timeit.repeat(run, number=1, repeat=5))
+
+
+def main() -> None:
+    """Counts the IR and assembly of the assembler test programs,
+    and times compiling and running them and a loop."""
+    corpus = [source_code for source_code, _ in cases()]
+    ir_code = [instructions_of(source_code) for source_code in corpus]
+    asm_code = [generate_assembly(instructions) for instructions in ir_code]
+
+    instructions = sum(len(instructions) for instructions in ir_code)
+    copies = sum(
+        isinstance(instruction, Copy)
+        for instructions in ir_code
+        for instruction in instructions
+    )
+    asm_lines = sum(asm.count("\n") for asm in asm_code)
+
+    print(f"{len(corpus)} programs")
+    print(f"IR instructions:   {instructions}")
+    print(f"Copy instructions: {copies}")
+    print(f"Assembly lines:    {asm_lines}")
+
+    def compile_corpus() -> None:
+        for source_code in corpus:
+            generate_assembly(instructions_of(source_code))
+
+    seconds = min(timeit.repeat(compile_corpus, number=1, repeat=5))
+    print(f"compile corpus     {seconds:.3f} s")
+
+    with tempfile.TemporaryDirectory(prefix="compiler_") as workdir:
+        seconds = run_time(asm_code, workdir)
+        print(f"run corpus         {seconds:.3f} s")
+
+        seconds = run_time([generate_assembly(instructions_of(loop_program))], workdir)
+        print(f"run loop           {seconds:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import timeit
+from typing import Any, Callable
+
+import compiler.ast as ast
+import compiler.ir as ir
+from benchmarks.programs import generate_program
+from compiler.analyzer import create_state
+from compiler.assembly_generator import generate_assembly
+from compiler.builtin_type import builtin_types
+from compiler.ir_generator import generate_ir
+from compiler.parser import parse
+from compiler.token import Tokens
+from compiler.tokenizer import tokenize
+from compiler.type_checker import typecheck
+
+
+def nodes_of(expression: ast.Expression) -> list[ast.Expression]:
+    nodes = []
+    stack: list[object] = [expression]
+
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.Expression):
+            nodes.append(node)
+            stack.extend(getattr(node, name) for name in node.__dataclass_fields__)
+        elif isinstance(node, list):
+            stack.extend(node)
+
+    return nodes
+
+
+# The class patterns in the order the phases matched them before
+def match_node(node: ast.Expression) -> int:
+    match node:
+        case ast.Literal():
+            return 0
+        case ast.BinaryOp():
+            return 1
+        case ast.FunctionExpression():
+            return 2
+        case ast.IfExpression():
+            return 3
+        case ast.VariableDeclarationExpression():
+            return 4
+        case ast.Identifier():
+            return 5
+        case ast.BlockExpression():
+            return 6
+        case ast.WhileExpression():
+            return 7
+        case ast.BreakExpression() | ast.ContinueExpression():
+            return 8
+        case _:
+            return -1
+
+
+def match_instruction(insn: ir.Instruction) -> int:
+    match insn:
+        case ir.Label():
+            return 0
+        case ir.LoadIntConst():
+            return 1
+        case ir.LoadBoolConst():
+            return 2
+        case ir.Copy():
+            return 3
+        case ir.Jump():
+            return 4
+        case ir.Call():
+            return 5
+        case ir.CondJump():
+            return 6
+        case ir.Return():
+            return 7
+        case _:
+            return -1
+
+
+def dispatch_time(objects: list[Any], dispatch: Callable[[Any], int]) -> float:
+    return min(
+        timeit.repeat(lambda: [dispatch(o) for o in objects], number=1, repeat=7)
+    )
+
+
+def main() -> None:
+    """Times each phase, and the dispatch on node or instruction class
+    alone: a chain of class patterns against a dict lookup."""
+    tokens = list(tokenize(generate_program(3_000)))
+    expression = parse(Tokens(tokens))
+    typecheck(expression)
+    instructions = generate_ir(builtin_types, expression)
+
+    for name, phase in [
+        ("typecheck", lambda: typecheck(expression)),
+        ("generate IR", lambda: generate_ir(builtin_types, expression)),
+        ("create_state", lambda: create_state(instructions)),
+        ("generate asm", lambda: generate_assembly(instructions)),
+    ]:
+        seconds = min(timeit.repeat(phase, number=1, repeat=5))
+        print(f"{name:12} {seconds:.4f} s")
+
+    nodes = nodes_of(expression)
+    node_table = {cls: i for i, cls in enumerate(ast.Expression.__subclasses__())}
+    insn_table = {cls: i for i, cls in enumerate(ir.Instruction.__subclasses__())}
+
+    dispatches: list[tuple[str, list[Any], Callable[[Any], int], dict[type, int]]] = [
+        ("AST nodes", nodes, match_node, node_table),
+        ("instructions", instructions, match_instruction, insn_table),
+    ]
+
+    for name, objects, chain, table in dispatches:
+        match_seconds = dispatch_time(objects, chain)
+        dict_seconds = dispatch_time(objects, lambda o: table[type(o)])
+        print(
+            f"{len(objects):,} {name}: match {match_seconds * 1e9 / len(objects):.0f} ns, "
+            f"dict {dict_seconds * 1e9 / len(objects):.0f} ns per dispatch"
+        )
+
+
+if __name__ == "__main__":
+    main()
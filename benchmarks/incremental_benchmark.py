@@ -0,0 +1,36 @@
+import statistics
+import time
+
+from benchmarks.programs import generate_program
+from compiler.incremental import Edit, compile_source, recompile
+
+
+def main() -> None:
+    """Reports the latency of small edits to a 50k-line program,
+    compared with compiling it from scratch."""
+    source_code = generate_program(33_400)
+    lines = source_code.count("\n") + 1
+
+    start = time.perf_counter()
+    compilation = compile_source(source_code)
+    full_seconds = time.perf_counter() - start
+
+    # Change a literal in the middle of the program back and forth
+    offset = source_code.index(" * 2 ", len(source_code) // 2) + 3
+    latencies = []
+
+    for i in range(20):
+        edit = Edit(offset, 1, "3" if i % 2 == 0 else "2")
+
+        start = time.perf_counter()
+        recompile(compilation, edit)
+        latencies.append(time.perf_counter() - start)
+
+    assert compilation.diagnostics == []
+
+    print(f"{lines} lines, full compile in {full_seconds:.3f} s")
+    print(f"edit: median {statistics.median(latencies) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import timeit
+
+from benchmarks.programs import generate_program
+from compiler.builtin_type import builtin_types
+from compiler.compact_ir import CompactIr
+from compiler.ir import Instruction
+from compiler.ir_generator import generate_ir
+from compiler.ir_serialization import (
+    dump_binary_ir,
+    format_ir,
+    load_binary_ir,
+    parse_ir,
+)
+from compiler.parser import parse
+from compiler.token import Tokens
+from compiler.tokenizer import tokenize
+from compiler.type_checker import typecheck
+
+
+def main() -> None:
+    """Compares the time to get the IR of a program from its source code,
+    from the textual IR and from the binary IR."""
+    source_code = generate_program(20_000)
+
+    def front_end() -> list[Instruction]:
+        expression = parse(Tokens(tokenize(source_code)))
+        typecheck(expression)
+        return generate_ir(builtin_types, expression)
+
+    instructions = front_end()
+    text = format_ir(instructions)
+    data = dump_binary_ir(CompactIr(instructions))
+
+    print(f"{len(instructions):,} instructions")
+    print(f"Textual IR: {len(text) / 1e6:.2f} MB, binary IR: {len(data) / 1e6:.2f} MB")
+
+    for name, phase in [
+        ("front end", front_end),
+        ("parse textual IR", lambda: parse_ir(text)),
+        ("load binary IR", lambda: load_binary_ir(data)),
+        ("format textual IR", lambda: format_ir(instructions)),
+        ("dump binary IR", lambda: dump_binary_ir(CompactIr(instructions))),
+    ]:
+        seconds = min(timeit.repeat(phase, number=1, repeat=3))
+        print(f"{name:20} {seconds:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import os
+import subprocess
+import tempfile
+import timeit
+
+from compiler.assembler import assemble
+from compiler.assembly_generator import generate_assembly
+from compiler.builtin_type import builtin_types
+from compiler.ir import Instruction
+from compiler.ir_generator import generate_ir
+from compiler.ir_simplifier import simplify_ir
+from compiler.parser import parse
+from compiler.token import Tokens
+from compiler.tokenizer import tokenize
+from compiler.type_checker import typecheck
+from tests.assembler_test import cases
+
+# A loop whose body has identities and chains of constants that only
+# show up in the IR, like code generated from templates
+loop_program = """
+var i = 0;
+var s = 0;
+var k = read_int();
+while i < 100000000 do {
+    s = s + (i * 1 + 0) + 1 + 2 + 3 + k * 0 - (k - k);
+    i = - - i + 1;
+}
+s
+"""
+
+
+def instructions_of(source_code: str) -> list[Instruction]:
+    expression = parse(Tokens(tokenize(source_code)))
+    typecheck(expression)
+    return generate_ir(builtin_types, expression)
+
+
+def simplified(source_code: str) -> list[Instruction]:
+    return simplify_ir(instructions_of(source_code)).instructions
+
+
+def main() -> None:
+    """Counts the IR of the assembler test programs with and without the
+    simplifier, with the hits of each rule, and times a compiled loop with
+    both."""
+    corpus = [instructions_of(source_code) for source_code, _ in cases()]
+    count = sum(len(instructions) for instructions in corpus)
+    print(f"original   {len(corpus)} programs, {count} IR instructions")
+
+    results = [simplify_ir(instructions) for instructions in corpus]
+    count = sum(len(result.instructions) for result in results)
+    passes = max(result.passes for result in results)
+    print(f"simplified {len(corpus)} programs, {count} IR instructions")
+    print(f"at most {passes} passes per program")
+
+    for name in results[0].rule_hits:
+        hits = sum(result.rule_hits[name] for result in results)
+        print(f"  {name:17} {hits}")
+
+    seconds = min(
+        timeit.repeat(
+            lambda: [simplify_ir(instructions) for instructions in corpus],
+            number=1,
+            repeat=5,
+        )
+    )
+    print(f"simplifying the corpus takes {seconds * 1000:.1f} ms")
+
+    with tempfile.TemporaryDirectory(prefix="compiler_") as workdir:
+        for name, ir_of in [("original", instructions_of), ("simplified", simplified)]:
+            program_path = os.path.join(workdir, name)
+            instructions = ir_of(loop_program)
+            assemble(generate_assembly(instructions), program_path)
+
+            seconds = min(
+                timeit.repeat(
+                    lambda: subprocess.run(
+                        program_path, input=b"7\n", stdout=subprocess.DEVNULL
+                    ),
+                    number=1,
+                    repeat=5,
+                )
+            )
+            print(
+                f"{name:10} loop: {len(instructions)} IR instructions, run {seconds:.3f} s"
+            )
+
+
+if __name__ == "__main__":
+    main()
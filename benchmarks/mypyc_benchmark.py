@@ -0,0 +1,110 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.programs import generate_program
+
+root = Path(__file__).parent.parent
+
+phases = ["tokenize", "parse", "typecheck"]
+
+# Times each front end phase in the process of one build
+front_end = """
+import sys, timeit
+from compiler.parser import parse
+from compiler.token import Tokens
+from compiler.tokenizer import tokenize
+from compiler.type_checker import typecheck
+
+source_code = open(sys.argv[1]).read()
+tokens = list(tokenize(source_code))
+expression = parse(Tokens(tokens))
+
+for phase in [
+    lambda: tokenize(source_code),
+    lambda: parse(Tokens(tokens)),
+    lambda: typecheck(expression),
+]:
+    print(min(timeit.repeat(phase, number=1, repeat=5)))
+"""
+
+
+def run(source_dir: Path, *args: str) -> str:
+    return subprocess.run(
+        [sys.executable, *args],
+        env={**os.environ, "PYTHONPATH": str(source_dir)},
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+
+def time_asm(source_dir: Path, source_file: Path) -> float:
+    times = []
+
+    for _ in range(3):
+        start = time.perf_counter()
+        run(source_dir, "-m", "compiler", "asm", str(source_file))
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def main() -> None:
+    """Compares the pure Python and the mypyc compiled compiler. Both
+    builds are made in temporary copies of the sources, so an existing
+    compiled build in src is not used."""
+    lines = 3_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        pure_dir = Path(directory) / "pure"
+        compiled_dir = Path(directory) / "compiled"
+
+        for source_dir in [pure_dir, compiled_dir]:
+            shutil.copytree(
+                root / "src",
+                source_dir,
+                ignore=shutil.ignore_patterns("__pycache__", "build", "*.so"),
+            )
+
+        subprocess.run(
+            [root / "build_mypyc.sh"],
+            env={
+                **os.environ,
+                "SOURCE_DIR": str(compiled_dir),
+                "PYTHON": sys.executable,
+            },
+            check=True,
+            capture_output=True,
+        )
+
+        source_file = Path(directory) / "program.src"
+        source_file.write_text(generate_program(lines))
+
+        builds = [("pure Python", pure_dir), ("mypyc", compiled_dir)]
+        results: dict[str, list[float]] = {}
+
+        for name, source_dir in builds:
+            output = run(source_dir, "-c", front_end, str(source_file))
+            results[name] = [float(line) for line in output.split()]
+            results[name].append(time_asm(source_dir, source_file))
+
+    print(f"{lines} lines, seconds (lines/s)")
+    print(" " * 12 + "".join(f"{phase:>22}" for phase in [*phases, "asm end to end"]))
+
+    for name, seconds in results.items():
+        print(
+            f"{name:12}"
+            + "".join(f"{f'{s:.3f} ({lines / s:,.0f})':>22}" for s in seconds)
+        )
+
+    speedups = [p / c for p, c in zip(results["pure Python"], results["mypyc"])]
+    print(f"{'speedup':12}" + "".join(f"{f'{s:.2f}x':>22}" for s in speedups))
+
+
+if __name__ == "__main__":
+    main()
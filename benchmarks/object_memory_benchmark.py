@@ -0,0 +1,99 @@
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.programs import generate_program
+
+root = Path(__file__).parent.parent
+
+# The modules whose dataclasses are slotted
+slotted_modules = ["token.py", "location.py", "ast.py", "ir.py"]
+
+# Prints the bytes per token, per AST node and per IR instruction
+measure = """
+import sys, tracemalloc
+from compiler.ast import Expression
+from compiler.builtin_type import builtin_types
+from compiler.ir_generator import generate_ir
+from compiler.parser import parse
+from compiler.token import Tokens
+from compiler.tokenizer import tokenize
+from compiler.type_checker import typecheck
+
+source_code = open(sys.argv[1]).read()
+
+def traced(f):
+    tracemalloc.start()
+    result = f()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+tokens, token_bytes = traced(lambda: list(tokenize(source_code)))
+expression, ast_bytes = traced(lambda: parse(Tokens(tokens)))
+typecheck(expression)
+instructions, ir_bytes = traced(lambda: generate_ir(builtin_types, expression))
+
+nodes = 0
+stack: list[object] = [expression]
+while stack:
+    node = stack.pop()
+    if isinstance(node, Expression):
+        nodes += 1
+        stack.extend(getattr(node, name) for name in node.__dataclass_fields__)
+    elif isinstance(node, list):
+        stack.extend(node)
+
+print(token_bytes / len(tokens), ast_bytes / nodes, ir_bytes / len(instructions))
+"""
+
+
+def bytes_per_object(source_dir: Path, source_file: Path) -> list[float]:
+    output = subprocess.run(
+        [sys.executable, "-c", measure, str(source_file)],
+        env={**os.environ, "PYTHONPATH": str(source_dir)},
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return [float(n) for n in output.split()]
+
+
+def main() -> None:
+    """Compares the bytes per token, AST node and IR instruction of the
+    slotted dataclasses against the same classes with per-instance dicts.
+    The size of an object includes what it owns, such as its location."""
+    lines = 3_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        unslotted_dir = Path(directory) / "unslotted"
+        shutil.copytree(
+            root / "src",
+            unslotted_dir,
+            ignore=shutil.ignore_patterns("__pycache__", "build", "*.so"),
+        )
+        for module in slotted_modules:
+            path = unslotted_dir / "compiler" / module
+            path.write_text(re.sub(r"slots=True", "slots=False", path.read_text()))
+
+        source_file = Path(directory) / "program.src"
+        source_file.write_text(generate_program(lines))
+
+        results = {
+            "dict": bytes_per_object(unslotted_dir, source_file),
+            "__slots__": bytes_per_object(root / "src", source_file),
+        }
+
+    print(f"{lines} lines, bytes per object")
+    print(" " * 12 + "".join(f"{name:>16}" for name in ["token", "AST node", "IR"]))
+
+    for name, sizes in results.items():
+        print(f"{name:12}" + "".join(f"{size:16.0f}" for size in sizes))
+
+
+if __name__ == "__main__":
+    main()
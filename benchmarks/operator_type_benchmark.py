@@ -0,0 +1,32 @@
+import timeit
+
+from benchmarks.programs import generate_program
+from compiler.parser import parse
+from compiler.token import Tokens
+from compiler.tokenizer import tokenize
+from compiler.type import Bool, Int
+from compiler.type_checker import binary_operator_type, function_type, typecheck
+
+
+def main() -> None:
+    """Reports the time to find the result type of operators and built-in
+    functions, and of type checking an ordinary program."""
+    expression = parse(Tokens(tokenize(generate_program(3_000))))
+    number = 100_000
+
+    for name, lookup in [
+        ("+", lambda: binary_operator_type("+", Int, Int)),
+        ("<=", lambda: binary_operator_type("<=", Int, Int)),
+        ("and", lambda: binary_operator_type("and", Bool, Bool)),
+        ("print_bool", lambda: function_type("print_bool", [Bool])),
+        ("read_int", lambda: function_type("read_int", [])),
+    ]:
+        seconds = min(timeit.repeat(lookup, number=number, repeat=5))
+        print(f"{name:12} {seconds / number * 1e9:6.0f} ns per lookup")
+
+    seconds = min(timeit.repeat(lambda: typecheck(expression), number=1, repeat=7))
+    print(f"typecheck    {seconds:.4f} s")
+
+
+if __name__ == "__main__":
+    main()
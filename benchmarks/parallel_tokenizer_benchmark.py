@@ -0,0 +1,41 @@
+import os
+import sys
+import timeit
+
+from benchmarks.programs import generate_program
+from compiler.token import TokenBuffer
+from compiler.tokenizer import tokenize_parallel
+
+
+def texts(tokens: TokenBuffer) -> list[str]:
+    return [tokens.text(i) for i in range(len(tokens))]
+
+
+def main() -> None:
+    """Tokenizes a large program with 1 to 8 processes and checks that
+    the result is identical to the serial tokenizer."""
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    source_code = generate_program(statements)
+    serial = tokenize_parallel(source_code, 1)
+
+    print(f"{len(source_code) / 1e6:.1f} MB, {os.cpu_count()} cores")
+
+    for jobs in [1, 2, 4, 8]:
+        seconds = min(
+            timeit.repeat(
+                lambda: tokenize_parallel(source_code, jobs), number=1, repeat=3
+            )
+        )
+        tokens = tokenize_parallel(source_code, jobs)
+        identical = (
+            tokens.kinds == serial.kinds
+            and tokens.starts == serial.starts
+            and tokens.ends == serial.ends
+            and texts(tokens) == texts(serial)
+        )
+
+        print(f"jobs={jobs}: {seconds:7.3f} s  identical={identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import cProfile
+import pstats
+import timeit
+
+from benchmarks.programs import generate_arithmetic_program, generate_program
+from compiler.parser import parse
+from compiler.token import Tokens
+from compiler.tokenizer import tokenize
+
+
+def main() -> None:
+    """Reports parse time and Python calls per token on large programs.
+    The last run parses a prebuilt token list, leaving out the cost of
+    building tokens, to show the parser's own share."""
+    arithmetic = tokenize(generate_arithmetic_program(5_000))
+
+    for name, tokens in [
+        ("mixed", tokenize(generate_program(10_000))),
+        ("arithmetic", arithmetic),
+        ("arithmetic, prebuilt tokens", list(arithmetic)),
+    ]:
+        seconds = min(timeit.repeat(lambda: parse(Tokens(tokens)), number=1, repeat=3))
+
+        profile = cProfile.Profile()
+        profile.runcall(lambda: parse(Tokens(tokens)))
+        calls = pstats.Stats(profile).total_calls  # type: ignore[attr-defined]
+
+        print(f"{name}: {len(tokens)} tokens in {seconds:.4f} s")
+        print(f"{name}: {calls / len(tokens):.1f} calls per token")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+def generate_program(statements: int) -> str:
+    """Generates a valid program with the given number of top-level statements,
+    similar in shape to our machine-generated sources."""
+    lines = ["var x0 = 0;"]
+
+    for i in range(1, statements):
+        match i % 4:
+            case 0:
+                lines.append(f"var x{i} = x{i - 1} + {i} * 2 - (x{i - 1} % 7);")
+            case 1:
+                lines.append(f"var x{i} = if x{i - 1} < {i} then x{i - 1} else {i};")
+            case 2:
+                lines.append(f"var x{i} = {{ var t = x{i - 1}; t * 3 / 2 }};")
+            case 3:
+                lines.append(f"var z{i} = x{i - 1} == {i} or x{i - 1} > 100;")
+                lines.append(f"z{i} = true and not z{i};")
+                lines.append(f"var x{i} = x{i - 1} - 1;")
+
+    lines.append(f"print_int(x{statements - 1});")
+
+    return "\n".join(lines)
+
+
+def generate_arithmetic_program(statements: int) -> str:
+    """Generates a program of long arithmetic and comparison expressions."""
+    lines = ["var x0 = 1;"]
+
+    for i in range(1, statements):
+        lines.append(
+            f"var x{i} = x{i - 1} * {i} + {i} / 3 - x{i - 1} % 7 * 2"
+            f" + ({i} - x{i - 1}) * 5 < {i} * 4 or x{i - 1} == {i};"
+        )
+
+    return "\n".join(lines)
@@ -0,0 +1,74 @@
+import timeit
+from typing import Optional
+
+from compiler.ast import Expression
+from compiler.parser import parse
+from compiler.token import Tokens
+from compiler.tokenizer import tokenize
+from compiler.type import Type
+from compiler.type_checker import TypeEnvironment, typecheck
+
+
+class CopyingEnvironment(TypeEnvironment):
+    """Scopes by copying the types of the enclosing scope into each block,
+    for comparison. Compiled classes cannot have interpreted subclasses,
+    so this runs without the mypyc build only."""
+
+    saved: list[dict[str, Type]]
+
+    def __init__(self, types: Optional[dict[str, Type]] = None) -> None:
+        super().__init__(types)
+        self.saved = []
+
+    def declare(self, name: str, t: Type) -> None:
+        self.types[name] = t
+
+    def enter_scope(self) -> None:
+        self.saved.append(self.types)
+        self.types = self.types.copy()
+
+    def leave_scope(self) -> None:
+        self.types = self.saved.pop()
+
+
+def nested_blocks(n: int) -> str:
+    """Blocks nested `n` deep, each shadowing `x` and declaring a variable."""
+    return "{ var x = 1; var v%d = x + 1; " * n % tuple(range(n)) + "x" + " }" * n
+
+
+def sibling_blocks(n: int) -> str:
+    """`n` variables, then `n` blocks one after the other, each declaring
+    variables."""
+    return (
+        "".join(f"var g{i} = {i};\n" for i in range(n))
+        + "var s = 0;\n"
+        + "{ var x = s; var y = x + 1; s = y; }\n" * n
+        + "s"
+    )
+
+
+def main() -> None:
+    """Reports the time to type check programs with many blocks
+    and variables, with an undo log and by copying environments."""
+    for shape in [nested_blocks, sibling_blocks]:
+        for n in [1_000, 2_000, 4_000]:
+            expression = parse(Tokens(tokenize(shape(n))))
+
+            def check(environment: TypeEnvironment) -> Expression:
+                typecheck(expression, environment)
+                return expression
+
+            undo = min(
+                timeit.repeat(lambda: check(TypeEnvironment()), number=1, repeat=5)
+            )
+            copying = min(
+                timeit.repeat(lambda: check(CopyingEnvironment()), number=1, repeat=5)
+            )
+            print(
+                f"{shape.__name__:14} {n:5}"
+                f"  undo log {undo:.4f} s  copying {copying:.4f} s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import mmap
+import tempfile
+import timeit
+from collections import deque
+
+from benchmarks.programs import generate_program
+from benchmarks.token_memory_benchmark import peak_memory
+from compiler.location import SourceCode
+from compiler.tokenizer import tokenize_stream
+
+
+def scan(source_code: SourceCode) -> None:
+    deque(tokenize_stream(source_code), maxlen=0)
+
+
+def main() -> None:
+    """Compares reading a source file into a str against memory mapping it,
+    measuring the peak memory and time of reading plus tokenizing."""
+    with tempfile.NamedTemporaryFile("w", suffix=".src") as f:
+        f.write(generate_program(30_000))
+        f.flush()
+
+        def read_text() -> None:
+            with open(f.name) as source_file:
+                scan(source_file.read())
+
+        def read_mmap() -> None:
+            with open(f.name, "rb") as source_file:
+                with mmap.mmap(
+                    source_file.fileno(), 0, access=mmap.ACCESS_READ
+                ) as source_code:
+                    scan(source_code)
+
+        for name, read in [("str ", read_text), ("mmap", read_mmap)]:
+            seconds = min(timeit.repeat(read, number=1, repeat=3))
+            print(f"{name}: {peak_memory(read) / 1e6:8.2f} MB peak, {seconds:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+from benchmarks.programs import generate_program
+from benchmarks.token_memory_benchmark import peak_memory
+from compiler.parser import parse
+from compiler.token import StreamingTokens, Tokens
+from compiler.tokenizer import tokenize, tokenize_stream
+
+
+def main() -> None:
+    """Compares the peak memory of parsing from a token buffer against
+    parsing straight from the streaming tokenizer."""
+    source_code = generate_program(17_000)
+
+    buffered = peak_memory(lambda: parse(Tokens(tokenize(source_code))))
+    streaming = peak_memory(
+        lambda: parse(StreamingTokens(tokenize_stream(source_code)))
+    )
+
+    print(f"source: {len(source_code) / 1e6:.2f} MB")
+    print(f"buffered:  {buffered / 1e6:8.2f} MB")
+    print(f"streaming: {streaming / 1e6:8.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
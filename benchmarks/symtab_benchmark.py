@@ -0,0 +1,52 @@
+import sys
+import timeit
+
+from compiler.builtin_type import builtin_types
+from compiler.ir_generator import generate_ir
+from compiler.parser import parse
+from compiler.token import Tokens
+from compiler.tokenizer import tokenize
+from compiler.type_checker import typecheck
+
+
+def flat_declarations(n: int) -> str:
+    """`n` top-level variable declarations, each using the previous one."""
+    return "var x0 = 0;\n" + "".join(f"var x{i} = x{i - 1} + 1;\n" for i in range(1, n))
+
+
+def nested_declarations(n: int, per_block: int = 100) -> str:
+    """`n` variable declarations in blocks nested `n / per_block` deep,
+    each using a top-level variable."""
+    blocks = []
+
+    for block in range(n // per_block):
+        blocks.append(
+            "{ "
+            + "".join(f"var x{block}_{i} = g + {i};\n" for i in range(per_block - 1))
+        )
+
+    return "var g = 1;\n" + "".join(blocks) + "g" + " }" * len(blocks)
+
+
+def main() -> None:
+    """Reports the time to generate the IR of programs with
+    many variable declarations."""
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+
+    for name, source_code in [
+        ("flat", flat_declarations(n)),
+        ("nested", nested_declarations(n)),
+    ]:
+        expression = parse(Tokens(tokenize(source_code)))
+        typecheck(expression)
+
+        seconds = min(
+            timeit.repeat(
+                lambda: generate_ir(builtin_types, expression), number=1, repeat=3
+            )
+        )
+        print(f"{name:8} {n} declarations  generate IR {seconds:.4f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import tracemalloc
+from typing import Callable
+
+from benchmarks.programs import generate_program
+from compiler.token import Token
+from compiler.tokenizer import tokenize
+
+
+def peak_memory(f: Callable[[], object]) -> int:
+    tracemalloc.start()
+    result = f()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak
+
+
+def materialized(source_code: str) -> list[Token]:
+    return list(tokenize(source_code))
+
+
+def main() -> None:
+    """Compares the peak memory of the token buffer against
+    a list of `Token` objects for a ~1 MB source."""
+    source_code = generate_program(17_000)
+
+    print(f"source: {len(source_code) / 1e6:.2f} MB")
+    print(f"TokenBuffer: {peak_memory(lambda: tokenize(source_code)) / 1e6:8.2f} MB")
+    print(
+        f"list[Token]: {peak_memory(lambda: materialized(source_code)) / 1e6:8.2f} MB"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+import timeit
+
+from benchmarks.programs import generate_program
+from compiler.tokenizer import tokenize
+
+
+def main() -> None:
+    """Tokenizes programs of doubling size. Linear tokenization keeps
+    the time ratio between consecutive sizes close to 2."""
+    previous: float | None = None
+
+    for statements in [5_000, 10_000, 20_000, 40_000]:
+        source_code = generate_program(statements)
+        seconds = min(timeit.repeat(lambda: tokenize(source_code), number=1, repeat=3))
+        ratio = "" if previous is None else f"  x{seconds / previous:.2f}"
+        print(f"{len(source_code):>10} chars  {seconds:8.4f} s{ratio}")
+        previous = seconds
+
+
+if __name__ == "__main__":
+    main()
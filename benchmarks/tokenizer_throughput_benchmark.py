@@ -0,0 +1,19 @@
+import timeit
+
+from benchmarks.programs import generate_program
+from compiler.tokenizer import tokenize
+
+
+def main() -> None:
+    """Reports how many tokens per second the tokenizer produces on a large input."""
+    source_code = generate_program(40_000)
+    token_count = len(tokenize(source_code))
+
+    seconds = min(timeit.repeat(lambda: tokenize(source_code), number=1, repeat=5))
+
+    print(f"{token_count} tokens in {seconds:.4f} s")
+    print(f"{token_count / seconds:,.0f} tokens/s")
+
+
+if __name__ == "__main__":
+    main()
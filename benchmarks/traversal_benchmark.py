@@ -0,0 +1,33 @@
+import timeit
+
+from benchmarks.programs import generate_program
+from compiler.builtin_type import builtin_types
+from compiler.ir_generator import generate_ir
+from compiler.parser import parse
+from compiler.token import Tokens
+from compiler.tokenizer import tokenize
+from compiler.type_checker import typecheck
+from compiler.typed_ir_generator import typecheck_and_generate_ir
+
+
+def main() -> None:
+    """Reports the time of each tree-walking phase on an ordinary program."""
+    tokens = list(tokenize(generate_program(3_000)))
+    expression = parse(Tokens(tokens))
+    typecheck(expression)
+
+    for name, phase in [
+        ("parse", lambda: parse(Tokens(tokens))),
+        ("typecheck", lambda: typecheck(expression)),
+        ("generate IR", lambda: generate_ir(builtin_types, expression)),
+        (
+            "typecheck + generate IR fused",
+            lambda: typecheck_and_generate_ir(builtin_types, expression),
+        ),
+    ]:
+        seconds = min(timeit.repeat(phase, number=1, repeat=7))
+        print(f"{name:30} {seconds:.4f} s")
+
+
+if __name__ == "__main__":
+    main()
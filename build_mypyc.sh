@@ -0,0 +1,43 @@
+#!/bin/bash
+# Compiles the compiler with mypyc. The compiled modules are put next to
+# their sources and Python imports them instead. Without them, or after
+# `./build_mypyc.sh clean`, the pure Python sources run as usual.
+#
+# mypyc comes with mypy. It also needs setuptools and a C compiler.
+set -euo pipefail
+cd "${SOURCE_DIR:-$(dirname "${0}")/src}"
+
+if [ "${1:-}" = "clean" ]; then
+    rm -Rf build ./*__mypyc.*.so compiler/*.so
+    exit 0
+fi
+
+# type, ir_generator_state and parser_exception stay interpreted:
+# mypyc cannot compile their classes as native classes.
+# ast_arena_view is left out too: its views subclass the AST classes,
+# so AstArena.view is not supported in the compiled build.
+${PYTHON:-poetry run python} -m mypyc \
+    compiler/assembler_exception.py \
+    compiler/assembly_generator.py \
+    compiler/ast.py \
+    compiler/ast_arena.py \
+    compiler/builtin_type.py \
+    compiler/compact_ir.py \
+    compiler/constant_folder.py \
+    compiler/dispatch.py \
+    compiler/hash_cons.py \
+    compiler/incremental.py \
+    compiler/intrinsics.py \
+    compiler/ir.py \
+    compiler/ir_generator.py \
+    compiler/ir_serialization.py \
+    compiler/ir_simplifier.py \
+    compiler/location.py \
+    compiler/parser.py \
+    compiler/stats.py \
+    compiler/token.py \
+    compiler/tokenizer.py \
+    compiler/trampoline.py \
+    compiler/type_checker.py \
+    compiler/type_checker_exception.py \
+    compiler/typed_ir_generator.py
@@ -1,18 +1,43 @@
+import mmap
 import sys
 
 from compiler.assembler import assemble
 from compiler.assembly_generator import generate_assembly
+from compiler.ast import Expression
 from compiler.builtin_type import builtin_types
+from compiler.compact_ir import CompactIr
+from compiler.constant_folder import fold_constants
+from compiler.hash_cons import hash_cons
+from compiler.ir import Instruction
 from compiler.ir_generator import generate_ir
+from compiler.ir_serialization import (
+    dump_binary_ir,
+    format_ir,
+    is_binary_ir,
+    load_binary_ir,
+    parse_ir,
+)
+from compiler.ir_simplifier import simplify_ir
+from compiler.location import SourceCode
 from compiler.parser import parse
-from compiler.token import Tokens
-from compiler.tokenizer import tokenize
-from compiler.type_checker import typecheck
+from compiler.parser_exception import Diagnostic
+from compiler.stats import CompilerStats
+from compiler.token import StreamingTokens, Tokens
+from compiler.tokenizer import tokenize_parallel, tokenize_stream
+from compiler.type_checker import TypeMemo, typecheck
+from compiler.typed_ir_generator import typecheck_and_generate_ir
 
 usage = (
     f"""
 Usage: {sys.argv[0]} <command> [source_code_file] [additional_arguments]
 
+Command 'ir':
+    Print the IR of source code.
+    
+    Arguments:
+        ir_file                 Optional. Write the IR to this file instead.
+        --binary                Optional. Write the binary IR format.
+    
 Command 'asm':
     Print the assembly code of source code.
     
@@ -24,6 +49,17 @@ Command 'compile':
     
 Common arguments:
     source_code_file        Optional. Defaults to standard input if missing.
+    --from-ir               Optional. Read IR, textual or binary, instead of
+                            source code.
+    --jobs N                Optional. Tokenize large sources in N processes.
+    --hash-cons             Optional. Share identical closed subexpressions
+                            and type check each of them once.
+    --fold-constants        Optional. Compute the values of constant
+                            expressions when compiling.
+    --simplify-ir           Optional. Rewrite the IR with algebraic
+                            identities until none applies.
+    --stats                 Optional. Print statistics of the compilation
+                            to standard error.
 """.strip()
     + "\n"
 )
@@ -33,10 +69,41 @@ def main() -> int:
     command: str | None = None
     input_file: str | None = None
     output_file: str | None = None
-    for arg in sys.argv[1:]:
+    jobs = 1
+    hash_consing = False
+    folding = False
+    simplifying = False
+    from_ir = False
+    binary_ir = False
+    stats: CompilerStats | None = None
+    args = iter(sys.argv[1:])
+    for arg in args:
         if arg in ["-h", "--help"]:
             print(usage)
             return 0
+        elif arg == "--jobs":
+            value = next(args, None)
+
+            if value is None or not value.isdecimal() or int(value) < 1:
+                print(
+                    f"Error: --jobs needs a positive integer\n\n{usage}",
+                    file=sys.stderr,
+                )
+                return 1
+
+            jobs = int(value)
+        elif arg == "--hash-cons":
+            hash_consing = True
+        elif arg == "--fold-constants":
+            folding = True
+        elif arg == "--simplify-ir":
+            simplifying = True
+        elif arg == "--stats":
+            stats = CompilerStats()
+        elif arg == "--from-ir":
+            from_ir = True
+        elif arg == "--binary":
+            binary_ir = True
         elif arg.startswith("-"):
             raise Exception(f"Unknown argument: {arg}")
         elif command is None:
@@ -48,38 +115,156 @@ def main() -> int:
         else:
             raise Exception("Multiple input files not supported")
 
-    def read_source_code() -> str:
+    def read_source_code() -> SourceCode:
         if input_file is not None:
-            with open(input_file) as f:
-                return f.read()
+            # The tokenizer scans the mapped file as ASCII bytes, so the
+            # source is neither copied nor decoded up front.
+            with open(input_file, "rb") as f:
+                try:
+                    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:  # an empty file cannot be mapped
+                    return ""
         else:
             return sys.stdin.read()
 
+    def parse_source_code(source_code: SourceCode) -> Expression | None:
+        """Parses the source code, printing every syntax error in it.
+        Returns None if there were any."""
+        diagnostics: list[Diagnostic] = []
+
+        if jobs > 1:
+            tokens: Tokens = Tokens(tokenize_parallel(source_code, jobs))
+        else:
+            tokens = StreamingTokens(tokenize_stream(source_code))
+
+        expression = parse(tokens, diagnostics=diagnostics)
+
+        for diagnostic in diagnostics:
+            print(f"Error: {diagnostic.error}", file=sys.stderr)
+
+        return None if diagnostics else expression
+
+    def check_types_and_generate_ir(expression: Expression) -> list[Instruction]:
+        memo = None
+
+        if hash_consing:
+            result = hash_cons(expression)
+            memo = TypeMemo(result.shared)
+
+            if stats is not None:
+                stats.add("AST nodes", result.nodes)
+                stats.add("AST nodes after hash-consing", result.unique_nodes)
+                stats.add("AST dedup ratio", result.dedup_ratio)
+                stats.add("AST bytes saved", result.bytes_saved)
+
+        if folding:
+            # Folding needs the types, so it runs between separate passes
+            typecheck(expression, memo=memo)
+            add_memo_stats(memo)
+            folding_result = fold_constants(expression)
+
+            if stats is not None:
+                stats.add("Folded operations", folding_result.folded_operations)
+                stats.add("Substituted constants", folding_result.substituted_constants)
+                stats.add("Pruned branches", folding_result.pruned_branches)
+
+            return generate_ir(builtin_types, folding_result.expression)
+
+        ir_instructions = typecheck_and_generate_ir(builtin_types, expression, memo)
+        add_memo_stats(memo)
+        return ir_instructions
+
+    def add_memo_stats(memo: TypeMemo | None) -> None:
+        if stats is not None and memo is not None:
+            stats.add("typecheck memo hits", memo.hits)
+
+    def read_ir() -> list[Instruction] | CompactIr:
+        if input_file is not None:
+            with open(input_file, "rb") as f:
+                data = f.read()
+        else:
+            data = sys.stdin.buffer.read()
+
+        if is_binary_ir(data):
+            return load_binary_ir(data)
+
+        return parse_ir(data.decode())
+
+    def input_ir() -> list[Instruction] | CompactIr | None:
+        """Returns the IR of the input, or None if its source code had errors."""
+        if from_ir:
+            return read_ir()
+
+        ast_node = parse_source_code(read_source_code())
+        if ast_node is None:
+            return None
+
+        return check_types_and_generate_ir(ast_node)
+
+    def simplify(ir_code: list[Instruction] | CompactIr) -> list[Instruction]:
+        instructions = (
+            ir_code.instructions() if isinstance(ir_code, CompactIr) else ir_code
+        )
+        result = simplify_ir(instructions)
+
+        if stats is not None:
+            for name, hits in result.rule_hits.items():
+                stats.add(f"Simplifier rule {name}", hits)
+            stats.add("Simplifier passes", result.passes)
+
+        return result.instructions
+
+    def write_ir(ir_code: list[Instruction] | CompactIr) -> None:
+        if binary_ir:
+            code = ir_code if isinstance(ir_code, CompactIr) else CompactIr(ir_code)
+            data = dump_binary_ir(code)
+        else:
+            instructions = (
+                ir_code.instructions() if isinstance(ir_code, CompactIr) else ir_code
+            )
+            data = format_ir(instructions).encode()
+
+        if output_file is not None:
+            with open(output_file, "wb") as f:
+                f.write(data)
+        else:
+            sys.stdout.buffer.write(data)
+
     if command is None:
         print(f"Error: command argument missing\n\n{usage}", file=sys.stderr)
         return 1
 
     if command == "interpret":
         source_code = read_source_code()
-    elif command == "asm":
-        source_code = read_source_code()
-        tokens = tokenize(source_code)
-        ast_node = parse(Tokens(tokens))
-        typecheck(ast_node)
-        ir_instructions = generate_ir(builtin_types, ast_node)
-        asm_code = generate_assembly(ir_instructions)
-        print(asm_code)
-    elif command == "compile":
-        source_code = read_source_code()
-        tokens = tokenize(source_code)
-        ast_node = parse(Tokens(tokens))
-        typecheck(ast_node)
-        ir_instructions = generate_ir(builtin_types, ast_node)
-        asm_code = generate_assembly(ir_instructions)
-        assemble(asm_code, "compiled_program" if output_file is None else output_file)
+    elif command in ["ir", "asm", "compile"]:
+        try:
+            ir_code = input_ir()
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+
+        if ir_code is None:
+            return 1
+
+        if simplifying:
+            ir_code = simplify(ir_code)
+
+        if command == "ir":
+            write_ir(ir_code)
+        elif command == "asm":
+            print(generate_assembly(ir_code))
+        else:
+            asm_code = generate_assembly(ir_code)
+            assemble(
+                asm_code, "compiled_program" if output_file is None else output_file
+            )
     else:
         print(f"Error: unknown command: {command}\n\n{usage}", file=sys.stderr)
         return 1
+
+    if stats is not None:
+        print(stats, file=sys.stderr)
+
     return 0
 
 
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Any, Callable, Optional
 
 import compiler.ir as ir
+from compiler.dispatch import find_handler
 
 
 @dataclass
@@ -97,38 +99,49 @@ def create_flow_graph(blocks: list[BasicBlock]) -> dict[str, FlowNode]:
 
 
 def analyze_reaching_definitions(
-    flow_graph: dict[str, FlowNode]
+    flow_graph: dict[str, FlowNode],
 ) -> dict[str, set[str]]:
     state: dict[ir.IRVar, set[int]] = {}
 
     return {}
 
 
+def instruction_dest(
+    instruction: ir.LoadBoolConst | ir.LoadIntConst | ir.Copy | ir.Call,
+) -> ir.IRVar:
+    return instruction.dest
+
+
+def no_dest(instruction: ir.Label | ir.Jump | ir.CondJump | ir.Return) -> None:
+    return None
+
+
+# The variable defined by each kind of instruction, if any
+definition_handlers: dict[type, Callable[[Any], Optional[ir.IRVar]]] = {
+    ir.Copy: instruction_dest,
+    ir.LoadIntConst: instruction_dest,
+    ir.LoadBoolConst: instruction_dest,
+    ir.Call: instruction_dest,
+    ir.Label: no_dest,
+    ir.Jump: no_dest,
+    ir.CondJump: no_dest,
+    ir.Return: no_dest,
+}
+
+
 def create_state(instructions: list[ir.Instruction]) -> dict[ir.IRVar, set[int]]:
     state: dict[ir.IRVar, set[int]] = {}
 
     for index, instruction in enumerate(instructions):
-        match instruction:
-            case ir.Copy():
-                if instruction.dest not in state:
-                    state[instruction.dest] = set()
-
-                state[instruction.dest].add(index)
-            case ir.LoadIntConst():
-                if instruction.dest not in state:
-                    state[instruction.dest] = set()
-
-                state[instruction.dest].add(index)
-            case ir.LoadBoolConst():
-                if instruction.dest not in state:
-                    state[instruction.dest] = set()
-
-                state[instruction.dest].add(index)
-            case ir.Call():
-                if instruction.dest is not None:
-                    if instruction.dest not in state:
-                        state[instruction.dest] = set()
-
-                    state[instruction.dest].add(index)
+        handler = find_handler(definition_handlers, type(instruction))
+        if handler is None:
+            continue
+
+        dest = handler(instruction)
+        if dest is not None:
+            if dest not in state:
+                state[dest] = set()
+
+            state[dest].add(index)
 
     return state
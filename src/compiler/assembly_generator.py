@@ -1,5 +1,6 @@
-import dataclasses
+from typing import Callable
 
+import compiler.compact_ir as compact_ir
 import compiler.ir as ir
 from compiler.assembler_exception import (
     UnknownFunction,
@@ -7,162 +8,202 @@ from compiler.assembler_exception import (
     WrongNumberOfArguments,
 )
 from compiler.builtin_type import builtin_types
+from compiler.compact_ir import CompactIr
 from compiler.intrinsics import all_intrinsics, IntrinsicArgs
 
 byte_size = 8
 
 
 class Locals:
-    _var_to_location: dict[ir.IRVar, str]
+    _refs: list[str]
     _stack_used: int
 
-    def __init__(self, variables: list[ir.IRVar]) -> None:
-        self._var_to_location = {}
+    def __init__(self, code: CompactIr) -> None:
+        self._refs = [""] * len(code.var_names)
         self._stack_used = byte_size
 
-        for v in variables:
-            self._var_to_location[v] = f"-{self._stack_used}(%rbp)"
+        for v in get_all_ir_variables(code):
+            self._refs[v] = f"-{self._stack_used}(%rbp)"
             self._stack_used += byte_size
 
-    def get_ref(self, v: ir.IRVar) -> str:
+    def get_ref(self, v: int) -> str:
         """Returns an Assembly reference like `-24(%rbp)`
         for the memory location that stores the given variable"""
-        return self._var_to_location[v]
+        return self._refs[v]
 
     def stack_used(self) -> int:
         """Returns the number of bytes of stack space needed for the local variables."""
         return self._stack_used - byte_size
 
 
-def get_all_ir_variables(instructions: list[ir.Instruction]) -> list[ir.IRVar]:
-    result_list: list[ir.IRVar] = []
-    result_set: set[ir.IRVar] = set()
-
-    def add(var: ir.IRVar) -> None:
-        if var not in result_set and var.name not in [
-            k.name for k in builtin_types.keys()
-        ]:
-            result_list.append(var)
-            result_set.add(var)
-
-    for insn in instructions:
-        for field in dataclasses.fields(insn):
-            value = getattr(insn, field.name)
-            if isinstance(value, ir.IRVar):
-                add(value)
-            elif isinstance(value, list):
-                for v in value:
-                    if isinstance(v, ir.IRVar):
-                        add(v)
+def get_all_ir_variables(code: CompactIr) -> list[int]:
+    """Returns the variables of `code` other than built-ins,
+    in the order they first appear."""
+    result_list: list[int] = []
+    builtin_names = {k.name for k in builtin_types.keys()}
+    # Built-ins are not stored in the stack, as if they were seen
+    seen = [name in builtin_names for name in code.var_names]
+
+    for i in range(len(code)):
+        for v in code.variables(i):
+            if not seen[v]:
+                result_list.append(v)
+                seen[v] = True
+
     return result_list
 
 
-def generate_assembly(instructions: list[ir.Instruction]) -> str:
-    lines = []
+class AssemblyGenerator:
+    """The state of generating the assembly of one program.
+    See `generate_assembly`."""
 
-    def emit(line: str) -> None:
-        lines.append(line)
+    code: CompactIr
+    lines: list[str]
+    locals: Locals
 
-    locals = Locals(get_all_ir_variables(instructions))
+    def __init__(self, code: CompactIr) -> None:
+        self.code = code
+        self.lines = []
+        self.locals = Locals(code)
 
-    emit(".extern print_int")
-    emit(".extern print_bool")
-    emit(".extern read_int")
+    def emit(self, line: str) -> None:
+        self.lines.append(line)
 
-    emit(".global main")
-    emit(".type main, @function")
+    def generate(self) -> str:
+        self.emit(".extern print_int")
+        self.emit(".extern print_bool")
+        self.emit(".extern read_int")
 
-    emit("")
-    emit(".section .text")
+        self.emit(".global main")
+        self.emit(".type main, @function")
 
-    emit("")
-    emit("main:")
+        self.emit("")
+        self.emit(".section .text")
 
-    emit("pushq %rbp")
-    emit("movq %rsp, %rbp")
-    emit(f"subq ${locals.stack_used()}, %rsp")
+        self.emit("")
+        self.emit("main:")
 
-    for insn in instructions:
-        emit("")
+        self.emit("pushq %rbp")
+        self.emit("movq %rsp, %rbp")
+        self.emit(f"subq ${self.locals.stack_used()}, %rsp")
 
-        if not isinstance(insn, ir.Label):
-            emit("# " + str(insn))
+        code = self.code
 
-        match insn:
-            case ir.Label():
-                emit(f".L{insn.name}:")
+        for i in range(len(code)):
+            opcode = code.opcodes[i]
+            self.emit("")
 
-            case ir.LoadIntConst():
-                if -(2**31) <= insn.value < 2**31:
-                    emit(f"movq ${insn.value}, {locals.get_ref(insn.dest)}")
-                else:
-                    emit(f"movabsq ${insn.value}, %rax")
-                    emit(f"movq %rax, {locals.get_ref(insn.dest)}")
+            if opcode != compact_ir.LABEL:
+                self.emit("# " + code.format(i))
 
-            case ir.LoadBoolConst():
-                emit(f"movq ${1 if insn.value else 0}, {locals.get_ref(insn.dest)}")
+            emit_handlers[opcode](self, i)
 
-            case ir.Copy():
-                emit(f"movq {locals.get_ref(insn.source)}, %rax")
-                emit(f"movq %rax, {locals.get_ref(insn.dest)}")
+        self.emit("")
 
-            case ir.Jump():
-                emit(f"jmp .L{insn.label.name}")
+        return "\n".join(self.lines)
 
-            case ir.Call():
-                if len(insn.args) > 6:
-                    raise TooManyArguments(
-                        f"Too many arguments for function call: {insn.fun.name}"
-                    )
+    def emit_label(self, i: int) -> None:
+        self.emit(f".L{self.code.label_names[self.code.a[i]]}:")
 
-                if (intrinsic := all_intrinsics.get(insn.fun.name)) is not None:
-                    args = IntrinsicArgs(
-                        [locals.get_ref(arg) for arg in insn.args], "%rax", emit
-                    )
+    def emit_load_int_const(self, i: int) -> None:
+        value = self.code.a[i]
+        dest = self.locals.get_ref(self.code.dests[i])
 
-                    intrinsic(args)
-                    emit(f"movq %rax, {locals.get_ref(insn.dest)}")
-                else:
-                    if locals.stack_used() % 16 != 0:
-                        emit("subq $8, %rsp")
+        if -(2**31) <= value < 2**31:
+            self.emit(f"movq ${value}, {dest}")
+        else:
+            self.emit(f"movabsq ${value}, %rax")
+            self.emit(f"movq %rax, {dest}")
 
-                    if insn.fun.name in ["print_int", "print_bool"]:
-                        if len(insn.args) != 1:
-                            raise WrongNumberOfArguments(
-                                f"Wrong number of arguments for function call: {insn.fun.name}. Expected 1, got {len(insn.args)}"
-                            )
+    def emit_load_big_int_const(self, i: int) -> None:
+        value = self.code.big_ints[self.code.a[i]]
+        self.emit(f"movabsq ${value}, %rax")
+        self.emit(f"movq %rax, {self.locals.get_ref(self.code.dests[i])}")
 
-                        emit(f"movq {locals.get_ref(insn.args[0])}, %rdi")
-                        emit(f"call {insn.fun.name}")
-                    elif insn.fun.name == "read_int":
-                        if len(insn.args) != 0:
-                            raise WrongNumberOfArguments(
-                                f"Wrong number of arguments for function call: {insn.fun.name}. Expected 0, got {len(insn.args)}"
-                            )
+    def emit_load_bool_const(self, i: int) -> None:
+        value = 1 if self.code.a[i] else 0
+        self.emit(f"movq ${value}, {self.locals.get_ref(self.code.dests[i])}")
 
-                        emit(f"call {insn.fun.name}")
-                    else:
-                        raise UnknownFunction(f"Unknown function: {insn.fun.name}")
+    def emit_copy(self, i: int) -> None:
+        self.emit(f"movq {self.locals.get_ref(self.code.a[i])}, %rax")
+        self.emit(f"movq %rax, {self.locals.get_ref(self.code.dests[i])}")
 
-                    emit(f"movq %rax, {locals.get_ref(insn.dest)}")
+    def emit_jump(self, i: int) -> None:
+        self.emit(f"jmp .L{self.code.label_names[self.code.a[i]]}")
 
-                    if locals.stack_used() % 16 != 0:
-                        emit("add $8, %rsp")
+    def emit_call(self, i: int) -> None:
+        fun = self.code.var_names[self.code.a[i]]
+        args = self.code.call_args(i)
+        dest = self.locals.get_ref(self.code.dests[i])
 
-            case ir.CondJump():
-                emit(f"cmpq $0, {locals.get_ref(insn.cond)}")
-                emit(f"jne .L{insn.then_label.name}")
-                emit(f"jmp .L{insn.else_label.name}")
+        if len(args) > 6:
+            raise TooManyArguments(f"Too many arguments for function call: {fun}")
 
-            case ir.Return():
-                emit("movq $0, %rax")
-                emit("movq %rbp, %rsp")
-                emit("popq %rbp")
-                emit("ret")
+        if (intrinsic := all_intrinsics.get(fun)) is not None:
+            intrinsic_args = IntrinsicArgs(
+                [self.locals.get_ref(arg) for arg in args],
+                "%rax",
+                self.emit,
+            )
 
-            case _:
-                raise ValueError(f"Unknown instruction: {insn}")
+            intrinsic(intrinsic_args)
+            self.emit(f"movq %rax, {dest}")
+        else:
+            if self.locals.stack_used() % 16 != 0:
+                self.emit("subq $8, %rsp")
 
-    emit("")
+            if fun in ["print_int", "print_bool"]:
+                if len(args) != 1:
+                    raise WrongNumberOfArguments(
+                        f"Wrong number of arguments for function call: {fun}. Expected 1, got {len(args)}"
+                    )
+
+                self.emit(f"movq {self.locals.get_ref(args[0])}, %rdi")
+                self.emit(f"call {fun}")
+            elif fun == "read_int":
+                if len(args) != 0:
+                    raise WrongNumberOfArguments(
+                        f"Wrong number of arguments for function call: {fun}. Expected 0, got {len(args)}"
+                    )
 
-    return "\n".join(lines)
+                self.emit(f"call {fun}")
+            else:
+                raise UnknownFunction(f"Unknown function: {fun}")
+
+            self.emit(f"movq %rax, {dest}")
+
+            if self.locals.stack_used() % 16 != 0:
+                self.emit("add $8, %rsp")
+
+    def emit_cond_jump(self, i: int) -> None:
+        labels = self.code.label_names
+        self.emit(f"cmpq $0, {self.locals.get_ref(self.code.a[i])}")
+        self.emit(f"jne .L{labels[self.code.b[i]]}")
+        self.emit(f"jmp .L{labels[self.code.c[i]]}")
+
+    def emit_return(self, i: int) -> None:
+        self.emit("movq $0, %rax")
+        self.emit("movq %rbp, %rsp")
+        self.emit("popq %rbp")
+        self.emit("ret")
+
+
+# The method that emits each kind of instruction, indexed by the opcode
+emit_handlers: list[Callable[[AssemblyGenerator, int], None]] = [
+    AssemblyGenerator.emit_label,
+    AssemblyGenerator.emit_load_int_const,
+    AssemblyGenerator.emit_load_big_int_const,
+    AssemblyGenerator.emit_load_bool_const,
+    AssemblyGenerator.emit_copy,
+    AssemblyGenerator.emit_call,
+    AssemblyGenerator.emit_jump,
+    AssemblyGenerator.emit_cond_jump,
+    AssemblyGenerator.emit_return,
+]
+
+
+def generate_assembly(instructions: list[ir.Instruction] | CompactIr) -> str:
+    code = (
+        instructions if isinstance(instructions, CompactIr) else CompactIr(instructions)
+    )
+    return AssemblyGenerator(code).generate()
@@ -4,65 +4,68 @@ from typing import Optional
 from compiler.type import Unit, Type
 
 
-@dataclass
+@dataclass(slots=True)
 class TypeExpression:
     pass
 
 
+@dataclass(slots=True)
 class IntTypeExpression(TypeExpression):
     pass
 
 
+@dataclass(slots=True)
 class BoolTypeExpression(TypeExpression):
     pass
 
 
+@dataclass(slots=True)
 class UnitTypeExpression(TypeExpression):
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class Expression:
     type: Type = field(kw_only=True, default=Unit)
 
 
-@dataclass
+@dataclass(slots=True)
 class Literal(Expression):
     value: int | bool | None
 
 
-@dataclass
+@dataclass(slots=True)
 class Identifier(Expression):
     name: str
 
 
-@dataclass
+@dataclass(slots=True)
 class BinaryOp(Expression):
     left: Expression | None
     op: str
     right: Expression
 
 
-@dataclass
+@dataclass(slots=True)
 class IfExpression(Expression):
     condition: Expression
     then_clause: Expression
     else_clause: Expression | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class FunctionExpression(Expression):
     name: str
     arguments: list[Expression] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class BlockExpression(Expression):
     expressions: list[Expression] = field(default_factory=list)
     result: Expression = field(default_factory=lambda: Literal(None))
 
 
-@dataclass
+@dataclass(slots=True)
 class VariableDeclarationExpression(Expression):
     name: str
     value: Expression
@@ -70,17 +73,23 @@ class VariableDeclarationExpression(Expression):
     is_const: Optional[bool] = False
 
 
-@dataclass
+@dataclass(slots=True)
 class WhileExpression(Expression):
     condition: Expression
     body: BlockExpression
 
 
-@dataclass
+@dataclass(slots=True)
 class BreakExpression(Expression):
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class ContinueExpression(Expression):
     pass
+
+
+# Stands in for code that could not be parsed
+@dataclass(slots=True)
+class ErrorExpression(Expression):
+    pass
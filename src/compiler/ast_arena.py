@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+from array import array
+from typing import Optional
+
+import compiler.ast as ast
+from compiler.ast import (
+    BinaryOp,
+    BlockExpression,
+    BoolTypeExpression,
+    BreakExpression,
+    ContinueExpression,
+    ErrorExpression,
+    Expression,
+    FunctionExpression,
+    Identifier,
+    IfExpression,
+    IntTypeExpression,
+    Literal,
+    TypeExpression,
+    UnitTypeExpression,
+    VariableDeclarationExpression,
+    WhileExpression,
+)
+from compiler.type import Type, Unit
+
+# The class of every node kind, indexed by the kind code
+node_classes: list[type[Expression]] = [
+    Literal,
+    Identifier,
+    BinaryOp,
+    IfExpression,
+    FunctionExpression,
+    BlockExpression,
+    VariableDeclarationExpression,
+    WhileExpression,
+    BreakExpression,
+    ContinueExpression,
+    ErrorExpression,
+]
+node_kinds: dict[type[Expression], int] = {c: i for i, c in enumerate(node_classes)}
+
+# The flags of a literal tell what its value is. Integers that do not
+# fit in 64 bits are stored in a separate list and `values` holds their index.
+LITERAL_INT = 0
+LITERAL_BOOL = 1
+LITERAL_NONE = 2
+LITERAL_BIG_INT = 3
+
+# The flags of a variable declaration hold `is_const` in the lowest bit
+# and the index of its type expression class in the others.
+type_expression_classes: list[Optional[type[TypeExpression]]] = [
+    None,
+    IntTypeExpression,
+    BoolTypeExpression,
+    UnitTypeExpression,
+]
+
+
+class AstArena:
+    """Stores AST nodes as parallel arrays instead of one object per node.
+
+    A node is addressed by an integer handle, the index of its entries in
+    the arrays. Its children are a run of handles in `children`, starting
+    at `child_starts[handle]`. Identifier, operator and function names are
+    interned in `names` and types in `types`.
+
+    Nodes are added from the dataclass AST with `add` and turned back into
+    it with `to_expression`. `view` gives an object that reads a node in
+    place and can be passed to `typecheck` and `generate_ir`."""
+
+    kinds: array[int]
+    flags: array[int]
+    type_ids: array[int]
+    name_ids: array[int]
+    values: array[int]
+    child_starts: array[int]
+    child_counts: array[int]
+    children: array[int]
+    names: list[str]
+    types: list[Type]
+    big_ints: list[int]
+    _name_ids: dict[str, int]
+    _type_ids: dict[Type, int]
+
+    def __init__(self) -> None:
+        self.kinds = array("B")
+        self.flags = array("B")
+        self.type_ids = array("B")
+        self.name_ids = array("i")
+        self.values = array("q")
+        self.child_starts = array("i")
+        self.child_counts = array("i")
+        self.children = array("i")
+        self.names = []
+        self.types = []
+        self.big_ints = []
+        self._name_ids = {}
+        self._type_ids = {}
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def intern_name(self, name: str) -> int:
+        name_id = self._name_ids.get(name)
+
+        if name_id is None:
+            name_id = len(self.names)
+            self.names.append(name)
+            self._name_ids[name] = name_id
+
+        return name_id
+
+    def intern_type(self, t: Type) -> int:
+        type_id = self._type_ids.get(t)
+
+        if type_id is None:
+            type_id = len(self.types)
+            self.types.append(t)
+            self._type_ids[t] = type_id
+
+        return type_id
+
+    def node_class(self, handle: int) -> type[Expression]:
+        return node_classes[self.kinds[handle]]
+
+    def child(self, handle: int, i: int) -> int:
+        return self.children[self.child_starts[handle] + i]
+
+    def children_of(self, handle: int) -> array[int]:
+        start = self.child_starts[handle]
+        return self.children[start : start + self.child_counts[handle]]
+
+    def name(self, handle: int) -> str:
+        return self.names[self.name_ids[handle]]
+
+    def value(self, handle: int) -> int | bool | None:
+        flags = self.flags[handle]
+
+        if flags == LITERAL_INT:
+            return self.values[handle]
+        elif flags == LITERAL_BOOL:
+            return self.values[handle] != 0
+        elif flags == LITERAL_NONE:
+            return None
+        else:
+            return self.big_ints[self.values[handle]]
+
+    def type(self, handle: int) -> Type:
+        return self.types[self.type_ids[handle]]
+
+    def set_type(self, handle: int, t: Type) -> None:
+        self.type_ids[handle] = self.intern_type(t)
+
+    def add(self, expression: Expression) -> int:
+        """Stores a dataclass AST and returns the handle of its root.
+        The nodes of a subtree get consecutive handles, in pre-order."""
+        root = len(self.kinds)
+        # Nodes to store and the slot in `children` that gets their handle
+        stack: list[tuple[Expression, int]] = [(expression, -1)]
+
+        while stack:
+            node, slot = stack.pop()
+            handle = len(self.kinds)
+            node_children = _children(node)
+
+            self.kinds.append(node_kinds[type(node)])
+            self.type_ids.append(self.intern_type(node.type))
+            self.child_starts.append(len(self.children))
+            self.child_counts.append(len(node_children))
+            self.children.extend([-1] * len(node_children))
+            self._add_fields(node)
+
+            if slot >= 0:
+                self.children[slot] = handle
+
+            start = self.child_starts[handle]
+            for i in reversed(range(len(node_children))):
+                stack.append((node_children[i], start + i))
+
+        return root
+
+    def _add_fields(self, node: Expression) -> None:
+        flags = 0
+        name_id = -1
+        value = 0
+
+        match node:
+            case Literal():
+                if node.value is None:
+                    flags = LITERAL_NONE
+                elif isinstance(node.value, bool):
+                    flags = LITERAL_BOOL
+                    value = int(node.value)
+                elif -(2**63) <= node.value < 2**63:
+                    flags = LITERAL_INT
+                    value = node.value
+                else:
+                    flags = LITERAL_BIG_INT
+                    value = len(self.big_ints)
+                    self.big_ints.append(node.value)
+            case Identifier():
+                name_id = self.intern_name(node.name)
+            case BinaryOp():
+                name_id = self.intern_name(node.op)
+            case FunctionExpression():
+                name_id = self.intern_name(node.name)
+            case VariableDeclarationExpression():
+                name_id = self.intern_name(node.name)
+                type_expression = (
+                    type(node.type_expression)
+                    if node.type_expression is not None
+                    else None
+                )
+                flags = int(bool(node.is_const)) | (
+                    type_expression_classes.index(type_expression) << 1
+                )
+
+        self.flags.append(flags)
+        self.name_ids.append(name_id)
+        self.values.append(value)
+
+    def to_expression(self, handle: int) -> Expression:
+        """Builds the dataclass AST of the node at `handle`."""
+        order = []
+        stack = [handle]
+
+        while stack:
+            h = stack.pop()
+            order.append(h)
+            stack.extend(self.children_of(h))
+
+        # Children are built before their parents
+        built: dict[int, Expression] = {}
+
+        for h in reversed(order):
+            node_children = [built.pop(c) for c in self.children_of(h)]
+            built[h] = self._build(h, node_children)
+
+        return built[handle]
+
+    def _build(self, handle: int, node_children: list[Expression]) -> Expression:
+        t = self.type(handle)
+
+        match self.node_class(handle):
+            case c if c is Literal:
+                return Literal(self.value(handle), type=t)
+            case c if c is Identifier:
+                return Identifier(self.name(handle), type=t)
+            case c if c is BinaryOp:
+                left = node_children[0] if len(node_children) == 2 else None
+                return BinaryOp(left, self.name(handle), node_children[-1], type=t)
+            case c if c is IfExpression:
+                return IfExpression(*node_children, type=t)
+            case c if c is FunctionExpression:
+                return FunctionExpression(self.name(handle), node_children, type=t)
+            case c if c is BlockExpression:
+                return BlockExpression(node_children[:-1], node_children[-1], type=t)
+            case c if c is VariableDeclarationExpression:
+                type_expression = type_expression_classes[self.flags[handle] >> 1]
+                return VariableDeclarationExpression(
+                    self.name(handle),
+                    node_children[0],
+                    type_expression() if type_expression is not None else None,
+                    self.flags[handle] & 1 == 1,
+                    type=t,
+                )
+            case c if c is WhileExpression:
+                body = node_children[1]
+                assert isinstance(body, BlockExpression)
+                return WhileExpression(node_children[0], body, type=t)
+            case c:
+                return c(type=t)
+
+    def view(self, handle: int) -> Expression:
+        """Returns an object that reads the node at `handle` from the arena.
+        It is an instance of the node's dataclass, so code written for the
+        dataclass AST works on it. Only its `type` can be assigned.
+
+        Views need the interpreted compiler, see `views_supported`."""
+        if not views_supported():
+            raise Exception("Arena views are not supported when compiled with mypyc")
+
+        # Not imported at the top, since it cannot be imported when compiled
+        from compiler.ast_arena_view import view_classes
+
+        return view_classes[self.kinds[handle]](self, handle)
+
+
+def views_supported() -> bool:
+    """Whether `AstArena.view` works. The mypyc build compiles the node
+    classes, which interpreted views cannot subclass, and the phases, which
+    read the fields of nodes directly instead of through the properties of
+    views."""
+    return ast.__file__ is not None and ast.__file__.endswith(".py")
+
+
+def _children(node: Expression) -> list[Expression]:
+    match node:
+        case BinaryOp():
+            return [node.right] if node.left is None else [node.left, node.right]
+        case IfExpression():
+            if node.else_clause is None:
+                return [node.condition, node.then_clause]
+            return [node.condition, node.then_clause, node.else_clause]
+        case FunctionExpression():
+            return node.arguments
+        case BlockExpression():
+            return [*node.expressions, node.result]
+        case VariableDeclarationExpression():
+            return [node.value]
+        case WhileExpression():
+            return [node.condition, node.body]
+        case _:
+            return []
@@ -0,0 +1,249 @@
+from typing import Callable, Optional
+
+from compiler.ast import (
+    BinaryOp,
+    BlockExpression,
+    BreakExpression,
+    ContinueExpression,
+    ErrorExpression,
+    Expression,
+    FunctionExpression,
+    Identifier,
+    IfExpression,
+    Literal,
+    TypeExpression,
+    VariableDeclarationExpression,
+    WhileExpression,
+)
+from compiler.ast_arena import AstArena, type_expression_classes
+from compiler.type import Type
+
+# The views of `AstArena.view`. They subclass the AST dataclasses, which
+# the mypyc build compiles into classes that interpreted code cannot
+# subclass, so this module is left out of the build and only imported
+# when a view is made.
+
+
+def _read_only(name: str) -> AttributeError:
+    return AttributeError(f"{name} of an arena node cannot be assigned")
+
+
+class ArenaView:
+    """The part of every view that is the same for all node kinds. A view
+    class lists it before its dataclass, so its `type` property replaces
+    the dataclass field."""
+
+    arena: AstArena
+    handle: int
+
+    def __init__(self, arena: AstArena, handle: int) -> None:
+        self.arena = arena
+        self.handle = handle
+
+    @property
+    def type(self) -> Type:
+        return self.arena.type(self.handle)
+
+    @type.setter
+    def type(self, t: Type) -> None:
+        self.arena.set_type(self.handle, t)
+
+
+# Every view class overrides the other fields of its dataclass with
+# properties that read the arena.
+
+
+class LiteralView(ArenaView, Literal):
+    @property
+    def value(self) -> int | bool | None:
+        return self.arena.value(self.handle)
+
+    @value.setter
+    def value(self, value: int | bool | None) -> None:
+        raise _read_only("value")
+
+
+class IdentifierView(ArenaView, Identifier):
+    @property
+    def name(self) -> str:
+        return self.arena.name(self.handle)
+
+    @name.setter
+    def name(self, name: str) -> None:
+        raise _read_only("name")
+
+
+class BinaryOpView(ArenaView, BinaryOp):
+    @property
+    def left(self) -> Expression | None:
+        if self.arena.child_counts[self.handle] == 1:
+            return None
+        return self.arena.view(self.arena.child(self.handle, 0))
+
+    @left.setter
+    def left(self, left: Expression | None) -> None:
+        raise _read_only("left")
+
+    @property
+    def op(self) -> str:
+        return self.arena.name(self.handle)
+
+    @op.setter
+    def op(self, op: str) -> None:
+        raise _read_only("op")
+
+    @property
+    def right(self) -> Expression:
+        last = self.arena.child_counts[self.handle] - 1
+        return self.arena.view(self.arena.child(self.handle, last))
+
+    @right.setter
+    def right(self, right: Expression) -> None:
+        raise _read_only("right")
+
+
+class IfExpressionView(ArenaView, IfExpression):
+    @property
+    def condition(self) -> Expression:
+        return self.arena.view(self.arena.child(self.handle, 0))
+
+    @condition.setter
+    def condition(self, condition: Expression) -> None:
+        raise _read_only("condition")
+
+    @property
+    def then_clause(self) -> Expression:
+        return self.arena.view(self.arena.child(self.handle, 1))
+
+    @then_clause.setter
+    def then_clause(self, then_clause: Expression) -> None:
+        raise _read_only("then_clause")
+
+    @property
+    def else_clause(self) -> Expression | None:
+        if self.arena.child_counts[self.handle] < 3:
+            return None
+        return self.arena.view(self.arena.child(self.handle, 2))
+
+    @else_clause.setter
+    def else_clause(self, else_clause: Expression | None) -> None:
+        raise _read_only("else_clause")
+
+
+class FunctionExpressionView(ArenaView, FunctionExpression):
+    @property
+    def name(self) -> str:
+        return self.arena.name(self.handle)
+
+    @name.setter
+    def name(self, name: str) -> None:
+        raise _read_only("name")
+
+    @property
+    def arguments(self) -> list[Expression]:
+        return [self.arena.view(h) for h in self.arena.children_of(self.handle)]
+
+    @arguments.setter
+    def arguments(self, arguments: list[Expression]) -> None:
+        raise _read_only("arguments")
+
+
+class BlockExpressionView(ArenaView, BlockExpression):
+    @property
+    def expressions(self) -> list[Expression]:
+        handles = self.arena.children_of(self.handle)
+        return [self.arena.view(h) for h in handles[:-1]]
+
+    @expressions.setter
+    def expressions(self, expressions: list[Expression]) -> None:
+        raise _read_only("expressions")
+
+    @property
+    def result(self) -> Expression:
+        last = self.arena.child_counts[self.handle] - 1
+        return self.arena.view(self.arena.child(self.handle, last))
+
+    @result.setter
+    def result(self, result: Expression) -> None:
+        raise _read_only("result")
+
+
+class VariableDeclarationExpressionView(ArenaView, VariableDeclarationExpression):
+    @property
+    def name(self) -> str:
+        return self.arena.name(self.handle)
+
+    @name.setter
+    def name(self, name: str) -> None:
+        raise _read_only("name")
+
+    @property
+    def value(self) -> Expression:
+        return self.arena.view(self.arena.child(self.handle, 0))
+
+    @value.setter
+    def value(self, value: Expression) -> None:
+        raise _read_only("value")
+
+    @property
+    def type_expression(self) -> Optional[TypeExpression]:
+        type_expression = type_expression_classes[self.arena.flags[self.handle] >> 1]
+        return type_expression() if type_expression is not None else None
+
+    @type_expression.setter
+    def type_expression(self, type_expression: Optional[TypeExpression]) -> None:
+        raise _read_only("type_expression")
+
+    @property
+    def is_const(self) -> Optional[bool]:
+        return self.arena.flags[self.handle] & 1 == 1
+
+    @is_const.setter
+    def is_const(self, is_const: Optional[bool]) -> None:
+        raise _read_only("is_const")
+
+
+class WhileExpressionView(ArenaView, WhileExpression):
+    @property
+    def condition(self) -> Expression:
+        return self.arena.view(self.arena.child(self.handle, 0))
+
+    @condition.setter
+    def condition(self, condition: Expression) -> None:
+        raise _read_only("condition")
+
+    @property
+    def body(self) -> BlockExpression:
+        return BlockExpressionView(self.arena, self.arena.child(self.handle, 1))
+
+    @body.setter
+    def body(self, body: BlockExpression) -> None:
+        raise _read_only("body")
+
+
+class BreakExpressionView(ArenaView, BreakExpression):
+    pass
+
+
+class ContinueExpressionView(ArenaView, ContinueExpression):
+    pass
+
+
+class ErrorExpressionView(ArenaView, ErrorExpression):
+    pass
+
+
+# The view class of every node kind, in the order of `node_classes`
+view_classes: list[Callable[[AstArena, int], Expression]] = [
+    LiteralView,
+    IdentifierView,
+    BinaryOpView,
+    IfExpressionView,
+    FunctionExpressionView,
+    BlockExpressionView,
+    VariableDeclarationExpressionView,
+    WhileExpressionView,
+    BreakExpressionView,
+    ContinueExpressionView,
+    ErrorExpressionView,
+]
@@ -1,28 +1,37 @@
 from compiler.ir import IRVar
-from compiler.type import Unit, Type, Int
+from compiler.type import Unit, Type, Int, Bool
 
-builtin_unit_types: dict[IRVar, Type] = {
+# The type of each global name in the IR: the built-in operators and functions
+builtin_types: dict[IRVar, Type] = {
+    # Assignment and the unary operators are typed by their own rules
     IRVar(name): Unit
-    for name in [
-        "=",
-        "+",
-        "-",
-        "*",
-        "/",
-        "%",
-        ">",
-        "<",
-        ">=",
-        "<=",
-        "==",
-        "!=",
-        "and",
-        "or",
-        "unary_-",
-        "unary_not",
-        "print_int",
-        "print_bool",
-    ]
+    for name in ["=", "unary_-", "unary_not"]
 }
 
-builtin_types: dict[IRVar, Type] = {**builtin_unit_types, IRVar("read_int"): Int}
+# The types of the arguments and of the result of each built-in that the
+# type checker looks up by name. A const argument does not match the
+# base type of its const type.
+builtin_signatures: dict[str, tuple[tuple[Type, ...], Type]] = {}
+
+
+def register_builtin(
+    name: str, argument_types: tuple[Type, ...], result_type: Type
+) -> None:
+    """Makes a built-in operator or function known to the type checker
+    and the IR generator."""
+    builtin_types[IRVar(name)] = result_type
+    builtin_signatures[name] = (argument_types, result_type)
+
+
+for operator in ["+", "-", "*", "/", "%"]:
+    register_builtin(operator, (Int, Int), Int)
+
+for operator in ["<", ">", "<=", ">=", "==", "!="]:
+    register_builtin(operator, (Int, Int), Bool)
+
+for operator in ["and", "or"]:
+    register_builtin(operator, (Bool, Bool), Bool)
+
+register_builtin("print_int", (Int,), Int)
+register_builtin("print_bool", (Bool,), Bool)
+register_builtin("read_int", (), Int)
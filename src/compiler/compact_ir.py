@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+from array import array
+from typing import Iterable
+
+import compiler.ir as ir
+
+# The opcode of each kind of instruction. Integers that do not fit in
+# 64 bits are loaded by LOAD_BIG_INT_CONST, whose operand is their index
+# in `big_ints`.
+LABEL = 0
+LOAD_INT_CONST = 1
+LOAD_BIG_INT_CONST = 2
+LOAD_BOOL_CONST = 3
+COPY = 4
+CALL = 5
+JUMP = 6
+COND_JUMP = 7
+RETURN = 8
+
+# The instruction class of every opcode, indexed by the opcode
+instruction_classes: list[type[ir.Instruction]] = [
+    ir.Label,
+    ir.LoadIntConst,
+    ir.LoadIntConst,
+    ir.LoadBoolConst,
+    ir.Copy,
+    ir.Call,
+    ir.Jump,
+    ir.CondJump,
+    ir.Return,
+]
+
+
+class CompactIr:
+    """Stores IR instructions as columns of integers instead of one object
+    per instruction.
+
+    Instruction `i` is `opcodes[i]` with the variable `dests[i]`, or -1,
+    and the operands `a[i]`, `b[i]` and `c[i]`:
+
+    - LABEL: a is the label
+    - LOAD_INT_CONST, LOAD_BOOL_CONST: a is the value
+    - LOAD_BIG_INT_CONST: a is the index of the value in `big_ints`
+    - COPY: a is the source variable
+    - CALL: a is the function, and its arguments are the `c` variables
+      in `args` from index b
+    - JUMP: a is the label
+    - COND_JUMP: a is the condition, b and c the then and else labels
+
+    Variables and labels are dense integer ids. Their names are only
+    kept in `var_names` and `label_names`, for printing.
+
+    The instructions are encoded when it is created, and read back as
+    `Instruction` objects with `instruction`."""
+
+    opcodes: array[int]
+    dests: array[int]
+    a: array[int]
+    b: array[int]
+    c: array[int]
+    args: array[int]
+    var_names: list[str]
+    label_names: list[str]
+    big_ints: list[int]
+
+    def __init__(self, instructions: Iterable[ir.Instruction] = ()) -> None:
+        self.opcodes = array("B")
+        self.dests = array("q")
+        self.a = array("q")
+        self.b = array("q")
+        self.c = array("q")
+        self.args = array("q")
+        self.var_names = []
+        self.label_names = []
+        self.big_ints = []
+
+        # The id of each name, only needed while encoding
+        var_ids: dict[str, int] = {}
+        label_ids: dict[str, int] = {}
+
+        for instruction in instructions:
+            self._add(instruction, var_ids, label_ids)
+
+    def __len__(self) -> int:
+        return len(self.opcodes)
+
+    def _var(self, name: str, var_ids: dict[str, int]) -> int:
+        var_id = var_ids.get(name)
+
+        if var_id is None:
+            var_id = var_ids[name] = len(self.var_names)
+            self.var_names.append(name)
+
+        return var_id
+
+    def _label(self, name: str, label_ids: dict[str, int]) -> int:
+        label_id = label_ids.get(name)
+
+        if label_id is None:
+            label_id = label_ids[name] = len(self.label_names)
+            self.label_names.append(name)
+
+        return label_id
+
+    def _add(
+        self,
+        instruction: ir.Instruction,
+        var_ids: dict[str, int],
+        label_ids: dict[str, int],
+    ) -> None:
+        dest = -1
+        a = b = c = 0
+
+        match instruction:
+            case ir.Label():
+                opcode = LABEL
+                a = self._label(instruction.name, label_ids)
+            case ir.LoadIntConst():
+                opcode = LOAD_INT_CONST
+                dest = self._var(instruction.dest.name, var_ids)
+                a = instruction.value
+
+                if not -(2**63) <= a < 2**63:
+                    opcode = LOAD_BIG_INT_CONST
+                    a = len(self.big_ints)
+                    self.big_ints.append(instruction.value)
+            case ir.LoadBoolConst():
+                opcode = LOAD_BOOL_CONST
+                dest = self._var(instruction.dest.name, var_ids)
+                a = int(instruction.value)
+            case ir.Copy():
+                opcode = COPY
+                a = self._var(instruction.source.name, var_ids)
+                dest = self._var(instruction.dest.name, var_ids)
+            case ir.Call():
+                opcode = CALL
+                a = self._var(instruction.fun.name, var_ids)
+                b = len(self.args)
+                c = len(instruction.args)
+                self.args.extend(
+                    [self._var(arg.name, var_ids) for arg in instruction.args]
+                )
+                dest = self._var(instruction.dest.name, var_ids)
+            case ir.Jump():
+                opcode = JUMP
+                a = self._label(instruction.label.name, label_ids)
+            case ir.CondJump():
+                opcode = COND_JUMP
+                a = self._var(instruction.cond.name, var_ids)
+                b = self._label(instruction.then_label.name, label_ids)
+                c = self._label(instruction.else_label.name, label_ids)
+            case ir.Return():
+                opcode = RETURN
+            case _:
+                raise ValueError(f"Unknown instruction: {instruction}")
+
+        self.opcodes.append(opcode)
+        self.dests.append(dest)
+        self.a.append(a)
+        self.b.append(b)
+        self.c.append(c)
+
+    def instruction_class(self, i: int) -> type[ir.Instruction]:
+        return instruction_classes[self.opcodes[i]]
+
+    def call_args(self, i: int) -> array[int]:
+        """Returns the argument variables of the call at `i`."""
+        start = self.b[i]
+        return self.args[start : start + self.c[i]]
+
+    def variables(self, i: int) -> list[int]:
+        """Returns the variables that instruction `i` reads and writes,
+        in the order of the fields of its class."""
+        match self.opcodes[i]:
+            case 1 | 2 | 3:  # LOAD_INT_CONST, LOAD_BIG_INT_CONST, LOAD_BOOL_CONST
+                return [self.dests[i]]
+            case 4:  # COPY
+                return [self.a[i], self.dests[i]]
+            case 5:  # CALL
+                return [self.a[i], *self.call_args(i), self.dests[i]]
+            case 7:  # COND_JUMP
+                return [self.a[i]]
+            case _:
+                return []
+
+    def instruction(self, i: int) -> ir.Instruction:
+        """Builds the `Instruction` object of instruction `i`."""
+        a = self.a[i]
+
+        match self.opcodes[i]:
+            case 0:  # LABEL
+                return ir.Label(self.label_names[a])
+            case 1:  # LOAD_INT_CONST
+                return ir.LoadIntConst(a, self._ir_var(self.dests[i]))
+            case 2:  # LOAD_BIG_INT_CONST
+                return ir.LoadIntConst(self.big_ints[a], self._ir_var(self.dests[i]))
+            case 3:  # LOAD_BOOL_CONST
+                return ir.LoadBoolConst(a != 0, self._ir_var(self.dests[i]))
+            case 4:  # COPY
+                return ir.Copy(self._ir_var(a), self._ir_var(self.dests[i]))
+            case 5:  # CALL
+                return ir.Call(
+                    self._ir_var(a),
+                    [self._ir_var(arg) for arg in self.call_args(i)],
+                    self._ir_var(self.dests[i]),
+                )
+            case 6:  # JUMP
+                return ir.Jump(ir.Label(self.label_names[a]))
+            case 7:  # COND_JUMP
+                return ir.CondJump(
+                    self._ir_var(a),
+                    ir.Label(self.label_names[self.b[i]]),
+                    ir.Label(self.label_names[self.c[i]]),
+                )
+            case _:
+                return ir.Return()
+
+    def instructions(self) -> list[ir.Instruction]:
+        return [self.instruction(i) for i in range(len(self))]
+
+    def format(self, i: int) -> str:
+        """Returns `str` of the `Instruction` of instruction `i`,
+        without building it."""
+        a = self.a[i]
+        names = self.var_names
+
+        match self.opcodes[i]:
+            case 0:  # LABEL
+                return f"Label({self.label_names[a]})"
+            case 1:  # LOAD_INT_CONST
+                return f"LoadIntConst({a}, {names[self.dests[i]]})"
+            case 2:  # LOAD_BIG_INT_CONST
+                return f"LoadIntConst({self.big_ints[a]}, {names[self.dests[i]]})"
+            case 3:  # LOAD_BOOL_CONST
+                return f"LoadBoolConst({a != 0}, {names[self.dests[i]]})"
+            case 4:  # COPY
+                return f"Copy({names[a]}, {names[self.dests[i]]})"
+            case 5:  # CALL
+                args = ", ".join(names[arg] for arg in self.call_args(i))
+                return f"Call({names[a]}, [{args}], {names[self.dests[i]]})"
+            case 6:  # JUMP
+                return f"Jump(Label({self.label_names[a]}))"
+            case 7:  # COND_JUMP
+                return (
+                    f"CondJump({names[a]}, Label({self.label_names[self.b[i]]}),"
+                    f" Label({self.label_names[self.c[i]]}))"
+                )
+            case _:
+                return "Return()"
+
+    def _ir_var(self, var_id: int) -> ir.IRVar:
+        return ir.IRVar(self.var_names[var_id])
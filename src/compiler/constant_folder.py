@@ -0,0 +1,385 @@
+import operator
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from compiler.ast import (
+    BinaryOp,
+    BlockExpression,
+    BreakExpression,
+    ContinueExpression,
+    Expression,
+    FunctionExpression,
+    Identifier,
+    IfExpression,
+    Literal,
+    VariableDeclarationExpression,
+    WhileExpression,
+)
+from compiler.dispatch import find_handler
+from compiler.trampoline import Trampoline, max_direct_depth, run
+from compiler.type import Unit
+
+# Integers are 64-bit two's complement in the compiled program
+min_int = -(2**63)
+max_int = 2**63 - 1
+
+
+def wrap(value: int) -> int:
+    """Wraps an integer around to 64 bits, like the instructions of the
+    intrinsics do."""
+    return (value - min_int) % 2**64 + min_int
+
+
+def divide(a: int, b: int) -> Optional[int]:
+    """Divides rounding towards zero, like `idivq`. Returns None where
+    `idivq` faults, so the fault still happens at run time."""
+    if b == 0 or (a == min_int and b == -1):
+        return None
+
+    quotient = abs(a) // abs(b)
+    return quotient if (a < 0) == (b < 0) else -quotient
+
+
+def remainder(a: int, b: int) -> Optional[int]:
+    """The remainder of `divide`, with the sign of `a`."""
+    quotient = divide(a, b)
+    return None if quotient is None else a - b * quotient
+
+
+# The value of each arithmetic operator, or None if it is not folded
+int_operators: dict[str, Callable[[int, int], Optional[int]]] = {
+    "+": lambda a, b: wrap(a + b),
+    "-": lambda a, b: wrap(a - b),
+    "*": lambda a, b: wrap(a * b),
+    "/": divide,
+    "%": remainder,
+}
+
+# Kept apart from `int_operators`, since a value typed `int | bool` would
+# lose its boolean type when compiled with mypyc
+comparison_operators: dict[str, Callable[[int, int], bool]] = {
+    "<": operator.lt,
+    ">": operator.gt,
+    "<=": operator.le,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+
+def int_value(node: Expression) -> Optional[int]:
+    """The value of an integer literal that fits in 64 bits, or None."""
+    if isinstance(node, Literal) and type(node.value) is int:
+        if min_int <= node.value <= max_int:
+            return node.value
+
+    return None
+
+
+def bool_value(node: Expression) -> Optional[bool]:
+    """The value of a boolean literal, or None."""
+    if isinstance(node, Literal) and isinstance(node.value, bool):
+        return node.value
+
+    return None
+
+
+@dataclass
+class ConstantFolding:
+    """The result of `fold_constants`."""
+
+    expression: Expression
+    # The operations that were computed
+    folded_operations: int
+    # The uses of constants that were replaced by their value
+    substituted_constants: int
+    # The conditions that were known, so a branch or loop was removed
+    pruned_branches: int
+
+
+def fold_constants(expression: Expression) -> ConstantFolding:
+    """Computes the parts of a type-checked AST whose value is known when
+    compiling, and returns the simplified AST. The nodes are changed in
+    place, and a replacement node keeps the type of the node it replaces.
+
+    - Operators on literals are computed with the 64-bit semantics of the
+      compiled program. A division that would fault is kept.
+    - A `const` whose value is a literal is replaced by it, unless the
+      program assigns to its name anywhere.
+    - An `if` or `while` with a literal condition keeps only the branch
+      that runs, and literals in blocks whose value is unused are removed.
+
+    An expression that folds to a literal has no side effects, since only
+    calls and assignments have them and neither is folded away."""
+    folder = ConstantFolder(assigned_names(expression))
+    expression = run(folder.fold(expression))
+
+    return ConstantFolding(
+        expression=expression,
+        folded_operations=folder.folded_operations,
+        substituted_constants=folder.substituted_constants,
+        pruned_branches=folder.pruned_branches,
+    )
+
+
+def assigned_names(expression: Expression) -> set[str]:
+    """The names that are assigned to anywhere in the AST."""
+    names = set()
+    stack = [expression]
+
+    while stack:
+        node = stack.pop()
+
+        if (
+            isinstance(node, BinaryOp)
+            and node.op == "="
+            and isinstance(node.left, Identifier)
+        ):
+            names.add(node.left.name)
+
+        for name in node.__dataclass_fields__:
+            value = getattr(node, name)
+
+            if isinstance(value, Expression):
+                stack.append(value)
+            elif isinstance(value, list):
+                stack.extend(value)
+
+    return names
+
+
+class ConstantFolder:
+    """The state of folding one AST. See `fold_constants`.
+
+    The constants in scope are kept like the types of `TypeEnvironment`:
+    every name has one entry, and leaving a block restores the entries its
+    declarations replaced."""
+
+    # The literal value of each name in scope, or None if it is not
+    # a constant with a known value
+    constants: dict[str, Optional[Literal]]
+    undo_log: list[tuple[str, Optional[Literal]]]
+    scope_starts: list[int]
+    # Constants with these names are not replaced, since they may change
+    assigned: set[str]
+    folded_operations: int
+    substituted_constants: int
+    pruned_branches: int
+
+    def __init__(self, assigned: set[str]) -> None:
+        self.constants = {}
+        self.undo_log = []
+        self.scope_starts = []
+        self.assigned = assigned
+        self.folded_operations = 0
+        self.substituted_constants = 0
+        self.pruned_branches = 0
+
+    def declare(self, name: str, value: Optional[Literal]) -> None:
+        if self.scope_starts:
+            self.undo_log.append((name, self.constants.get(name)))
+
+        self.constants[name] = value
+
+    def enter_scope(self) -> None:
+        self.scope_starts.append(len(self.undo_log))
+
+    def leave_scope(self) -> None:
+        start = self.scope_starts.pop()
+
+        while len(self.undo_log) > start:
+            name, value = self.undo_log.pop()
+            self.constants[name] = value
+
+    def folded(self, node: Expression, value: int | bool | None) -> Literal:
+        self.folded_operations += 1
+        return Literal(value, type=node.type)
+
+    # Returns the generator of the 'fold_*' method for the class of the
+    # node, which returns the node or its replacement. Nested nodes are
+    # folded with 'yield from', and through the trampoline every
+    # 'max_direct_depth' levels.
+    def fold(self, node: Expression, depth: int = 0) -> Trampoline[Expression]:
+        if depth >= max_direct_depth:
+            return self.fold_later(node)
+
+        handler = find_handler(fold_handlers, type(node))
+
+        if handler is None:
+            raise Exception(f"Unsupported expression: {type(node)}")
+
+        return handler(self, node, depth)
+
+    def fold_later(self, node: Expression) -> Trampoline[Expression]:
+        return (yield self.fold(node))
+
+    # Handlers of nodes without nested nodes end with an unreachable
+    # 'yield', which makes them generators like every other handler.
+
+    def fold_leaf(self, node: Expression, depth: int) -> Trampoline[Expression]:
+        return node
+        yield
+
+    def fold_identifier(self, node: Identifier, depth: int) -> Trampoline[Expression]:
+        value = self.constants.get(node.name)
+
+        if value is None:
+            return node
+
+        self.substituted_constants += 1
+        return Literal(value.value, type=node.type)
+        yield
+
+    def fold_binary_op(self, node: BinaryOp, depth: int) -> Trampoline[Expression]:
+        if node.left is None:
+            node.right = yield from self.fold(node.right, depth + 1)
+            int_operand = int_value(node.right)
+            bool_operand = bool_value(node.right)
+
+            if node.op == "-" and int_operand is not None:
+                return self.folded(node, wrap(-int_operand))
+            if node.op == "not" and bool_operand is not None:
+                return self.folded(node, not bool_operand)
+
+            return node
+
+        # The left-hand side of an assignment is not a value
+        if node.op == "=":
+            node.right = yield from self.fold(node.right, depth + 1)
+            return node
+
+        node.left = yield from self.fold(node.left, depth + 1)
+
+        # A known left operand decides whether the right one is evaluated
+        if node.op in ["and", "or"]:
+            bool_left = bool_value(node.left)
+
+            if bool_left is None:
+                node.right = yield from self.fold(node.right, depth + 1)
+                return node
+
+            if bool_left == (node.op == "and"):
+                self.folded_operations += 1
+                return (yield from self.fold(node.right, depth + 1))
+
+            return self.folded(node, bool_left)
+
+        node.right = yield from self.fold(node.right, depth + 1)
+
+        left = int_value(node.left)
+        right = int_value(node.right)
+
+        if left is None or right is None:
+            return node
+
+        int_operator = int_operators.get(node.op)
+        if int_operator is not None:
+            value = int_operator(left, right)
+            return node if value is None else self.folded(node, value)
+
+        comparison_operator = comparison_operators.get(node.op)
+        if comparison_operator is not None:
+            return self.folded(node, comparison_operator(left, right))
+
+        return node
+
+    def fold_if(self, node: IfExpression, depth: int) -> Trampoline[Expression]:
+        node.condition = condition = yield from self.fold(node.condition, depth + 1)
+
+        known_condition = bool_value(condition)
+
+        if known_condition is not None:
+            self.pruned_branches += 1
+
+            if known_condition:
+                then_clause = yield from self.fold(node.then_clause, depth + 1)
+
+                if node.else_clause is None:
+                    # The value of an `if` without `else` is Unit
+                    return BlockExpression([then_clause], type=Unit)
+
+                return then_clause
+
+            if node.else_clause is None:
+                return Literal(None, type=Unit)
+
+            return (yield from self.fold(node.else_clause, depth + 1))
+
+        node.then_clause = yield from self.fold(node.then_clause, depth + 1)
+
+        if node.else_clause is not None:
+            node.else_clause = yield from self.fold(node.else_clause, depth + 1)
+
+        return node
+
+    def fold_function(
+        self, node: FunctionExpression, depth: int
+    ) -> Trampoline[Expression]:
+        for i, argument in enumerate(node.arguments):
+            node.arguments[i] = yield from self.fold(argument, depth + 1)
+
+        return node
+
+    def fold_block(self, node: BlockExpression, depth: int) -> Trampoline[Expression]:
+        self.enter_scope()
+
+        expressions = []
+        for expression in node.expressions:
+            expression = yield from self.fold(expression, depth + 1)
+
+            # The value of a literal statement is unused
+            if not isinstance(expression, Literal):
+                expressions.append(expression)
+
+        node.expressions = expressions
+        node.result = yield from self.fold(node.result, depth + 1)
+
+        self.leave_scope()
+
+        if not expressions and isinstance(node.result, Literal):
+            return Literal(node.result.value, type=node.type)
+
+        return node
+
+    def fold_variable_declaration(
+        self, node: VariableDeclarationExpression, depth: int
+    ) -> Trampoline[Expression]:
+        node.value = value = yield from self.fold(node.value, depth + 1)
+
+        if (
+            node.is_const
+            and isinstance(value, Literal)
+            and node.name not in self.assigned
+        ):
+            self.declare(node.name, value)
+        else:
+            self.declare(node.name, None)
+
+        return node
+
+    def fold_while(self, node: WhileExpression, depth: int) -> Trampoline[Expression]:
+        node.condition = condition = yield from self.fold(node.condition, depth + 1)
+
+        if bool_value(condition) is False:
+            self.pruned_branches += 1
+            return Literal(None, type=Unit)
+
+        # The body stays a block, whatever it folds to
+        yield from self.fold(node.body, depth + 1)
+        return node
+
+
+fold_handlers: dict[
+    type, Callable[[ConstantFolder, Any, int], Trampoline[Expression]]
+] = {
+    Literal: ConstantFolder.fold_leaf,
+    Identifier: ConstantFolder.fold_identifier,
+    BinaryOp: ConstantFolder.fold_binary_op,
+    IfExpression: ConstantFolder.fold_if,
+    FunctionExpression: ConstantFolder.fold_function,
+    BlockExpression: ConstantFolder.fold_block,
+    VariableDeclarationExpression: ConstantFolder.fold_variable_declaration,
+    WhileExpression: ConstantFolder.fold_while,
+    BreakExpression: ConstantFolder.fold_leaf,
+    ContinueExpression: ConstantFolder.fold_leaf,
+}
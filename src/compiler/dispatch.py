@@ -0,0 +1,21 @@
+from typing import Optional, TypeVar
+
+H = TypeVar("H")
+
+
+def find_handler(handlers: dict[type, H], cls: type) -> Optional[H]:
+    """Returns the handler of `cls` in a table keyed by node or instruction
+    class. A subclass without an entry of its own, such as an arena view,
+    uses the handler of its nearest base class, which is then added to
+    the table so the next lookup is a single dict access."""
+    handler = handlers.get(cls)
+
+    if handler is None:
+        for base in cls.__mro__[1:]:
+            handler = handlers.get(base)
+
+            if handler is not None:
+                handlers[cls] = handler
+                break
+
+    return handler
@@ -0,0 +1,118 @@
+import sys
+from dataclasses import dataclass
+from compiler.ast import (
+    Expression,
+    Identifier,
+    TypeExpression,
+    VariableDeclarationExpression,
+)
+
+
+@dataclass
+class HashConsing:
+    """The result of `hash_cons`."""
+
+    # The ids of the subtrees that now occur more than once in the AST
+    shared: set[int]
+    nodes: int
+    unique_nodes: int
+    # The size of the nodes that were replaced by an identical one
+    bytes_saved: int
+
+    @property
+    def dedup_ratio(self) -> float:
+        """The share of the nodes that were replaced."""
+        return 1 - self.unique_nodes / self.nodes if self.nodes else 0.0
+
+
+def hash_cons(expression: Expression) -> HashConsing:
+    """Replaces structurally identical closed subtrees of an AST with a single
+    instance of each, so the AST becomes a graph. A subtree is closed when it
+    has no identifiers and declares no variables: its type and its code do
+    not depend on where it is. Pass `shared` to `typecheck` in a `TypeMemo`
+    to check each shared subtree once."""
+    # The single instance of each closed subtree, by its structure
+    table: dict[tuple[object, ...], Expression] = {}
+    # What each node processed so far is replaced with, and whether it is closed
+    replacements: dict[int, tuple[Expression, bool]] = {}
+    uses: dict[int, int] = {}
+    nodes = 0
+    bytes_saved = 0
+
+    # Nodes are processed after their children. Parsed ASTs can be too deep
+    # for recursion, so the traversal keeps its own stack.
+    stack: list[tuple[Expression, bool]] = [(expression, False)]
+
+    while stack:
+        node, children_done = stack.pop()
+
+        if not children_done:
+            stack.append((node, True))
+            stack.extend((child, False) for child in _children(node))
+            continue
+
+        nodes += 1
+        closed = not isinstance(node, Identifier | VariableDeclarationExpression)
+        key: list[object] = [type(node)]
+
+        for name in node.__dataclass_fields__:
+            value = getattr(node, name)
+
+            if isinstance(value, Expression):
+                value, child_closed = replacements.pop(id(value))
+                setattr(node, name, value)
+                closed = closed and child_closed
+                key.append(id(value))
+            elif isinstance(value, list):
+                for i, element in enumerate(value):
+                    value[i], child_closed = replacements.pop(id(element))
+                    closed = closed and child_closed
+                key.append(tuple(id(element) for element in value))
+            elif isinstance(value, TypeExpression):
+                key.append(type(value))
+            elif name != "type":
+                # 1 and True are equal, so their type is part of the key
+                key.append((type(value), value))
+
+        replacement = node
+        if closed:
+            replacement = table.setdefault(tuple(key), node)
+            uses[id(replacement)] = uses.get(id(replacement), 0) + 1
+
+            if replacement is not node:
+                bytes_saved += _size(node)
+
+        replacements[id(node)] = (replacement, closed)
+
+    return HashConsing(
+        shared={node_id for node_id, count in uses.items() if count > 1},
+        nodes=nodes,
+        unique_nodes=nodes - sum(count - 1 for count in uses.values()),
+        bytes_saved=bytes_saved,
+    )
+
+
+def _children(node: Expression) -> list[Expression]:
+    children = []
+
+    for name in node.__dataclass_fields__:
+        value = getattr(node, name)
+
+        if isinstance(value, Expression):
+            children.append(value)
+        elif isinstance(value, list):
+            children.extend(value)
+
+    return children
+
+
+def _size(node: Expression) -> int:
+    size = sys.getsizeof(node)
+
+    for name in node.__dataclass_fields__:
+        value = getattr(node, name)
+
+        if isinstance(value, list):
+            size += sys.getsizeof(value)
+
+    return size
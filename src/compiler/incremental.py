@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field, fields
+from typing import Callable, Optional
+
+from compiler.ast import BlockExpression, Expression, Literal
+from compiler.parser import parse
+from compiler.parser_exception import EndOfInputException
+from compiler.token import Tokens, TokenType
+from compiler.tokenizer import tokenize
+from compiler.type import Type
+from compiler.type_checker import TypeEnvironment, typecheck
+
+# The type checker environment is saved before every this many statements
+checkpoint_interval = 1024
+
+
+@dataclass
+class Edit:
+    """Replaces `removed` characters at `offset` with `inserted`."""
+
+    offset: int
+    removed: int
+    inserted: str
+
+
+@dataclass
+class Statement:
+    """A top-level statement of a program.
+
+    `declarations` lists the identifiers the statement added to the
+    type checker's environment, so the environment before any statement
+    can be rebuilt without type checking the statements before it."""
+
+    expression: Expression
+    last_token: str
+    declarations: list[tuple[str, Type]] = field(default_factory=list)
+    parse_error: Optional[Exception] = None
+    type_error: Optional[Exception] = None
+
+
+@dataclass
+class Compilation:
+    """The front-end state of a program, split into top-level statements.
+
+    `starts` and `ends` hold the source span of every statement. Moving
+    the spans after an edit is deferred: the spans from `shift_from` on
+    are stored `shift` characters early, so repeated edits in one place
+    do not rewrite the spans of the whole rest of the program."""
+
+    source_code: str
+    statements: list[Statement]
+    starts: array[int]
+    ends: array[int]
+    shift_from: int = 0
+    shift: int = 0
+    environments: list[dict[str, Type]] = field(default_factory=lambda: [{}])
+
+    @property
+    def diagnostics(self) -> list[Exception]:
+        parse_errors = [s.parse_error for s in self.statements if s.parse_error]
+        if parse_errors:
+            return parse_errors
+
+        if len(self.statements) > 1 and self.statements[0].last_token != ";":
+            return [EndOfInputException()]
+
+        return [s.type_error for s in self.statements if s.type_error]
+
+    def spans(self) -> list[tuple[int, int]]:
+        return [(self.start(i), self.end(i)) for i in range(len(self.statements))]
+
+    def start(self, i: int) -> int:
+        return self.starts[i] + (self.shift if i >= self.shift_from else 0)
+
+    def end(self, i: int) -> int:
+        return self.ends[i] + (self.shift if i >= self.shift_from else 0)
+
+    def expression(self) -> Expression:
+        """Builds the program's AST the same way `parse` does."""
+        if len(self.statements) == 0:
+            return Literal(None)
+
+        if len(self.statements) == 1 and self.statements[0].last_token != ";":
+            return self.statements[0].expression
+
+        expressions = [s.expression for s in self.statements]
+        result: Expression = Literal(None)
+
+        if self.statements[-1].last_token not in {";", "}"}:
+            result = expressions.pop()
+
+        return BlockExpression(expressions, result, type=result.type)
+
+
+class _DeclarationLog(TypeEnvironment):
+    """A type checker environment that records every declaration
+    outside of blocks."""
+
+    log: list[tuple[str, Type]]
+
+    def declare(self, name: str, t: Type) -> None:
+        if not self.scope_starts:
+            self.log.append((name, t))
+
+        super().declare(name, t)
+
+
+class _CommentFound(Exception):
+    pass
+
+
+def compile_source(source_code: str) -> Compilation:
+    """Parses and type checks a whole program."""
+    starts, ends, statements = _parse_statements(source_code, 0, len(source_code))
+    compilation = Compilation(source_code, statements, starts, ends, len(statements))
+
+    _typecheck_statements(compilation, 0, len(statements))
+
+    return compilation
+
+
+def recompile(compilation: Compilation, edit: Edit) -> None:
+    """Applies `edit` to a compiled program in place. Only the top-level
+    statements touched by the edit are tokenized, parsed and type checked
+    again. The other statements keep their AST, including its types."""
+    statements = compilation.statements
+    old_source_code = compilation.source_code
+    source_code = (
+        old_source_code[: edit.offset]
+        + edit.inserted
+        + old_source_code[edit.offset + edit.removed :]
+    )
+    edit_end = edit.offset + edit.removed
+    delta = len(edit.inserted) - edit.removed
+
+    # The touched statements are [first, last)
+    first = __bisect(compilation, compilation.ends, edit.offset, bisect_left)
+    last = __bisect(compilation, compilation.starts, edit_end, bisect_right)
+
+    # A statement without a semicolon could continue into the next one
+    while first > 0 and statements[first - 1].last_token != ";":
+        first -= 1
+
+    while True:
+        region_start = edit.offset
+        region_end = edit_end
+
+        if first < last:
+            region_start = min(region_start, compilation.start(first))
+            region_end = max(region_end, compilation.end(last - 1))
+
+        if last == len(statements):
+            region_end = len(old_source_code)
+
+        try:
+            starts, ends, new_statements = _parse_statements(
+                source_code, region_start, region_end + delta
+            )
+        except _CommentFound:
+            # A comment could hide or reveal any amount of the following code
+            recompiled = compile_source(source_code)
+
+            for f in fields(Compilation):
+                setattr(compilation, f.name, getattr(recompiled, f.name))
+
+            return
+
+        if last == len(statements) or len(new_statements) == 0:
+            break
+
+        if new_statements[-1].parse_error is not None:
+            # Like a full parse, give up on everything after a syntax error
+            last = len(statements)
+        elif new_statements[-1].last_token != ";":
+            while last < len(statements) and statements[last].last_token != ";":
+                last += 1
+            last = min(last + 1, len(statements))
+        else:
+            break
+
+    old_declarations = [d for s in statements[first:last] for d in s.declarations]
+
+    __move_shift(compilation, first, last)
+    compilation.source_code = source_code
+    compilation.statements[first:last] = new_statements
+    compilation.starts[first:last] = starts
+    compilation.ends[first:last] = ends
+    compilation.shift_from = first + len(new_statements)
+    compilation.shift += delta
+
+    changed_end = first + len(new_statements)
+    new_declarations = _typecheck_statements(compilation, first, changed_end)
+
+    if new_declarations != old_declarations or len(new_statements) != last - first:
+        del compilation.environments[first // checkpoint_interval + 1 :]
+
+    # Later statements only need checking again if the environment they see changed
+    if new_declarations != old_declarations:
+        _typecheck_statements(compilation, changed_end, len(compilation.statements))
+
+
+def __bisect(
+    compilation: Compilation,
+    values: array[int],
+    offset: int,
+    bisect: Callable[..., int],
+) -> int:
+    i = bisect(values, offset, 0, compilation.shift_from)
+
+    if i < compilation.shift_from:
+        return i
+
+    return bisect(values, offset - compilation.shift, compilation.shift_from)
+
+
+def __move_shift(compilation: Compilation, first: int, last: int) -> None:
+    """Stores the true spans between the deferred shift and the statements
+    [first, last), so the shift can move to just after them."""
+    shift_from = compilation.shift_from
+    shift = compilation.shift
+
+    for values in (compilation.starts, compilation.ends):
+        if shift_from <= first:
+            values[shift_from:first] = array(
+                "q", [value + shift for value in values[shift_from:first]]
+            )
+        elif last < shift_from:
+            values[last:shift_from] = array(
+                "q", [value - shift for value in values[last:shift_from]]
+            )
+
+
+def _parse_statements(
+    source_code: str, start: int, end: int
+) -> tuple[array[int], array[int], list[Statement]]:
+    starts = array("q")
+    ends = array("q")
+    statements: list[Statement] = []
+
+    try:
+        tokens = tokenize(source_code, start, end)
+    except Exception as e:
+        starts.append(start)
+        ends.append(end)
+        statements.append(Statement(Literal(None), "", parse_error=e))
+        return starts, ends, statements
+
+    # A comment found in a part of the source could extend past it
+    partial = start > 0 or end < len(source_code)
+    if partial and TokenType.COMMENT.value in tokens.kinds:
+        raise _CommentFound()
+
+    cursor = Tokens(tokens)
+
+    while cursor.peek().type != TokenType.END:
+        first_token = cursor.pos
+
+        try:
+            expression = parse(cursor, statement=True)
+        except Exception as e:
+            # The rest of the region becomes one statement holding the error
+            starts.append(tokens.starts[first_token])
+            ends.append(end)
+            statements.append(Statement(Literal(None), "", parse_error=e))
+            break
+
+        starts.append(tokens.starts[first_token])
+        ends.append(tokens.ends[cursor.pos - 1])
+        statements.append(Statement(expression, cursor.prev_token().text))
+
+    return starts, ends, statements
+
+
+def _typecheck_statements(
+    compilation: Compilation, first: int, last: int
+) -> list[tuple[str, Type]]:
+    """Type checks statements [first, last) and returns their declarations."""
+    environment = _DeclarationLog(_environment(compilation, first))
+    environment.log = []
+
+    for statement in compilation.statements[first:last]:
+        if statement.parse_error is not None:
+            continue
+
+        start = len(environment.log)
+        statement.type_error = None
+
+        try:
+            typecheck(statement.expression, environment)
+        except Exception as e:
+            statement.type_error = e
+
+        statement.declarations = environment.log[start:]
+
+    return environment.log
+
+
+def _environment(compilation: Compilation, index: int) -> dict[str, Type]:
+    """Rebuilds the environment before statement `index` from the nearest
+    checkpoint, saving the checkpoints it passes."""
+    statements = compilation.statements
+    environments = compilation.environments
+    checkpoint = index // checkpoint_interval
+
+    while len(environments) <= checkpoint:
+        environment = environments[-1].copy()
+        start = (len(environments) - 1) * checkpoint_interval
+
+        for statement in statements[start : start + checkpoint_interval]:
+            environment.update(statement.declarations)
+
+        environments.append(environment)
+
+    environment = environments[checkpoint].copy()
+
+    for statement in statements[checkpoint * checkpoint_interval : index]:
+        environment.update(statement.declarations)
+
+    return environment
@@ -2,10 +2,10 @@ from __future__ import annotations
 
 import dataclasses
 from dataclasses import dataclass
-from typing import Optional, Any
+from typing import Any, Iterable, Optional
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class IRVar:
     """Represents the name of a memory location or built-in."""
 
@@ -15,25 +15,116 @@ class IRVar:
         return self.name
 
 
-@dataclass
+class ScopeTree:
+    """What the scopes nested in the same root scope share."""
+
+    # Every name declared in any of them
+    names: set[str]
+    # The number of declarations that shadowed a name
+    shadowings: int
+    # Whether any of the scopes is cached
+    cached: bool
+
+    def __init__(self) -> None:
+        self.names = set()
+        self.shadowings = 0
+        self.cached = False
+
+
 class SymTab:
-    symbols: list[tuple[str, IRVar]]
-    parent: Optional[SymTab] = None
+    """The IR variable of each name declared in a scope, and the scope
+    that encloses it.
+
+    A `cached` scope also remembers the variables it found in the enclosing
+    scopes, so repeated lookups in deeply nested scopes are O(1). The scopes
+    nested in a cached scope are cached too. A declaration that shadows a
+    name makes all of them forget, since they may have remembered the
+    shadowed variable."""
+
+    symbols: dict[str, IRVar]
+    parent: Optional[SymTab]
+    tree: ScopeTree
+    # The variables found in the enclosing scopes, or None if not cached,
+    # and the number of shadowings in the tree when it was last valid
+    cache: Optional[dict[str, IRVar]]
+    cache_shadowings: int
+
+    def __init__(
+        self,
+        symbols: Iterable[tuple[str, IRVar]] = (),
+        parent: Optional[SymTab] = None,
+        cached: bool = False,
+    ) -> None:
+        self.symbols = dict(symbols)
+        self.parent = parent
+
+        if parent is None:
+            self.tree = ScopeTree()
+        else:
+            self.tree = parent.tree
+            cached = cached or parent.cache is not None
+
+        self.tree.names.update(self.symbols)
+        self.tree.cached = self.tree.cached or cached
+        self.cache = {} if cached else None
+        self.cache_shadowings = self.tree.shadowings
 
     def add_local(self, symbol: str, var: IRVar) -> None:
-        if symbol in self.__get_symbols():
+        if symbol in self.symbols:
             raise Exception(f"symbol {symbol} already defined")
 
-        self.symbols.append((symbol, var))
+        tree = self.tree
+
+        # Only a name declared before can be shadowed. A cached scope nested
+        # in this one may remember the shadowed variable, even if this scope
+        # is not cached.
+        if symbol in tree.names:
+            if (
+                tree.cached
+                and self.parent is not None
+                and self.parent.find(symbol) is not None
+            ):
+                tree.shadowings += 1
+        else:
+            tree.names.add(symbol)
+
+        self.symbols[symbol] = var
 
     def find(self, symbol: str) -> Optional[IRVar]:
-        if symbol in self.__get_symbols():
-            return self.symbols[self.__get_symbols().index(symbol)][1]
+        var = self.symbols.get(symbol)
+        if var is not None:
+            return var
 
-        if self.parent:
-            return self.parent.find(symbol)
+        shadowings = self.tree.shadowings
+        # The caches on the way that did not have the symbol
+        forgetful: list[dict[str, IRVar]] = []
+        symtab: Optional[SymTab] = self
 
-        return None
+        # Walk up in a loop, nested scopes can be deeper than the recursion limit
+        while symtab is not None:
+            var = symtab.symbols.get(symbol)
+            if var is not None:
+                break
+
+            cache = symtab.cache
+            if cache is not None:
+                if symtab.cache_shadowings != shadowings:
+                    cache.clear()
+                    symtab.cache_shadowings = shadowings
+                else:
+                    var = cache.get(symbol)
+                    if var is not None:
+                        break
+
+                forgetful.append(cache)
+
+            symtab = symtab.parent
+
+        if var is not None:
+            for cache in forgetful:
+                cache[symbol] = var
+
+        return var
 
     def require(self, name: str) -> IRVar:
         result = self.find(name)
@@ -43,11 +134,8 @@ class SymTab:
 
         return result
 
-    def __get_symbols(self) -> list[str]:
-        return [s[0] for s in self.symbols]
-
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Instruction:
     """Base class for IR instructions."""
 
@@ -71,7 +159,7 @@ class Instruction:
         return f"{type(self).__name__}({args})"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class LoadBoolConst(Instruction):
     """Loads a boolean constant value to `dest`."""
 
@@ -79,7 +167,7 @@ class LoadBoolConst(Instruction):
     dest: IRVar
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class LoadIntConst(Instruction):
     """Loads a constant value to `dest`."""
 
@@ -87,7 +175,7 @@ class LoadIntConst(Instruction):
     dest: IRVar
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Copy(Instruction):
     """Copies a value from one variable to another."""
 
@@ -95,7 +183,7 @@ class Copy(Instruction):
     dest: IRVar
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Call(Instruction):
     """Calls a function or built-in."""
 
@@ -104,14 +192,14 @@ class Call(Instruction):
     dest: IRVar
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Jump(Instruction):
     """Unconditionally continues execution from the given label."""
 
     label: Label
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CondJump(Instruction):
     """Continues execution from `then_label` if `cond` is true, otherwise from `else_label`."""
 
@@ -120,14 +208,14 @@ class CondJump(Instruction):
     else_label: Label
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Label(Instruction):
     """Marks the destination of a jump instruction."""
 
     name: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Return(Instruction):
     """Returns from the current function."""
 
@@ -1,6 +1,7 @@
 import sys
 import typing
 from contextlib import contextmanager
+from typing import Any, Callable, Optional
 
 import compiler.ast as ast
 import compiler.ir as ir
@@ -16,119 +17,141 @@ from compiler.ir import (
     LoadBoolConst,
     LoadIntConst,
 )
+from compiler.dispatch import find_handler
 from compiler.ir_generator_state import IrGeneratorState, WhileIrGeneratorState
-from compiler.type import Bool, Int, Type, Unit, ConstInt, ConstBool
+from compiler.location import Location
+from compiler.trampoline import Trampoline, max_direct_depth, run
+from compiler.type import Bool, Int, Type, Unit, base_types
 
 
 def generate_ir(
     root_types: dict[IRVar, Type],
     root_expr: ast.Expression,
 ) -> list[ir.Instruction]:
-    return [Label(name="Start"), *__generate_ir(root_types, root_expr), Return()]
+    return [Label(name="Start"), *IrGenerator(root_types).generate(root_expr), Return()]
 
 
-def __generate_ir(
-    # 'root_types' parameter should map all global names
-    # like 'print_int' and '+' to their types.
-    root_types: dict[IRVar, Type],
-    root_expr: ast.Expression,
-) -> list[ir.Instruction]:
-    var_types: dict[IRVar, Type] = root_types.copy()
+class IrGenerator:
+    """The state of generating the IR of one program. See `generate_ir`."""
 
+    # 'root_types' maps all global names
+    # like 'print_int' and '+' to their types.
+    root_types: dict[IRVar, Type]
+    var_types: dict[IRVar, Type]
     # 'var_unit' is used when an expression's type is 'Unit'.
-    var_unit = IRVar("unit")
-    var_types[var_unit] = Unit
-
-    next_var_number = 0
-    next_label_number = 0
-
-    def new_var(t: Type) -> IRVar:
-        nonlocal next_var_number
-
-        var = IRVar(f"v{next_var_number}")
-        next_var_number += 1
-
-        var_types[var] = t
+    var_unit: IRVar
+    next_var_number: int
+    next_label_number: int
+    # We collect the IR instructions that we generate
+    # into this list.
+    ins: list[ir.Instruction]
+    _states: list[object]
+
+    def __init__(self, root_types: dict[IRVar, Type]) -> None:
+        self.root_types = root_types
+        self.var_types = root_types.copy()
+        self.var_unit = IRVar("unit")
+        self.var_types[self.var_unit] = Unit
+        self.next_var_number = 0
+        self.next_label_number = 0
+        self.ins = []
+        self._states = []
+
+    def new_var(self, t: Type) -> IRVar:
+        var = IRVar(f"v{self.next_var_number}")
+        self.next_var_number += 1
+
+        self.var_types[var] = t
         return var
 
-    def new_label() -> ir.Label:
-        nonlocal next_label_number
-        label = ir.Label(f"L{next_label_number}")
-        next_label_number += 1
+    def new_label(self) -> ir.Label:
+        label = ir.Label(f"L{self.next_label_number}")
+        self.next_label_number += 1
         return label
 
-    # We collect the IR instructions that we generate
-    # into this list.
-    ins: list[ir.Instruction] = []
+    def new_dest(self, dest: Optional[IRVar], t: Type) -> IRVar:
+        """Returns the destination of a value, or a new variable if the
+        caller did not give one."""
+        return self.new_var(t) if dest is None else dest
+
+    def copy_to_dest(self, var: IRVar, dest: Optional[IRVar]) -> IRVar:
+        """Copies a value that is already in `var` to the destination,
+        if the caller gave one."""
+        if dest is None or dest == var:
+            return var
 
-    def add_ending_print_ir(var_final: IRVar) -> None:
-        if var_types[var_final] in [Int, ConstInt]:
-            ins.append(
+        self.ins.append(Copy(var, dest))
+        return dest
+
+    def add_ending_print_ir(self, var_final: IRVar) -> None:
+        if base_types[self.var_types[var_final]] is Int:
+            self.ins.append(
                 Call(
                     # loc,
                     IRVar("print_int"),
                     [var_final],
-                    new_var(Int),
+                    self.new_var(Int),
                 )
             )
-        elif var_types[var_final] in [Bool, ConstBool]:
-            ins.append(
+        elif base_types[self.var_types[var_final]] is Bool:
+            self.ins.append(
                 Call(
                     # loc,
                     IRVar("print_bool"),
                     [var_final],
-                    new_var(Bool),
+                    self.new_var(Bool),
                 )
             )
 
     def visit_logical_operation(
-        st: SymTab, expr: ast.BinaryOp, operation: typing.Literal["and", "or"]
-    ) -> IRVar:
+        self,
+        st: SymTab,
+        expr: ast.BinaryOp,
+        operation: typing.Literal["and", "or"],
+        depth: int,
+        dest: Optional[IRVar],
+    ) -> Trampoline[IRVar]:
         if expr.left is None:
             raise Exception(
                 "Wrong left-hand side of binary operation. It should not be None."
             )
 
-        label_skip = new_label()
-        label_right = new_label()
-        label_end = new_label()
+        label_skip = self.new_label()
+        label_right = self.new_label()
+        label_end = self.new_label()
 
-        var_result = new_var(Bool)
+        var_result = self.new_dest(dest, Bool)
 
-        var_left = visit(st, expr.left)
+        var_left = yield from self.visit(st, expr.left, depth + 1)
 
         match operation:
             case "and":
-                ins.append(CondJump(var_left, label_right, label_skip))
+                self.ins.append(CondJump(var_left, label_right, label_skip))
             case "or":
-                ins.append(CondJump(var_left, label_skip, label_right))
+                self.ins.append(CondJump(var_left, label_skip, label_right))
 
-        ins.append(label_skip)
-        ins.append(LoadBoolConst(operation == "or", var_result))
-        ins.append(Jump(label_end))
+        self.ins.append(label_skip)
+        self.ins.append(LoadBoolConst(operation == "or", var_result))
+        self.ins.append(Jump(label_end))
 
-        ins.append(label_right)
-        var_right = visit(st, expr.right)
-        ins.append(Copy(var_right, var_result))
-        ins.append(Jump(label_end))
+        self.ins.append(label_right)
+        yield from self.visit(st, expr.right, depth + 1, var_result)
+        self.ins.append(Jump(label_end))
 
-        ins.append(label_end)
+        self.ins.append(label_end)
 
         return var_result
 
-    __current_states = []
-
     @contextmanager
-    def state(new_state: IrGeneratorState) -> typing.Iterator[None]:
-        nonlocal __current_states
+    def state(self, new_state: IrGeneratorState) -> typing.Iterator[None]:
         try:
-            __current_states.append(new_state)
+            self._states.append(new_state)
             yield
         finally:
-            __current_states.pop()
+            self._states.pop()
 
-    def get_state(state_type: type[IrGeneratorState]) -> IrGeneratorState | None:
-        for s in reversed(__current_states):
+    def get_state(self, state_type: type[IrGeneratorState]) -> IrGeneratorState | None:
+        for s in reversed(self._states):
             if isinstance(s, state_type):
                 return s
         return None
@@ -138,252 +161,346 @@ def __generate_ir(
     # and returns the IR variable where
     # the emitted IR instructions put the result.
     #
+    # If 'dest' is given, the result is put in that variable,
+    # and it is returned. Expressions that compute a new value
+    # write it there directly instead of into a new variable
+    # that is then copied.
+    #
     # It uses a symbol table to map local variables
     # (which may be shadowed) to unique IR variables.
     # The symbol table will be updated in the same way as
     # in the interpreter and type checker.
-    def visit(st: SymTab, expr: ast.Expression) -> IRVar:
+    #
+    # Nested nodes are visited with 'yield from'. Every
+    # 'max_direct_depth' levels a node is handed to the trampoline
+    # instead, to keep the chain of generators short.
+    #
+    # It returns the generator of the 'visit_*' method for the
+    # class of the node, found in 'visit_handlers'.
+    def visit(
+        self,
+        st: SymTab,
+        expr: ast.Expression,
+        depth: int = 0,
+        dest: Optional[IRVar] = None,
+    ) -> Trampoline[IRVar]:
+        if depth >= max_direct_depth:
+            return self.visit_later(st, expr, dest)
+
+        handler = find_handler(visit_handlers, type(expr))
+
+        if handler is None:
+            # loc = expr.location
+            loc: Optional[Location] = None
+            raise Exception(f"{loc}: unsupported expression: {type(expr)}")
+
+        return handler(self, st, expr, depth, dest)
+
+    def visit_later(
+        self, st: SymTab, expr: ast.Expression, dest: Optional[IRVar]
+    ) -> Trampoline[IRVar]:
+        return (yield self.visit(st, expr, 0, dest))
+
+    # Handlers of nodes without nested nodes end with an unreachable
+    # 'yield', which makes them generators like every other handler.
+
+    def visit_literal(
+        self, st: SymTab, expr: ast.Literal, depth: int, dest: Optional[IRVar]
+    ) -> Trampoline[IRVar]:
         # loc = expr.location
-        loc = None
-
-        match expr:
-            case ast.Literal():
-                match expr.value:
-                    case bool():
-                        var = new_var(Bool)
-                        ins.append(
-                            LoadBoolConst(
-                                # loc,
-                                expr.value,
-                                var,
-                            )
-                        )
-                    case int():
-                        var = new_var(Int)
-                        ins.append(
-                            LoadIntConst(
-                                # loc,
-                                expr.value,
-                                var,
-                            )
-                        )
-                    case None:
-                        var = var_unit
-                    case _:
-                        raise Exception(
-                            f"{loc}: unsupported literal: {type(expr.value)}"
-                        )
+        loc: Optional[Location] = None
+
+        match expr.value:
+            case bool():
+                var = self.new_dest(dest, Bool)
+                self.ins.append(
+                    LoadBoolConst(
+                        # loc,
+                        expr.value,
+                        var,
+                    )
+                )
+            case int():
+                var = self.new_dest(dest, Int)
+                self.ins.append(
+                    LoadIntConst(
+                        # loc,
+                        expr.value,
+                        var,
+                    )
+                )
+            case None:
+                var = self.copy_to_dest(self.var_unit, dest)
+            case _:
+                raise Exception(f"{loc}: unsupported literal: {type(expr.value)}")
 
-                # Return the variable that holds
-                # the loaded value.
-                return var
+        # Return the variable that holds
+        # the loaded value.
+        return var
+        yield
+
+    def visit_identifier(
+        self, st: SymTab, expr: ast.Identifier, depth: int, dest: Optional[IRVar]
+    ) -> Trampoline[IRVar]:
+        # Look up the IR variable that corresponds to
+        # the source code variable.
+        return self.copy_to_dest(st.require(expr.name), dest)
+        yield
+
+    def visit_binary_op(
+        self, st: SymTab, expr: ast.BinaryOp, depth: int, dest: Optional[IRVar]
+    ) -> Trampoline[IRVar]:
+        # loc = expr.location
+        loc: Optional[Location] = None
+
+        var_op = (
+            st.require(expr.op)
+            if expr.left is not None
+            else st.require(f"unary_{expr.op}")
+        )
+
+        match var_op.name:
+            case "=":
+                if not isinstance(expr.left, ast.Identifier):
+                    raise Exception(
+                        f"{loc}: left-hand side of assignment must be an identifier"
+                    )
 
-            case ast.Identifier():
-                # Look up the IR variable that corresponds to
-                # the source code variable.
-                return st.require(expr.name)
+                var_left = st.require(expr.left.name)
+                yield from self.visit(st, expr.right, depth + 1, var_left)
 
-            case ast.BinaryOp():
-                var_op = (
-                    st.require(expr.op)
-                    if expr.left is not None
-                    else st.require(f"unary_{expr.op}")
+                return self.copy_to_dest(var_left, dest)
+            case "and":
+                return (
+                    yield from self.visit_logical_operation(
+                        st, expr, "and", depth, dest
+                    )
                 )
+            case "or":
+                return (
+                    yield from self.visit_logical_operation(st, expr, "or", depth, dest)
+                )
+            case _:
+                if expr.left is None:
+                    var_right = yield from self.visit(st, expr.right, depth + 1)
 
-                match var_op.name:
-                    case "=":
-                        if not isinstance(expr.left, ast.Identifier):
-                            raise Exception(
-                                f"{loc}: left-hand side of assignment must be an identifier"
-                            )
-
-                        var_left = st.require(expr.left.name)
-                        var_right = visit(st, expr.right)
-
-                        ins.append(Copy(var_right, var_left))
-
-                        return var_left
-                    case "and":
-                        return visit_logical_operation(st, expr, "and")
-                    case "or":
-                        return visit_logical_operation(st, expr, "or")
-                    case _:
-                        if expr.left is None:
-                            var_right = visit(st, expr.right)
-
-                            var_result = new_var(expr.type)
-
-                            ins.append(
-                                ir.Call(
-                                    # loc,
-                                    var_op,
-                                    [var_right],
-                                    var_result,
-                                )
-                            )
-
-                            return var_result
-
-                        var_left = visit(st, expr.left)
-                        var_right = visit(st, expr.right)
-
-                        var_result = new_var(expr.type)
-
-                        ins.append(
-                            ir.Call(
-                                # loc,
-                                var_op,
-                                [var_left, var_right],
-                                var_result,
-                            )
-                        )
-
-                        return var_result
-
-            case ast.IfExpression():
-                if expr.else_clause is None:
-                    l_then = new_label()
-                    l_end = new_label()
+                    var_result = self.new_dest(dest, expr.type)
 
-                    var_cond = visit(st, expr.condition)
-                    ins.append(
-                        CondJump(
+                    self.ins.append(
+                        ir.Call(
                             # loc,
-                            var_cond,
-                            l_then,
-                            l_end,
+                            var_op,
+                            [var_right],
+                            var_result,
                         )
                     )
 
-                    ins.append(l_then)
+                    return var_result
 
-                    visit(st, expr.then_clause)
+                var_left = yield from self.visit(st, expr.left, depth + 1)
+                var_right = yield from self.visit(st, expr.right, depth + 1)
 
-                    ins.append(l_end)
-                    return var_unit
-                else:
-                    l_then = new_label()
-                    l_else = new_label()
-                    l_end = new_label()
+                var_result = self.new_dest(dest, expr.type)
 
-                    var_cond = visit(st, expr.condition)
-                    ins.append(
-                        CondJump(
-                            # loc,
-                            var_cond,
-                            l_then,
-                            l_else,
-                        )
+                self.ins.append(
+                    ir.Call(
+                        # loc,
+                        var_op,
+                        [var_left, var_right],
+                        var_result,
                     )
+                )
 
-                    var_result = new_var(expr.type)
+                return var_result
 
-                    ins.append(l_then)
+    def visit_if(
+        self, st: SymTab, expr: ast.IfExpression, depth: int, dest: Optional[IRVar]
+    ) -> Trampoline[IRVar]:
+        if expr.else_clause is None:
+            l_then = self.new_label()
+            l_end = self.new_label()
 
-                    var_then = visit(st, expr.then_clause)
-                    ins.append(Copy(var_then, var_result))
-                    ins.append(
-                        Jump(
-                            l_end,
-                        )
-                    )
+            var_cond = yield from self.visit(st, expr.condition, depth + 1)
+            self.ins.append(
+                CondJump(
+                    # loc,
+                    var_cond,
+                    l_then,
+                    l_end,
+                )
+            )
 
-                    ins.append(l_else)
-                    var_else = visit(st, expr.else_clause)
-                    ins.append(Copy(var_else, var_result))
+            self.ins.append(l_then)
 
-                    ins.append(l_end)
+            yield from self.visit(st, expr.then_clause, depth + 1)
 
-                    return var_result
+            self.ins.append(l_end)
+            return self.copy_to_dest(self.var_unit, dest)
+        else:
+            l_then = self.new_label()
+            l_else = self.new_label()
+            l_end = self.new_label()
 
-            case ast.BlockExpression():
-                child_st = SymTab(symbols=[], parent=st)
+            var_cond = yield from self.visit(st, expr.condition, depth + 1)
+            self.ins.append(
+                CondJump(
+                    # loc,
+                    var_cond,
+                    l_then,
+                    l_else,
+                )
+            )
 
-                for subexpr in expr.expressions:
-                    visit(child_st, subexpr)
+            var_result = self.new_dest(dest, expr.type)
 
-                if expr.result is not None:
-                    return visit(child_st, expr.result)
+            self.ins.append(l_then)
 
-            case ast.VariableDeclarationExpression():
-                var_value = visit(st, expr.value)
-                var = new_var(expr.type)
+            yield from self.visit(st, expr.then_clause, depth + 1, var_result)
+            self.ins.append(
+                Jump(
+                    l_end,
+                )
+            )
 
-                ins.append(Copy(var_value, var))
+            self.ins.append(l_else)
+            yield from self.visit(st, expr.else_clause, depth + 1, var_result)
 
-                st.add_local(expr.name, var)
+            self.ins.append(l_end)
 
-                return var
+            return var_result
 
-            case ast.FunctionExpression():
-                var_op = st.require(expr.name)
-                var_args = [visit(st, arg) for arg in expr.arguments]
+    def visit_block(
+        self, st: SymTab, expr: ast.BlockExpression, depth: int, dest: Optional[IRVar]
+    ) -> Trampoline[IRVar]:
+        child_st = SymTab(symbols=[], parent=st)
 
-                var_result = new_var(expr.type)
+        for subexpr in expr.expressions:
+            yield from self.visit(child_st, subexpr, depth + 1)
 
-                ins.append(Call(var_op, var_args, var_result))
+        return (yield from self.visit(child_st, expr.result, depth + 1, dest))
 
-                return var_result
+    def visit_variable_declaration(
+        self,
+        st: SymTab,
+        expr: ast.VariableDeclarationExpression,
+        depth: int,
+        dest: Optional[IRVar],
+    ) -> Trampoline[IRVar]:
+        var = self.new_var(expr.type)
 
-            case ast.WhileExpression():
-                label_start = new_label()
-                label_body = new_label()
-                label_end = new_label()
+        # The value is computed before the variable is in scope,
+        # so it cannot read the variable it is written to
+        yield from self.visit(st, expr.value, depth + 1, var)
 
-                ins.append(label_start)
+        st.add_local(expr.name, var)
 
-                var_condition = visit(st, expr.condition)
+        return self.copy_to_dest(var, dest)
 
-                ins.append(CondJump(var_condition, label_body, label_end))
+    def visit_function(
+        self,
+        st: SymTab,
+        expr: ast.FunctionExpression,
+        depth: int,
+        dest: Optional[IRVar],
+    ) -> Trampoline[IRVar]:
+        var_op = st.require(expr.name)
+        var_args = []
+        for arg in expr.arguments:
+            var_args.append((yield from self.visit(st, arg, depth + 1)))
 
-                ins.append(label_body)
+        var_result = self.new_dest(dest, expr.type)
 
-                with state(WhileIrGeneratorState(label_start, label_end)):
-                    visit(SymTab(symbols=[], parent=st), expr.body)
+        self.ins.append(Call(var_op, var_args, var_result))
 
-                ins.append(Jump(label_start))
+        return var_result
+
+    def visit_while(
+        self, st: SymTab, expr: ast.WhileExpression, depth: int, dest: Optional[IRVar]
+    ) -> Trampoline[IRVar]:
+        label_start = self.new_label()
+        label_body = self.new_label()
+        label_end = self.new_label()
+
+        self.ins.append(label_start)
+
+        var_condition = yield from self.visit(st, expr.condition, depth + 1)
 
-                ins.append(label_end)
+        self.ins.append(CondJump(var_condition, label_body, label_end))
 
-                return var_unit
+        self.ins.append(label_body)
 
-            case ast.BreakExpression() | ast.ContinueExpression():
-                s = get_state(WhileIrGeneratorState)
+        with self.state(WhileIrGeneratorState(label_start, label_end)):
+            yield from self.visit(SymTab(symbols=[], parent=st), expr.body, depth + 1)
 
-                if s is None:
-                    raise Exception(f"{loc}: break/continue outside of a loop")
-                else:
-                    match expr:
-                        case ast.BreakExpression():
-                            ins.append(Jump(s.label_end))
-                        case ast.ContinueExpression():
-                            ins.append(Jump(s.label_start))
-                        case _:
-                            sys.exit("Unreachable code")
+        self.ins.append(Jump(label_start))
 
-                    return var_unit
+        self.ins.append(label_end)
 
+        return self.copy_to_dest(self.var_unit, dest)
+
+    def visit_loop_jump(
+        self,
+        st: SymTab,
+        expr: ast.BreakExpression | ast.ContinueExpression,
+        depth: int,
+        dest: Optional[IRVar],
+    ) -> Trampoline[IRVar]:
+        # loc = expr.location
+        loc: Optional[Location] = None
+
+        s = self.get_state(WhileIrGeneratorState)
+
+        if s is None:
+            raise Exception(f"{loc}: break/continue outside of a loop")
+        else:
+            match expr:
+                case ast.BreakExpression():
+                    self.ins.append(Jump(s.label_end))
+                case ast.ContinueExpression():
+                    self.ins.append(Jump(s.label_start))
+                case _:
+                    sys.exit("Unreachable code")
+
+            # Jumps away, so there is no value to copy to 'dest'
+            return self.var_unit if dest is None else dest
+        yield
+
+    def generate(self, root_expr: ast.Expression) -> list[ir.Instruction]:
+        # Convert 'root_types' into a SymTab
+        # that maps all available global names to
+        # IR variables of the same name.
+        # In the Assembly generator stage, we will give
+        # definitions for these globals. For now,
+        # they just need to exist.
+        root_symtab = SymTab([(k.name, k) for k in self.root_types.keys()], cached=True)
+
+        # Start visiting the AST from the root.
+        var_final_result = run(self.visit(root_symtab, root_expr))
+
+        match root_expr:
+            case ast.BlockExpression():
+                if root_expr.result is not None:
+                    self.add_ending_print_ir(var_final_result)
+            case ast.WhileExpression() | ast.VariableDeclarationExpression():
+                pass
             case _:
-                raise Exception(f"{loc}: unsupported expression: {type(expr)}")
-
-    # Convert 'root_types' into a SymTab
-    # that maps all available global names to
-    # IR variables of the same name.
-    # In the Assembly generator stage, we will give
-    # definitions for these globals. For now,
-    # they just need to exist.
-    root_symtab = SymTab([(k.name, k) for k in root_types.keys()])
-
-    # Start visiting the AST from the root.
-    var_final_result = visit(root_symtab, root_expr)
-
-    match root_expr:
-        case ast.BlockExpression():
-            if root_expr.result is not None:
-                add_ending_print_ir(var_final_result)
-        case ast.WhileExpression() | ast.VariableDeclarationExpression():
-            pass
-        case _:
-            add_ending_print_ir(var_final_result)
-
-    return ins
+                self.add_ending_print_ir(var_final_result)
+
+        return self.ins
+
+
+visit_handlers: dict[
+    type,
+    Callable[[IrGenerator, SymTab, Any, int, Optional[IRVar]], Trampoline[IRVar]],
+] = {
+    ast.Literal: IrGenerator.visit_literal,
+    ast.Identifier: IrGenerator.visit_identifier,
+    ast.BinaryOp: IrGenerator.visit_binary_op,
+    ast.IfExpression: IrGenerator.visit_if,
+    ast.BlockExpression: IrGenerator.visit_block,
+    ast.VariableDeclarationExpression: IrGenerator.visit_variable_declaration,
+    ast.FunctionExpression: IrGenerator.visit_function,
+    ast.WhileExpression: IrGenerator.visit_while,
+    ast.BreakExpression: IrGenerator.visit_loop_jump,
+    ast.ContinueExpression: IrGenerator.visit_loop_jump,
+}
@@ -0,0 +1,254 @@
+import struct
+import sys
+from array import array
+from typing import Callable
+
+import compiler.ir as ir
+from compiler.compact_ir import (
+    CALL,
+    COND_JUMP,
+    COPY,
+    JUMP,
+    LABEL,
+    LOAD_BIG_INT_CONST,
+    LOAD_BOOL_CONST,
+    LOAD_INT_CONST,
+    RETURN,
+    CompactIr,
+)
+from compiler.ir import IRVar, Label
+
+# The textual IR is one instruction per line, as printed by `str`, like
+# `Call(+, [x, v1], v2)`. Empty lines and lines starting with `#` are
+# skipped.
+
+
+def format_ir(instructions: list[ir.Instruction]) -> str:
+    return "".join(f"{instruction}\n" for instruction in instructions)
+
+
+def parse_ir(text: str) -> list[ir.Instruction]:
+    """Reads the instructions of the textual IR."""
+    instructions = []
+
+    for line_number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        name, _, rest = line.partition("(")
+        parse_instruction = instruction_parsers.get(name)
+
+        if parse_instruction is None or not rest.endswith(")"):
+            raise ValueError(f"Line {line_number}: invalid instruction: {line}")
+
+        try:
+            instructions.append(parse_instruction(rest[:-1]))
+        except ValueError:
+            raise ValueError(f"Line {line_number}: invalid instruction: {line}")
+
+    return instructions
+
+
+def parse_label(text: str) -> Label:
+    if not text.startswith("Label(") or not text.endswith(")"):
+        raise ValueError(f"Invalid label: {text}")
+
+    return Label(text[6:-1])
+
+
+def parse_load_int_const(fields: str) -> ir.LoadIntConst:
+    value, dest = fields.split(", ")
+    return ir.LoadIntConst(int(value), IRVar(dest))
+
+
+def parse_load_bool_const(fields: str) -> ir.LoadBoolConst:
+    value, dest = fields.split(", ")
+
+    if value not in ["True", "False"]:
+        raise ValueError(f"Invalid boolean: {value}")
+
+    return ir.LoadBoolConst(value == "True", IRVar(dest))
+
+
+def parse_copy(fields: str) -> ir.Copy:
+    source, dest = fields.split(", ")
+    return ir.Copy(IRVar(source), IRVar(dest))
+
+
+def parse_call(fields: str) -> ir.Call:
+    fun, rest = fields.split(", [", 1)
+    args, dest = rest.rsplit("], ", 1)
+    return ir.Call(
+        IRVar(fun),
+        [IRVar(arg) for arg in args.split(", ")] if args else [],
+        IRVar(dest),
+    )
+
+
+def parse_jump(fields: str) -> ir.Jump:
+    return ir.Jump(parse_label(fields))
+
+
+def parse_cond_jump(fields: str) -> ir.CondJump:
+    cond, then_label, else_label = fields.split(", ")
+    return ir.CondJump(IRVar(cond), parse_label(then_label), parse_label(else_label))
+
+
+def parse_return(fields: str) -> ir.Return:
+    if fields:
+        raise ValueError(f"Invalid fields: {fields}")
+
+    return ir.Return()
+
+
+# The function that reads the fields of each instruction, by class name
+instruction_parsers: dict[str, Callable[[str], ir.Instruction]] = {
+    "Label": Label,
+    "LoadIntConst": parse_load_int_const,
+    "LoadBoolConst": parse_load_bool_const,
+    "Copy": parse_copy,
+    "Call": parse_call,
+    "Jump": parse_jump,
+    "CondJump": parse_cond_jump,
+    "Return": parse_return,
+}
+
+
+# The binary IR is a header, the names and big integers, and then the
+# columns of a `CompactIr`, with integers in little-endian order.
+#
+# The header holds the magic bytes and the number of instructions, call
+# arguments, variable names, label names and big integers. Each list of
+# names is its strings joined with newlines, in UTF-8, after its length.
+binary_ir_magic = b"IRC\x01"
+_header = struct.Struct("<4s5Q")
+_length = struct.Struct("<Q")
+
+
+def is_binary_ir(data: bytes) -> bool:
+    return data.startswith(binary_ir_magic)
+
+
+def dump_binary_ir(code: CompactIr) -> bytes:
+    parts = [
+        _header.pack(
+            binary_ir_magic,
+            len(code),
+            len(code.args),
+            len(code.var_names),
+            len(code.label_names),
+            len(code.big_ints),
+        )
+    ]
+
+    for strings in [
+        code.var_names,
+        code.label_names,
+        [str(value) for value in code.big_ints],
+    ]:
+        data = "\n".join(strings).encode()
+        parts.append(_length.pack(len(data)))
+        parts.append(data)
+
+    for column in [code.opcodes, code.dests, code.a, code.b, code.c, code.args]:
+        if sys.byteorder == "big":
+            column = array(column.typecode, column)
+            column.byteswap()
+
+        parts.append(column.tobytes())
+
+    return b"".join(parts)
+
+
+def load_binary_ir(data: bytes) -> CompactIr:
+    if not is_binary_ir(data):
+        raise ValueError("Not binary IR")
+
+    try:
+        return _load_binary_ir(data)
+    except struct.error:
+        raise ValueError("Binary IR is truncated")
+
+
+def _load_binary_ir(data: bytes) -> CompactIr:
+    _, instructions, args, var_names, label_names, big_ints = _header.unpack_from(data)
+
+    view = memoryview(data)
+    offset = _header.size
+    lists: list[list[str]] = []
+
+    for count in [var_names, label_names, big_ints]:
+        (length,) = _length.unpack_from(data, offset)
+        offset += _length.size
+        strings = str(view[offset : offset + length], "utf-8").split("\n")
+        lists.append(strings if count else [])
+        offset += length
+
+    code = CompactIr()
+    code.var_names, code.label_names = lists[0], lists[1]
+    code.big_ints = [int(value) for value in lists[2]]
+
+    for column, count in [
+        (code.opcodes, instructions),
+        (code.dests, instructions),
+        (code.a, instructions),
+        (code.b, instructions),
+        (code.c, instructions),
+        (code.args, args),
+    ]:
+        size = count * column.itemsize
+        column.frombytes(view[offset : offset + size])
+        offset += size
+
+        if sys.byteorder == "big":
+            column.byteswap()
+
+    if offset != len(data):
+        raise ValueError("Binary IR has the wrong size")
+
+    _check_ids(code)
+    return code
+
+
+def _check_ids(code: CompactIr) -> None:
+    """Checks that every opcode is known and every variable, label and big
+    integer id is within its list, so a corrupted file is reported instead
+    of failing when the instructions are read."""
+    variables = range(len(code.var_names))
+    labels = range(len(code.label_names))
+
+    for arg in code.args:
+        if arg not in variables:
+            raise ValueError(f"Binary IR has an invalid call argument: {arg}")
+
+    for i in range(len(code)):
+        opcode = code.opcodes[i]
+        dest = code.dests[i]
+        a, b, c = code.a[i], code.b[i], code.c[i]
+
+        if opcode == LABEL or opcode == JUMP:
+            valid = a in labels
+        elif opcode == LOAD_INT_CONST:
+            valid = dest in variables
+        elif opcode == LOAD_BIG_INT_CONST:
+            valid = dest in variables and 0 <= a < len(code.big_ints)
+        elif opcode == LOAD_BOOL_CONST:
+            valid = dest in variables and a in (0, 1)
+        elif opcode == COPY:
+            valid = dest in variables and a in variables
+        elif opcode == CALL:
+            valid = (
+                dest in variables
+                and a in variables
+                and 0 <= b
+                and 0 <= c
+                and b + c <= len(code.args)
+            )
+        elif opcode == COND_JUMP:
+            valid = a in variables and b in labels and c in labels
+        else:
+            valid = opcode == RETURN
+
+        if not valid:
+            raise ValueError(f"Binary IR has an invalid instruction at index {i}")
@@ -0,0 +1,491 @@
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import compiler.ir as ir
+from compiler.constant_folder import comparison_operators, int_operators, wrap
+from compiler.ir import Call, Copy, IRVar, LoadBoolConst, LoadIntConst
+
+# The operators whose call has no effect besides its result. Division can
+# fault, so an unused division is not removed.
+pure_operators = {
+    "+",
+    "-",
+    "*",
+    "<",
+    ">",
+    "<=",
+    ">=",
+    "==",
+    "!=",
+    "unary_-",
+    "unary_not",
+}
+
+
+@dataclass
+class IrSimplification:
+    """The result of `simplify_ir`."""
+
+    instructions: list[ir.Instruction]
+    # The number of rewrites of each rule, in the order they are tried
+    rule_hits: dict[str, int]
+    # The passes over the instructions, including the last one that
+    # changed nothing
+    passes: int
+
+
+class Definitions:
+    """What one pass of `simplify_ir` knows about the variables of the IR.
+
+    A variable that is written by a single instruction holds the value of
+    that instruction wherever it is read after it, since the IR generator
+    writes every variable before reading it. Variables written in several
+    places, like those of `if` results and of the source code's `var`s, can
+    only be reasoned about within a basic block."""
+
+    instructions: list[ir.Instruction]
+    # The instruction that writes each variable, or None if several do
+    definitions: dict[IRVar, Optional[ir.Instruction]]
+    # The index of that instruction in `instructions`
+    positions: dict[IRVar, int]
+    uses: dict[IRVar, int]
+    names: set[str]
+    next_number: int
+
+    def __init__(self, instructions: list[ir.Instruction]) -> None:
+        self.instructions = instructions
+        self.definitions = {}
+        self.positions = {}
+        self.uses = {}
+        self.names = set()
+        self.next_number = 0
+
+        for i, instruction in enumerate(instructions):
+            dest = destination(instruction)
+
+            if dest is not None:
+                self.names.add(dest.name)
+                self.definitions[dest] = (
+                    None if dest in self.definitions else instruction
+                )
+                self.positions[dest] = i
+
+            for var in operands(instruction):
+                self.uses[var] = self.uses.get(var, 0) + 1
+
+    def definition(self, var: IRVar) -> Optional[ir.Instruction]:
+        """The instruction that writes `var`, if it is the only one."""
+        return self.definitions.get(var)
+
+    def is_single(self, var: IRVar) -> bool:
+        """Whether `var` is written by a single instruction."""
+        return self.definitions.get(var) is not None
+
+    def int_constant(self, var: IRVar) -> Optional[int]:
+        definition = self.definitions.get(var)
+        if isinstance(definition, LoadIntConst):
+            return definition.value
+
+        return None
+
+    def bool_constant(self, var: IRVar) -> Optional[bool]:
+        definition = self.definitions.get(var)
+        if isinstance(definition, LoadBoolConst):
+            return definition.value
+
+        return None
+
+    def unchanged_since(self, var: IRVar, definition_of: IRVar, i: int) -> bool:
+        """Whether `var` has the same value at instruction `i` as at the
+        instruction that writes `definition_of`. This is only known if that
+        instruction comes before `i` in the same basic block and nothing
+        between them writes `var`."""
+        start = self.positions[definition_of]
+        if start >= i:
+            return False
+
+        for instruction in self.instructions[start + 1 : i]:
+            if isinstance(instruction, ir.Label) or destination(instruction) == var:
+                return False
+
+        return True
+
+    def new_var(self) -> IRVar:
+        while f"s{self.next_number}" in self.names:
+            self.next_number += 1
+
+        name = f"s{self.next_number}"
+        self.names.add(name)
+        return IRVar(name)
+
+
+def destination(instruction: ir.Instruction) -> Optional[IRVar]:
+    """The variable that an instruction writes, if any."""
+    match instruction:
+        case LoadIntConst() | LoadBoolConst() | Copy() | Call():
+            return instruction.dest
+        case _:
+            return None
+
+
+def operands(instruction: ir.Instruction) -> list[IRVar]:
+    """The variables that an instruction reads."""
+    match instruction:
+        case Copy():
+            return [instruction.source]
+        case Call():
+            return instruction.args
+        case ir.CondJump():
+            return [instruction.cond]
+        case _:
+            return []
+
+
+def call_of(instruction: Optional[ir.Instruction], op: str) -> Optional[Call]:
+    """The instruction if it calls `op`."""
+    if isinstance(instruction, Call) and instruction.fun.name == op:
+        return instruction
+
+    return None
+
+
+# A rule gets the instruction at index `i` and returns its replacement,
+# or None if the rule does not apply to it. The replacement computes the
+# same value into the same destination.
+Rule = Callable[[ir.Instruction, Definitions, int], Optional[list[ir.Instruction]]]
+
+
+def add_zero(
+    instruction: ir.Instruction, facts: Definitions, i: int
+) -> Optional[list[ir.Instruction]]:
+    """x + 0 and 0 + x are x."""
+    call = call_of(instruction, "+")
+    if call is None:
+        return None
+
+    left, right = call.args
+    if facts.int_constant(right) == 0:
+        return [Copy(left, call.dest)]
+    if facts.int_constant(left) == 0:
+        return [Copy(right, call.dest)]
+
+    return None
+
+
+def subtract_zero(
+    instruction: ir.Instruction, facts: Definitions, i: int
+) -> Optional[list[ir.Instruction]]:
+    """x - 0 is x."""
+    call = call_of(instruction, "-")
+    if call is None or facts.int_constant(call.args[1]) != 0:
+        return None
+
+    return [Copy(call.args[0], call.dest)]
+
+
+def multiply_one(
+    instruction: ir.Instruction, facts: Definitions, i: int
+) -> Optional[list[ir.Instruction]]:
+    """x * 1 and 1 * x are x."""
+    call = call_of(instruction, "*")
+    if call is None:
+        return None
+
+    left, right = call.args
+    if facts.int_constant(right) == 1:
+        return [Copy(left, call.dest)]
+    if facts.int_constant(left) == 1:
+        return [Copy(right, call.dest)]
+
+    return None
+
+
+def multiply_zero(
+    instruction: ir.Instruction, facts: Definitions, i: int
+) -> Optional[list[ir.Instruction]]:
+    """x * 0 and 0 * x are 0."""
+    call = call_of(instruction, "*")
+    if call is None or 0 not in [facts.int_constant(arg) for arg in call.args]:
+        return None
+
+    return [LoadIntConst(0, call.dest)]
+
+
+def subtract_self(
+    instruction: ir.Instruction, facts: Definitions, i: int
+) -> Optional[list[ir.Instruction]]:
+    """x - x is 0."""
+    call = call_of(instruction, "-")
+    if call is None or call.args[0] != call.args[1]:
+        return None
+
+    return [LoadIntConst(0, call.dest)]
+
+
+# The value of comparing a variable with itself
+self_comparisons = {
+    "==": True,
+    "<=": True,
+    ">=": True,
+    "!=": False,
+    "<": False,
+    ">": False,
+}
+
+
+def compare_self(
+    instruction: ir.Instruction, facts: Definitions, i: int
+) -> Optional[list[ir.Instruction]]:
+    """x == x is true, x != x is false, and so on."""
+    if not isinstance(instruction, Call):
+        return None
+
+    value = self_comparisons.get(instruction.fun.name)
+    if value is None or instruction.args[0] != instruction.args[1]:
+        return None
+
+    return [LoadBoolConst(value, instruction.dest)]
+
+
+def double_negation(
+    instruction: ir.Instruction, facts: Definitions, i: int
+) -> Optional[list[ir.Instruction]]:
+    """-(-x) is x."""
+    return _involution("unary_-", instruction, facts, i)
+
+
+def double_not(
+    instruction: ir.Instruction, facts: Definitions, i: int
+) -> Optional[list[ir.Instruction]]:
+    """not (not x) is x."""
+    return _involution("unary_not", instruction, facts, i)
+
+
+def _involution(
+    op: str, instruction: ir.Instruction, facts: Definitions, i: int
+) -> Optional[list[ir.Instruction]]:
+    call = call_of(instruction, op)
+    if call is None:
+        return None
+
+    inner_var = call.args[0]
+    inner = call_of(facts.definition(inner_var), op)
+    if inner is None or not facts.unchanged_since(inner.args[0], inner_var, i):
+        return None
+
+    return [Copy(inner.args[0], call.dest)]
+
+
+def reassociate(
+    instruction: ir.Instruction, facts: Definitions, i: int
+) -> Optional[list[ir.Instruction]]:
+    """(x + a) + b is x + (a + b), with the sum of the constants computed,
+    and likewise for - and for *. The inner result must not be used
+    elsewhere, so that its call can be removed."""
+    outer = _constant_term(instruction, facts)
+    if outer is None:
+        return None
+
+    inner_var, outer_op, outer_constant = outer
+    inner = _constant_term(facts.definition(inner_var), facts)
+    if inner is None or facts.uses.get(inner_var) != 1:
+        return None
+
+    x, inner_op, inner_constant = inner
+    if not facts.unchanged_since(x, inner_var, i):
+        return None
+
+    if outer_op == "*" and inner_op == "*":
+        op = "*"
+        constant = wrap(inner_constant * outer_constant)
+    elif outer_op != "*" and inner_op != "*":
+        op = "+"
+        constant = wrap(inner_constant + outer_constant)
+    else:
+        return None
+
+    assert isinstance(instruction, Call)
+    var_constant = facts.new_var()
+    return [
+        LoadIntConst(constant, var_constant),
+        Call(IRVar(op), [x, var_constant], instruction.dest),
+    ]
+
+
+def _constant_term(
+    instruction: Optional[ir.Instruction], facts: Definitions
+) -> Optional[tuple[IRVar, str, int]]:
+    """Returns `(x, op, c)` if the instruction is `x + c`, `c + x`, `x - c`,
+    `x * c` or `c * x` for a constant `c`. Subtraction is returned as the
+    addition of `-c`."""
+    if not isinstance(instruction, Call) or len(instruction.args) != 2:
+        return None
+
+    op = instruction.fun.name
+    left, right = instruction.args
+    right_constant = facts.int_constant(right)
+
+    if op in ["+", "*"]:
+        left_constant = facts.int_constant(left)
+
+        if right_constant is not None:
+            return left, op, right_constant
+        if left_constant is not None:
+            return right, op, left_constant
+    elif op == "-" and right_constant is not None:
+        return left, "+", -right_constant
+
+    return None
+
+
+def constant_call(
+    instruction: ir.Instruction, facts: Definitions, i: int
+) -> Optional[list[ir.Instruction]]:
+    """Computes an operator whose arguments are constants, like
+    `fold_constants` does in the AST."""
+    if not isinstance(instruction, Call):
+        return None
+
+    op = instruction.fun.name
+    dest = instruction.dest
+    args = instruction.args
+
+    if len(args) == 2:
+        left = facts.int_constant(args[0])
+        right = facts.int_constant(args[1])
+        if left is None or right is None:
+            return None
+
+        int_operator = int_operators.get(op)
+        if int_operator is not None:
+            value = int_operator(left, right)
+            return None if value is None else [LoadIntConst(value, dest)]
+
+        comparison_operator = comparison_operators.get(op)
+        if comparison_operator is not None:
+            return [LoadBoolConst(comparison_operator(left, right), dest)]
+    elif op == "unary_-":
+        operand = facts.int_constant(args[0])
+        if operand is not None:
+            return [LoadIntConst(wrap(-operand), dest)]
+    elif op == "unary_not":
+        bool_operand = facts.bool_constant(args[0])
+        if bool_operand is not None:
+            return [LoadBoolConst(not bool_operand, dest)]
+
+    return None
+
+
+def copy_propagation(
+    instruction: ir.Instruction, facts: Definitions, i: int
+) -> Optional[list[ir.Instruction]]:
+    """Reads the source of a copy instead of the copy, when both have a
+    single value and are written in that order before the read."""
+
+    def source(var: IRVar) -> IRVar:
+        definition = facts.definition(var)
+        if (
+            isinstance(definition, Copy)
+            and facts.is_single(definition.source)
+            and facts.positions[definition.source] < facts.positions[var] < i
+        ):
+            return definition.source
+
+        return var
+
+    match instruction:
+        case Copy():
+            new_source = source(instruction.source)
+            if new_source != instruction.source:
+                return [Copy(new_source, instruction.dest)]
+        case Call():
+            args = [source(arg) for arg in instruction.args]
+            if args != instruction.args:
+                return [Call(instruction.fun, args, instruction.dest)]
+        case ir.CondJump():
+            cond = source(instruction.cond)
+            if cond != instruction.cond:
+                return [
+                    ir.CondJump(cond, instruction.then_label, instruction.else_label)
+                ]
+
+    return None
+
+
+def self_copy(
+    instruction: ir.Instruction, facts: Definitions, i: int
+) -> Optional[list[ir.Instruction]]:
+    """Copying a variable to itself does nothing."""
+    if isinstance(instruction, Copy) and instruction.source == instruction.dest:
+        return []
+
+    return None
+
+
+def dead_code(
+    instruction: ir.Instruction, facts: Definitions, i: int
+) -> Optional[list[ir.Instruction]]:
+    """Removes an instruction whose result is never read, if it has no
+    other effect."""
+    dest = destination(instruction)
+    if dest is None or facts.uses.get(dest, 0) != 0:
+        return None
+
+    if isinstance(instruction, Call) and instruction.fun.name not in pure_operators:
+        return None
+
+    return []
+
+
+# The rules, in the order they are tried on each instruction
+simplification_rules: list[tuple[str, Rule]] = [
+    ("dead_code", dead_code),
+    ("self_copy", self_copy),
+    ("constant_call", constant_call),
+    ("add_zero", add_zero),
+    ("subtract_zero", subtract_zero),
+    ("multiply_one", multiply_one),
+    ("multiply_zero", multiply_zero),
+    ("subtract_self", subtract_self),
+    ("compare_self", compare_self),
+    ("double_negation", double_negation),
+    ("double_not", double_not),
+    ("reassociate", reassociate),
+    ("copy_propagation", copy_propagation),
+]
+
+
+def simplify_ir(instructions: list[ir.Instruction]) -> IrSimplification:
+    """Rewrites the IR with `simplification_rules` until none applies.
+
+    Each pass tries the rules on every instruction and replaces it with
+    the result of the first rule that applies. The rewrites of a pass can
+    enable others, like removing the call whose result a rule made unused,
+    so the passes are repeated until one changes nothing."""
+    rule_hits = {name: 0 for name, _ in simplification_rules}
+    passes = 0
+    changed = True
+
+    while changed:
+        passes += 1
+        changed = False
+        facts = Definitions(instructions)
+        simplified: list[ir.Instruction] = []
+
+        for i, instruction in enumerate(instructions):
+            for name, rule in simplification_rules:
+                replacement = rule(instruction, facts, i)
+
+                if replacement is not None:
+                    rule_hits[name] += 1
+                    changed = True
+                    simplified.extend(replacement)
+                    break
+            else:
+                simplified.append(instruction)
+
+        instructions = simplified
+
+    return IrSimplification(
+        instructions=instructions, rule_hits=rule_hits, passes=passes
+    )
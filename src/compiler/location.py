@@ -1,20 +1,80 @@
 from __future__ import annotations
 
-import math
+from array import array
+from bisect import bisect_right
 from dataclasses import dataclass
+from mmap import mmap
+from typing import Any, Optional
 
+# Sources are text, or UTF-8 bytes such as a memory mapped file
+SourceCode = str | bytes | mmap
 
-@dataclass
+
+@dataclass(slots=True)
 class Location:
     file: str
     line: int
     column: int
 
     def __eq__(self, other: object) -> bool:
-        if other is L:
-            return True
+        # Locations are only equal to themselves and to the wildcard L
+        if not isinstance(other, Location):
+            return False
 
-        return super.__eq__(self, other)
+        return self is other or self is L or other is L
 
 
 L = Location("file", -1, -1)
+
+
+class LineIndex:
+    """Maps source code offsets to locations.
+
+    The offsets of all line starts are collected once, so a location
+    is found with a binary search instead of rescanning the source.
+    Columns count characters, so in a bytes source the part of the line
+    before the offset is decoded to count them."""
+
+    file: str
+    # The source if it is bytes, whose offsets are not character offsets
+    encoded: Optional[bytes | mmap]
+    first_line: int
+    line_starts: array[int]
+
+    def __init__(
+        self,
+        source_code: SourceCode,
+        file: str = "",
+        start: int = 0,
+        end: Optional[int] = None,
+    ) -> None:
+        """Indexes the lines between `start` and `end`, which is the whole
+        source by default. Only offsets in that range can be looked up."""
+        self.file = file
+        self.encoded = None if isinstance(source_code, str) else source_code
+
+        newline: Any = "\n" if isinstance(source_code, str) else b"\n"
+        if end is None:
+            end = len(source_code)
+
+        if isinstance(source_code, mmap):
+            self.first_line = source_code[:start].count(newline)
+        else:
+            self.first_line = source_code.count(newline, 0, start)
+        self.line_starts = array("q", [source_code.rfind(newline, 0, start) + 1])
+
+        i = source_code.find(newline, start, end)
+        while i != -1:
+            self.line_starts.append(i + 1)
+            i = source_code.find(newline, i + 1, end)
+
+    def location(self, offset: int) -> Location:
+        line = bisect_right(self.line_starts, offset) - 1
+        line_start = self.line_starts[line]
+        column = offset - line_start
+
+        encoded = self.encoded
+        if encoded is not None:
+            column = len(encoded[line_start:offset].decode(errors="replace"))
+
+        return Location(file=self.file, line=self.first_line + line, column=column + 1)
@@ -17,8 +17,10 @@ from compiler.ast import (
     WhileExpression,
     BreakExpression,
     ContinueExpression,
+    ErrorExpression,
 )
 from compiler.parser_exception import (
+    Diagnostic,
     EndOfInputException,
     VariableCannotBeDeclaredException,
     MissingSemicolonException,
@@ -28,15 +30,35 @@ from compiler.parser_exception import (
     WrongScopeException,
 )
 from compiler.token import TokenType, Tokens
+from compiler.trampoline import Trampoline, max_direct_depth, run
 
-left_associative_binary_operators = [
-    ["or"],
-    ["and"],
-    ["==", "!="],
-    ["<", "<=", ">", ">="],
-    ["+", "-"],
-    ["*", "/", "%"],
-]
+
+class Associativity(Enum):
+    LEFT = 0
+    RIGHT = 1
+
+
+# Binding power and associativity of every binary operator.
+# Operators with a higher binding power bind tighter.
+binary_operators: dict[str, tuple[int, Associativity]] = {
+    "=": (1, Associativity.RIGHT),
+    "or": (2, Associativity.LEFT),
+    "and": (3, Associativity.LEFT),
+    "==": (4, Associativity.LEFT),
+    "!=": (4, Associativity.LEFT),
+    "<": (5, Associativity.LEFT),
+    "<=": (5, Associativity.LEFT),
+    ">": (5, Associativity.LEFT),
+    ">=": (5, Associativity.LEFT),
+    "+": (6, Associativity.LEFT),
+    "-": (6, Associativity.LEFT),
+    "*": (7, Associativity.LEFT),
+    "/": (7, Associativity.LEFT),
+    "%": (7, Associativity.LEFT),
+}
+
+# Identifiers that start a construct instead of naming a variable
+keywords = {"var", "const", "if", "while", "not", "break", "continue"}
 
 
 # TODO: Change to class seems clearer
@@ -48,66 +70,121 @@ class Scope(Enum):
     WHILE = 4
 
 
-def parse(tokens: Tokens) -> Expression:
-    __current_scopes = [Scope.TOP_LEVEL]
+class Parser:
+    """The state of parsing one sequence of tokens. See `parse`."""
+
+    tokens: Tokens
+    diagnostics: Optional[list[Diagnostic]]
+    _scopes: list[Scope]
+    _depth: int
+    _last_error_pos: int
+
+    def __init__(
+        self, tokens: Tokens, diagnostics: Optional[list[Diagnostic]] = None
+    ) -> None:
+        self.tokens = tokens
+        self.diagnostics = diagnostics
+        self._scopes = [Scope.TOP_LEVEL]
+        self._depth = 0
+        self._last_error_pos = -1
 
     @contextmanager
-    def scope(new_scope: Scope) -> Iterator[None]:
-        nonlocal __current_scopes
+    def scope(self, new_scope: Scope) -> Iterator[None]:
         try:
-            __current_scopes.append(new_scope)
+            self._scopes.append(new_scope)
             yield
         finally:
-            __current_scopes.pop()
+            self._scopes.pop()
 
     def has_scope(
-        scopes: list[Scope] | Scope, recurrsive: Optional[bool] = False
+        self, scopes: list[Scope] | Scope, recurrsive: Optional[bool] = False
     ) -> bool:
         if recurrsive:
             if isinstance(scopes, list):
-                return any(s in __current_scopes for s in scopes)
+                return any(s in self._scopes for s in scopes)
             else:
-                return scopes in __current_scopes
+                return scopes in self._scopes
         else:
             if isinstance(scopes, list):
-                return __current_scopes[-1] in scopes
+                return self._scopes[-1] in scopes
             else:
-                return __current_scopes[-1] == scopes
-
-    def parse_int_literal() -> Literal:
-        if tokens.peek().type != TokenType.INT_LITERAL:
-            raise Exception(f"{tokens.peek().location}: expected an integer literal")
-        token = tokens.consume()
+                return self._scopes[-1] == scopes
+
+    def report(self, error: Exception) -> ErrorExpression:
+        """Records a syntax error at the current token, or raises it when
+        not recovering from errors. Only the first error at a token is
+        kept, as the others follow from it."""
+        if self.diagnostics is None:
+            raise error
+
+        if self.tokens.pos != self._last_error_pos:
+            self.diagnostics.append(Diagnostic(self.tokens.peek().location, error))
+            self._last_error_pos = self.tokens.pos
+
+        return ErrorExpression()
+
+    def synchronize(self, in_block: bool) -> None:
+        """Skips the rest of a broken statement, up to its `;` or the `}`
+        of the enclosing block. Nested braces are skipped as a whole."""
+        nesting = 0
+
+        while self.tokens.peek().type != TokenType.END:
+            text = self.tokens.peek().text
+
+            if nesting == 0 and text == ";":
+                return
+            elif text == "{":
+                nesting += 1
+            elif text == "}":
+                if nesting == 0 and in_block:
+                    return
+                nesting = max(nesting - 1, 0)
+
+            self.tokens.consume()
+
+    def parse_int_literal(self) -> Literal:
+        if self.tokens.peek().type != TokenType.INT_LITERAL:
+            raise Exception(
+                f"{self.tokens.peek().location}: expected an integer literal"
+            )
+        token = self.tokens.consume()
         return Literal(int(token.text))
 
-    def parse_bool_literal() -> Literal:
-        if tokens.peek().type != TokenType.BOOL_LITERAL:
-            raise Exception(f"{tokens.peek().location}: expected a bool literal")
-        token = tokens.consume()
+    def parse_bool_literal(self) -> Literal:
+        if self.tokens.peek().type != TokenType.BOOL_LITERAL:
+            raise Exception(f"{self.tokens.peek().location}: expected a bool literal")
+        token = self.tokens.consume()
         return Literal(True if token.text == "true" else False)
 
-    def parse_identifier() -> Identifier:
-        if tokens.peek().type != TokenType.IDENTIFIER:
-            raise Exception(f"{tokens.peek().location}: expected an identifier")
-        token = tokens.consume()
+    def parse_identifier(self) -> Identifier:
+        if self.tokens.peek().type != TokenType.IDENTIFIER:
+            raise Exception(f"{self.tokens.peek().location}: expected an identifier")
+        token = self.tokens.consume()
         return Identifier(token.text)
 
-    def parse_parenthesized_expression() -> Expression:
-        with scope(Scope.LOCAL):
-            tokens.consume("(")
-            expr = parse_expression()
-            tokens.consume(")")
+    def parse_parenthesized_expression(self) -> Trampoline[Expression]:
+        with self.scope(Scope.LOCAL):
+            self.tokens.consume("(")
+            expr = yield from self.parse_expression()
+            self.tokens.consume(")")
             return expr
 
-    def parse_block_expression() -> BlockExpression:
-        tokens.consume("{")
+    def parse_block_expression(self) -> Trampoline[BlockExpression]:
+        self.tokens.consume("{")
 
         nested_expressions = []
         result: Expression = Literal(None)
 
-        with scope(Scope.BLOCK):
-            while tokens.peek().text != "}":
-                nested_expression = parse_expression()
+        with self.scope(Scope.BLOCK):
+            while (
+                self.tokens.peek().text != "}"
+                and self.tokens.peek().type != TokenType.END
+            ):
+                try:
+                    nested_expression = yield from self.parse_expression()
+                except Exception as e:
+                    nested_expression = self.report(e)
+                    self.synchronize(in_block=True)
                 nested_expressions.append(nested_expression)
 
                 if (
@@ -115,30 +192,42 @@ def parse(tokens: Tokens) -> Expression:
                     or isinstance(nested_expression, FunctionExpression)
                     or isinstance(nested_expression, IfExpression)
                 ):
-                    if tokens.peek().text == ";":
-                        tokens.consume(";")
-                    elif tokens.peek().text == "}":
+                    if self.tokens.peek().text == ";":
+                        self.tokens.consume(";")
+                    elif self.tokens.peek().text == "}":
                         result = nested_expressions.pop()
                 else:
-                    if tokens.peek().text == ";":
-                        tokens.consume(";")
-                    elif isinstance(nested_expression, BlockExpression|WhileExpression):
+                    if self.tokens.peek().text == ";":
+                        self.tokens.consume(";")
+                    elif isinstance(
+                        nested_expression, BlockExpression | WhileExpression
+                    ):
                         pass
-                    else:
+                    elif self.tokens.peek().text == "}":
                         result = nested_expressions.pop()
                         break
-
-        if tokens.peek().text != "}":
-            raise MissingSemicolonException(
-                f"{tokens.peek().location}: expected a closing brace"
+                    else:
+                        self.report(
+                            MissingSemicolonException(
+                                f"{self.tokens.peek().location}: expected a closing brace"
+                            )
+                        )
+                        self.synchronize(in_block=True)
+
+        if self.tokens.peek().text != "}":
+            self.report(
+                MissingSemicolonException(
+                    f"{self.tokens.peek().location}: expected a closing brace"
+                )
             )
+            return BlockExpression(nested_expressions, result)
 
-        tokens.consume("}")
+        self.tokens.consume("}")
 
         return BlockExpression(nested_expressions, result)
 
-    def parse_variable_declaration_expression() -> Expression:
-        if not has_scope(
+    def parse_variable_declaration_expression(self) -> Trampoline[Expression]:
+        if not self.has_scope(
             [
                 Scope.TOP_LEVEL,
                 Scope.TOP_LEVEL_EXPRESSION,
@@ -146,102 +235,105 @@ def parse(tokens: Tokens) -> Expression:
             ]
         ):
             raise VariableCannotBeDeclaredException(
-                f"{tokens.peek().location}: variable declaration is not in local scope here"
+                f"{self.tokens.peek().location}: variable declaration is not in local scope here"
             )
 
-        if (kind := tokens.peek().text) not in ["var", "const"]:
+        if (kind := self.tokens.peek().text) not in {"var", "const"}:
             raise Exception(
-                f"{tokens.peek().location}: expected a var or const keyword"
+                f"{self.tokens.peek().location}: expected a var or const keyword"
             )
 
-        tokens.consume(kind)
+        self.tokens.consume(kind)
 
-        name = tokens.consume().text
+        name = self.tokens.consume().text
         var_type: Optional[IntTypeExpression | BoolTypeExpression] = None
-        if tokens.peek().text == ":":
-            tokens.consume(":")
+        if self.tokens.peek().text == ":":
+            self.tokens.consume(":")
 
-            if tokens.peek().type != TokenType.TYPE:
-                raise MissingTypeException(f"{tokens.peek().location}: expected a type")
-            elif tokens.peek().text not in ["Int", "Bool"]:
-                raise UnknownTypeException(f"{tokens.peek().location}: unknown type")
+            if self.tokens.peek().type != TokenType.TYPE:
+                raise MissingTypeException(
+                    f"{self.tokens.peek().location}: expected a type"
+                )
+            elif self.tokens.peek().text not in {"Int", "Bool"}:
+                raise UnknownTypeException(
+                    f"{self.tokens.peek().location}: unknown type"
+                )
 
-            match tokens.consume().text:
+            match self.tokens.consume().text:
                 case "Int":
                     var_type = IntTypeExpression()
                 case "Bool":
                     var_type = BoolTypeExpression()
 
-        tokens.consume("=")
-        value = parse_left_associative_binary_operators(1)
+        self.tokens.consume("=")
+        # The value stops before "or" and "="
+        value = yield from self.parse_binary_operators(binary_operators["and"][0])
         return VariableDeclarationExpression(name, value, var_type, kind == "const")
 
-    def parse_if_expression() -> Expression:
-        with scope(Scope.LOCAL):
-            tokens.consume("if")
-            condition = parse_expression()
-            tokens.consume("then")
-            then_clause = parse_expression()
-            if tokens.peek().text == "else":
-                tokens.consume("else")
-                else_clause = parse_expression()
+    def parse_if_expression(self) -> Trampoline[Expression]:
+        with self.scope(Scope.LOCAL):
+            self.tokens.consume("if")
+            condition = yield from self.parse_expression()
+            self.tokens.consume("then")
+            then_clause = yield from self.parse_expression()
+            if self.tokens.peek().text == "else":
+                self.tokens.consume("else")
+                else_clause = yield from self.parse_expression()
             else:
                 else_clause = None
             return IfExpression(condition, then_clause, else_clause)
 
-    def parse_function_call() -> Expression:
-        with scope(Scope.LOCAL):
-            function_name = tokens.peek().text
-            tokens.consume(function_name)
-            tokens.consume("(")
+    def parse_function_call(self) -> Trampoline[Expression]:
+        with self.scope(Scope.LOCAL):
+            function_name = self.tokens.peek().text
+            self.tokens.consume(function_name)
+            self.tokens.consume("(")
             arguments = []
-            while tokens.peek().text != ")":
-                arguments.append(parse_expression())
-                if tokens.peek().text == ",":
-                    tokens.consume(",")
-                elif tokens.peek().text == ")":
+            while self.tokens.peek().text != ")":
+                arguments.append((yield from self.parse_expression()))
+                if self.tokens.peek().text == ",":
+                    self.tokens.consume(",")
+                elif self.tokens.peek().text == ")":
                     break
                 else:
-                    raise Exception(f"{tokens.peek().location}: expected a comma")
-            tokens.consume(")")
+                    raise Exception(f"{self.tokens.peek().location}: expected a comma")
+            self.tokens.consume(")")
 
             return FunctionExpression(function_name, arguments)
 
-    def parse_while_expression() -> Expression:
-        with scope(Scope.WHILE):
-            tokens.consume("while")
-            condition = parse_expression()
-            tokens.consume("do")
-            body = parse_block_expression()
+    def parse_while_expression(self) -> Trampoline[Expression]:
+        with self.scope(Scope.WHILE):
+            self.tokens.consume("while")
+            condition = yield from self.parse_expression()
+            self.tokens.consume("do")
+            body = yield from self.parse_block_expression()
             return WhileExpression(condition, body)
 
-    def parse_leaf_construct() -> Expression:
-        if tokens.peek().text == "(":
-            return parse_parenthesized_expression()
-        elif tokens.peek().text == "{":
-            return parse_block_expression()
-        elif tokens.peek().text in ["var", "const"]:
-            return parse_variable_declaration_expression()
-        elif tokens.peek().text == "if":
-            return parse_if_expression()
-        elif tokens.peek().text == "while":
-            return parse_while_expression()
-        elif tokens.peek().text in ["-", "not"]:
-            token = tokens.consume(tokens.peek().text)
-            return BinaryOp(None, token.text, parse_leaf_construct())
-        elif tokens.peek().type == TokenType.INT_LITERAL:
-            return parse_int_literal()
-        elif tokens.peek().type == TokenType.BOOL_LITERAL:
-            return parse_bool_literal()
-        elif tokens.peek().text in ["break", "continue"]:
-            if not has_scope(Scope.WHILE, True):
+    def parse_unary_expression(self) -> Trampoline[Expression]:
+        token = self.tokens.consume(self.tokens.peek().text)
+        operand = self.parse_simple_leaf()
+        if operand is None:
+            operand = yield from self.parse_nested_construct()
+        return BinaryOp(None, token.text, operand)
+
+    def parse_simple_leaf(self) -> Optional[Expression]:
+        """Parses a construct that contains no other expressions.
+        Consumes nothing and returns None for any other construct."""
+        token = self.tokens.peek()
+
+        if token.type == TokenType.INT_LITERAL:
+            return self.parse_int_literal()
+        elif token.type == TokenType.BOOL_LITERAL:
+            return self.parse_bool_literal()
+        elif token.text in {"break", "continue"}:
+            if not self.has_scope(Scope.WHILE, True):
                 raise WrongScopeException(
-                    f"{tokens.peek().location}: {tokens.peek().text} statement must be used inside a while loop"
+                    f"{self.tokens.peek().location}: {self.tokens.peek().text} statement must be used inside a while loop"
                 )
 
-            tokens.consume(tokens.peek().text)
+            self.tokens.consume(self.tokens.peek().text)
 
-            match tokens.prev_token().text:
+            match self.tokens.prev_token().text:
                 case "break":
                     return BreakExpression()
                 case "continue":
@@ -249,80 +341,187 @@ def parse(tokens: Tokens) -> Expression:
                 case _:
                     sys.exit("Unreachable code")
         elif (
-            tokens.peek().type == TokenType.IDENTIFIER
-            and tokens.next_token().text == "("
+            token.type == TokenType.IDENTIFIER
+            and token.text not in keywords
+            and self.tokens.next_token().text != "("
         ):
-            return parse_function_call()
-        elif tokens.peek().type == TokenType.IDENTIFIER:
-            return parse_identifier()
+            return self.parse_identifier()
+        else:
+            return None
+
+    def parse_leaf_construct(self) -> Trampoline[Expression]:
+        """Returns the parser of a construct that contains other expressions.
+        Constructs without any are parsed by `parse_simple_leaf`."""
+        if self.tokens.peek().text == "(":
+            return self.parse_parenthesized_expression()
+        elif self.tokens.peek().text == "{":
+            return self.parse_block_expression()
+        elif self.tokens.peek().text in {"var", "const"}:
+            return self.parse_variable_declaration_expression()
+        elif self.tokens.peek().text == "if":
+            return self.parse_if_expression()
+        elif self.tokens.peek().text == "while":
+            return self.parse_while_expression()
+        elif self.tokens.peek().text in {"-", "not"}:
+            return self.parse_unary_expression()
+        elif (
+            self.tokens.peek().type == TokenType.IDENTIFIER
+            and self.tokens.next_token().text == "("
+        ):
+            return self.parse_function_call()
         else:
             raise WrongTokenException(
-                f"{tokens.peek().location}: wrong token, got: {tokens.peek().type}: {tokens.peek().text}"
+                f"{self.tokens.peek().location}: wrong token, got: {self.tokens.peek().type}: {self.tokens.peek().text}"
             )
 
-    def parse_left_associative_binary_operators(level: int) -> Expression:
-        if level == len(left_associative_binary_operators):
-            return parse_leaf_construct()
+    def parse_nested_construct(self) -> Trampoline[Expression]:
+        """Parses a construct nested in an expression. Constructs delegate
+        to each other with `yield from`, and every `max_direct_depth` levels
+        one is handed to the trampoline to keep the chain of generators short."""
+        if self._depth >= max_direct_depth:
+            outer_depth = self._depth
+            self._depth = 0
+            try:
+                return (yield self.parse_nested_construct())
+            finally:
+                self._depth = outer_depth
+
+        self._depth += 1
+        try:
+            return (yield from self.parse_leaf_construct())
+        finally:
+            self._depth -= 1
 
-        left = parse_left_associative_binary_operators(level + 1)
+    def parse_binary_operators(self, min_power: int) -> Trampoline[Expression]:
+        """Parses operators that bind at least as tight as `min_power`.
 
-        while tokens.peek().text in left_associative_binary_operators[level]:
-            operator_token = tokens.consume()
-            operator = operator_token.text
-            right = parse_left_associative_binary_operators(level + 1)
-            left = BinaryOp(left, operator, right)
+        Operands and pending operators are kept on two stacks. An operator
+        is applied once the next operator binds looser, or equally tight
+        for left-associative ones, so only operands that are not simple
+        leaves need a nested call."""
+        operand = self.parse_simple_leaf()
+        if operand is None:
+            operand = yield from self.parse_nested_construct()
 
-        return left
+        binding = binary_operators.get(self.tokens.peek().text)
+        if binding is None or binding[0] < min_power:
+            return operand
+
+        operands = [operand]
+        operators: list[tuple[int, str]] = []
+
+        while binding is not None and binding[0] >= min_power:
+            power, associativity = binding
+
+            while operators and (
+                operators[-1][0] > power
+                or (operators[-1][0] == power and associativity == Associativity.LEFT)
+            ):
+                right = operands.pop()
+                operands[-1] = BinaryOp(operands[-1], operators.pop()[1], right)
+
+            operators.append((power, self.tokens.consume().text))
+
+            operand = self.parse_simple_leaf()
+            if operand is None:
+                operand = yield from self.parse_nested_construct()
+            operands.append(operand)
+
+            binding = binary_operators.get(self.tokens.peek().text)
+
+        while operators:
+            right = operands.pop()
+            operands[-1] = BinaryOp(operands[-1], operators.pop()[1], right)
+
+        return operands[0]
+
+    def parse_expression(self) -> Trampoline[Expression]:
+        """Returns the parser of an expression. Only top-level expressions
+        need more than the binary operator parser, to handle semicolons."""
+        if self.has_scope([Scope.TOP_LEVEL, Scope.TOP_LEVEL_EXPRESSION]):
+            return self.parse_top_level_expression()
+
+        return self.parse_binary_operators(0)
 
     # TODO: refactor this function to parse top level expression
-    def parse_expression() -> Expression:
-        left = parse_left_associative_binary_operators(1)
-
-        while True:
-            if tokens.peek().text in ["="]:  # right-associative
-                operator_token = tokens.consume()
-                operator = operator_token.text
-                right = parse_expression()
-                left = BinaryOp(left, operator, right)
-            elif tokens.peek().text in left_associative_binary_operators[0]:
-                operator_token = tokens.consume()
-                operator = operator_token.text
-                right = parse_left_associative_binary_operators(1)
-                left = BinaryOp(left, operator, right)
-            elif has_scope(Scope.TOP_LEVEL) and tokens.peek().text == ";":
-                tokens.consume(";")
-
-                if tokens.peek().type == TokenType.END:
-                    return BlockExpression([left], Literal(None))
-
-                expressions = [left]
-
-                with scope(Scope.TOP_LEVEL_EXPRESSION):
-                    while not (
-                        tokens.peek().text == "}" or tokens.peek().type == TokenType.END
-                    ):
-                        expressions.append(parse_expression())
+    def parse_top_level_expression(self) -> Trampoline[Expression]:
+        try:
+            left = yield from self.parse_binary_operators(0)
+        except Exception as e:
+            left = self.report(e)
+            self.synchronize(in_block=False)
+
+        if (
+            self.has_scope(Scope.TOP_LEVEL)
+            and self.tokens.peek().text != ";"
+            and self.tokens.peek().type != TokenType.END
+        ):
+            # Without a semicolon, the first statement must be the whole program
+            self.report(
+                EndOfInputException(
+                    f"{self.tokens.peek().location}: expected a semicolon"
+                )
+            )
+            self.synchronize(in_block=False)
 
-                left = BlockExpression(expressions, Literal(None))
-            elif has_scope(Scope.TOP_LEVEL_EXPRESSION) and tokens.peek().text == ";":
-                tokens.consume(";")
-                return left
-            else:
-                return left
+        if self.has_scope(Scope.TOP_LEVEL) and self.tokens.peek().text == ";":
+            self.tokens.consume(";")
+
+            if self.tokens.peek().type == TokenType.END:
+                return BlockExpression([left], Literal(None))
+
+            expressions = [left]
+
+            with self.scope(Scope.TOP_LEVEL_EXPRESSION):
+                # A stray closing brace ends the program, unless it is
+                # reported and skipped like any other error
+                while not (
+                    (self.tokens.peek().text == "}" and self.diagnostics is None)
+                    or self.tokens.peek().type == TokenType.END
+                ):
+                    expressions.append((yield from self.parse_expression()))
+
+            left = BlockExpression(expressions, Literal(None))
+        elif (
+            self.has_scope(Scope.TOP_LEVEL_EXPRESSION)
+            and self.tokens.peek().text == ";"
+        ):
+            self.tokens.consume(";")
+
+        return left
+
+    def parse(self, statement: bool = False) -> Expression:
+        if statement:
+            with self.scope(Scope.TOP_LEVEL_EXPRESSION):
+                return run(self.parse_expression())
+
+        if self.tokens.empty():
+            return Literal(None)
+
+        expression = run(self.parse_expression())
+
+        if (
+            isinstance(expression, BlockExpression)
+            and self.tokens.prev_token().text not in {";", "}"}
+            and len(expression.expressions) > 0
+        ):
+            expression.result = expression.expressions.pop()
 
-    if tokens.empty():
-        return Literal(None)
+        if self.tokens.peek().type != TokenType.END:
+            raise EndOfInputException()
 
-    expression = parse_expression()
+        return expression
 
-    if (
-        isinstance(expression, BlockExpression)
-        and tokens.prev_token().text not in [";", "}"]
-        and len(expression.expressions) > 0
-    ):
-        expression.result = expression.expressions.pop()
 
-    if tokens.peek().type != TokenType.END:
-        raise EndOfInputException()
+def parse(
+    tokens: Tokens,
+    statement: bool = False,
+    diagnostics: Optional[list[Diagnostic]] = None,
+) -> Expression:
+    """Parses a whole program. With `statement`, parses only the next
+    top-level statement and its semicolon, leaving the rest of the tokens.
 
-    return expression
+    With `diagnostics`, syntax errors are appended to it instead of raised.
+    The parser then skips to the end of the broken statement, at the next
+    `;` or `}`, and leaves an `ErrorExpression` in its place."""
+    return Parser(tokens, diagnostics).parse(statement)
@@ -1,3 +1,9 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from compiler.location import Location
+
+
 class EndOfInputException(Exception):
     pass
 
@@ -24,3 +30,11 @@ class WrongTokenException(Exception):
 
 class WrongScopeException(Exception):
     pass
+
+
+@dataclass
+class Diagnostic:
+    """A syntax error reported by a parse that recovers from errors."""
+
+    location: Optional[Location]
+    error: Exception
@@ -0,0 +1,17 @@
+class CompilerStats:
+    """Numbers that passes report about a compilation, printed by the
+    `--stats` argument of the compiler."""
+
+    values: dict[str, int | float]
+
+    def __init__(self) -> None:
+        self.values = {}
+
+    def add(self, name: str, value: int | float) -> None:
+        self.values[name] = value
+
+    def __str__(self) -> str:
+        return "\n".join(
+            f"{name}: {value:.3f}" if isinstance(value, float) else f"{name}: {value}"
+            for name, value in self.values.items()
+        )
@@ -1,8 +1,12 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Sequence, Set
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional
+from typing import Optional, overload
 
-from compiler.location import Location
+from compiler.location import LineIndex, Location, SourceCode
 
 
 class TokenType(Enum):
@@ -16,57 +20,225 @@ class TokenType(Enum):
     TYPE = 7
 
 
-@dataclass
+token_types = list(TokenType)
+
+
+@dataclass(slots=True)
 class Token:
     type: TokenType
     text: str
     location: Optional[Location] = None
 
 
-@dataclass
+class TokenBuffer(Sequence[Token]):
+    """Stores tokens as parallel arrays instead of one object per token.
+
+    Every token is a kind code, its start and end offsets in the source
+    and the id of its text in an interned text table. The offsets are
+    64-bit, so mapped sources over 4 GiB fit. Comments are not interned,
+    their text is sliced from the source when needed.
+    `Token` objects and their locations are only built on access."""
+
+    source_code: SourceCode
+    lines: LineIndex
+    kinds: array[int]
+    starts: array[int]
+    ends: array[int]
+    text_ids: array[int]
+    texts: list[str]
+    _text_ids: dict[str, int]
+
+    def __init__(
+        self, source_code: SourceCode, lines: Optional[LineIndex] = None
+    ) -> None:
+        self.source_code = source_code
+        self.lines = lines if lines is not None else LineIndex(source_code)
+        self.kinds = array("B")
+        self.starts = array("Q")
+        self.ends = array("Q")
+        self.text_ids = array("i")
+        self.texts = []
+        self._text_ids = {}
+
+    def append(self, token_type: TokenType, start: int, end: int, text: str) -> None:
+        self.kinds.append(token_type.value)
+        self.starts.append(start)
+        self.ends.append(end)
+
+        if token_type == TokenType.COMMENT:
+            self.text_ids.append(-1)
+        else:
+            self.text_ids.append(self.intern(text))
+
+    def extend(
+        self,
+        kinds: array[int],
+        starts: array[int],
+        ends: array[int],
+        text_ids: array[int],
+        texts: list[str],
+        offset: int,
+    ) -> None:
+        """Appends tokens scanned from a part of the source starting at `offset`.
+        Their text ids refer to `texts` and are re-interned into this buffer."""
+        new_text_ids = [self.intern(text) for text in texts]
+
+        self.kinds.extend(kinds)
+        self.starts.extend(array("Q", [start + offset for start in starts]))
+        self.ends.extend(array("Q", [end + offset for end in ends]))
+        self.text_ids.extend(
+            array("i", [-1 if i == -1 else new_text_ids[i] for i in text_ids])
+        )
+
+    def intern(self, text: str) -> int:
+        text_id = self._text_ids.get(text)
+
+        if text_id is None:
+            text_id = len(self.texts)
+            self.texts.append(text)
+            self._text_ids[text] = text_id
+
+        return text_id
+
+    def type(self, pos: int) -> TokenType:
+        return token_types[self.kinds[pos]]
+
+    def text(self, pos: int) -> str:
+        text_id = self.text_ids[pos]
+
+        if text_id == -1:
+            return self._comment_text(pos)
+
+        return self.texts[text_id]
+
+    def location(self, pos: int) -> Location:
+        return self.lines.location(self.starts[pos])
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def _comment_text(self, pos: int) -> str:
+        text = self.source_code[self.starts[pos] : self.ends[pos]]
+
+        return text if isinstance(text, str) else text.decode(errors="replace")
+
+    @overload
+    def __getitem__(self, pos: int) -> Token: ...
+
+    @overload
+    def __getitem__(self, pos: slice) -> list[Token]: ...
+
+    def __getitem__(self, pos: int | slice) -> Token | list[Token]:
+        if isinstance(pos, slice):
+            return [self.token(i) for i in range(*pos.indices(len(self)))]
+
+        if pos < 0:
+            pos += len(self)
+
+        if not 0 <= pos < len(self):
+            raise IndexError("token index out of range")
+
+        return self.token(pos)
+
+    def token(self, pos: int) -> Token:
+        """Builds the token at `pos` without bounds checks."""
+        text_id = self.text_ids[pos]
+
+        return Token(
+            token_types[self.kinds[pos]],
+            self.texts[text_id] if text_id != -1 else self._comment_text(pos),
+            self.lines.location(self.starts[pos]),
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+
+        return list(self) == list(other)
+
+
 class Tokens:
-    tokens: list[Token]
-    pos = 0
+    tokens: Sequence[Token]
+    pos: int
+
+    def __init__(self, tokens: Sequence[Token]) -> None:
+        self.tokens = tokens
+        self.pos = 0
+        self._length = len(tokens)
+        self._token_at = (
+            tokens.token if isinstance(tokens, TokenBuffer) else tokens.__getitem__
+        )
+
+        # Returned for every position past the last token
+        self._end = Token(
+            location=tokens[-1].location if self._length > 0 else None,
+            type=TokenType.END,
+            text="",
+        )
+        self._previous = self._end
+        self._current = self._get(0)
+        self._next: Optional[Token] = None
 
     def peek(self) -> Token:
-        return self._get(self.pos)
+        return self._current
 
     def next_token(self) -> Token:
-        next_pos = self.pos + 1
+        if self._next is None:
+            self._next = self._get(self.pos + 1)
 
-        return self._get(next_pos)
+        return self._next
 
     def prev_token(self) -> Token:
-        prev_pos = self.pos - 1
-
-        return self._get(prev_pos)
+        return self._previous
 
-    def consume(self, expected: str | list[str] | None = None) -> Token:
-        token = self.peek()
+    def consume(self, expected: str | Set[str] | list[str] | None = None) -> Token:
+        token = self._current
         if isinstance(expected, str) and token.text != expected:
             raise Exception(f'{token.location}: expected "{expected}"')
-        if isinstance(expected, list) and token.text not in expected:
-            comma_separated = ", ".join([f'"{e}"' for e in expected])
-            raise Exception(f"{token.location}: expected one of: {comma_separated}")
-
+        if expected is not None and not isinstance(expected, str):
+            if token.text not in expected:
+                ordered = expected if isinstance(expected, list) else sorted(expected)
+                comma_separated = ", ".join([f'"{e}"' for e in ordered])
+                raise Exception(f"{token.location}: expected one of: {comma_separated}")
+
+        self._previous = token
+        self._current = self.next_token()
+        self._next = None
         self.pos += 1
 
         return token
 
     def empty(self) -> bool:
-        return len(self.tokens) == 0
+        return self._length == 0
 
     def _get(self, pos: int) -> Token:
-        if pos < len(self.tokens):
-            return self.tokens[pos]
-        elif len(self.tokens) == 0:
-            return Token(
-                type=TokenType.END,
-                text="",
-            )
+        if pos < self._length:
+            return self._token_at(pos)
         else:
-            return Token(
-                location=self.tokens[-1].location,
-                type=TokenType.END,
-                text="",
-            )
+            return self._end
+
+
+class StreamingTokens(Tokens):
+    """A `Tokens` cursor that pulls tokens from an iterator.
+
+    Only the previous, current and next tokens are kept, which is all
+    the lookahead the parser uses, so the full token list never exists."""
+
+    def __init__(self, tokens: Iterable[Token]) -> None:
+        self._iterator = iter(tokens)
+        self._last: Optional[Token] = None
+        super().__init__([])
+
+    def empty(self) -> bool:
+        return self.pos == 0 and self._current is self._end
+
+    def _get(self, pos: int) -> Token:
+        token = next(self._iterator, None)
+
+        if token is None:
+            if self._last is not None:
+                self._end.location = self._last.location
+            return self._end
+
+        self._last = token
+        return token
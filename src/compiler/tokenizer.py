@@ -1,59 +1,184 @@
 import re
-from typing import Optional
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterator, Optional
 
-from compiler.location import Location
-from compiler.token import Token, TokenType
+from compiler.location import LineIndex, SourceCode
+from compiler.token import Token, TokenBuffer, TokenType
 
-whitespace_re = re.compile(r"\s+")
-identifier_re = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
-operator_re = re.compile(r"(==?)|(!=)|(<=?)|(>=?)|\+|-|\*|/|%")
-int_literal_re = re.compile(r"\d+")
-bool_literal_re = re.compile(r"true|false")
-punctuation_re = re.compile(r"[(){},;:]")
-comment_re = re.compile(r"#.*$|//.*$|/\*[\S\s]*?\*/", re.MULTILINE)
-type_re = re.compile(r"Int|Bool")
+# All token kinds are tried in a single pass of one combined pattern.
+# Leading whitespace is skipped as part of each match, "error" catches
+# any character nothing else accepts and "end" matches trailing whitespace.
+# The order of the alternatives matters: comments must win over "/".
+token_re = re.compile(
+    r"""
+    \s*
+    (?:
+        (?P<comment>\#.*$|//.*$|/\*[\S\s]*?\*/)
+        | (?P<int_literal>\d+)
+        | (?P<identifier>[A-Za-z_][A-Za-z0-9_]*)
+        | (?P<operator>==?|!=|<=?|>=?|[-+*/%])
+        | (?P<punctuation>[(){},;:])
+        | (?P<end>\Z)
+        | (?P<error>.)
+    )
+    """,
+    re.MULTILINE | re.VERBOSE,
+)
+# The same pattern for ASCII sources given as bytes or a memory mapped file
+bytes_token_re = re.compile(token_re.pattern.encode(), re.MULTILINE | re.VERBOSE)
 
+# Finds only comments, to tell whether a line break lies inside a block comment
+comment_re = re.compile(r"\#[^\n]*|//[^\n]*|(?P<block>/\*[\S\s]*?\*/)")
+bytes_comment_re = re.compile(comment_re.pattern.encode())
 
-def tokenize(source_code: str) -> list[Token]:
-    result = []
+# Sources shorter than this are not worth splitting across processes
+parallel_threshold = 1_000_000
 
-    i = 0
+group_types: dict[str, TokenType] = {
+    "comment": TokenType.COMMENT,
+    "int_literal": TokenType.INT_LITERAL,
+    "identifier": TokenType.IDENTIFIER,
+    "operator": TokenType.OPERATOR,
+    "punctuation": TokenType.PUNCTUATION,
+}
 
-    while i < len(source_code):
-        match: Optional[re.Match[str]] = None
+# Words matched by the identifier pattern are classified with one lookup,
+# so "Integer" or "trueish" stay identifiers. Keywords such as "var" and
+# "if" are identifiers too, the parser recognizes them by their text.
+keyword_types: dict[str, TokenType] = {
+    "Int": TokenType.TYPE,
+    "Bool": TokenType.TYPE,
+    "true": TokenType.BOOL_LITERAL,
+    "false": TokenType.BOOL_LITERAL,
+}
 
-        if match := whitespace_re.match(source_code, i):
-            pass
-        else:
-            if match := comment_re.match(source_code, i):
-                result.append(Token(text=match.group(), type=TokenType.COMMENT))
-            elif match := type_re.match(source_code, i):
-                result.append(Token(text=match.group(), type=TokenType.TYPE))
-            elif match := bool_literal_re.match(source_code, i):
-                result.append(Token(text=match.group(), type=TokenType.BOOL_LITERAL))
-            elif match := int_literal_re.match(source_code, i):
-                result.append(Token(text=match.group(), type=TokenType.INT_LITERAL))
-            elif match := identifier_re.match(source_code, i):
-                result.append(Token(text=match.group(), type=TokenType.IDENTIFIER))
-            elif match := operator_re.match(source_code, i):
-                result.append(Token(text=match.group(), type=TokenType.OPERATOR))
-            elif match := punctuation_re.match(source_code, i):
-                result.append(Token(text=match.group(), type=TokenType.PUNCTUATION))
-            else:
-                raise Exception("wrong source code")
-
-            start, stop = match.span()
-            last_new_line = source_code[:start].rfind("\n")
-            if last_new_line == -1:
-                start_column = start + 1
-            else:
-                start_column = start - source_code[:start].rfind("\n")
-            start_line = source_code[:start].count("\n")
-
-            result[-1].location = Location(
-                line=start_line, column=start_column, file=""
-            )
-
-        i = match.end()
+
+def tokenize(
+    source_code: SourceCode, start: int = 0, end: Optional[int] = None
+) -> TokenBuffer:
+    """Tokenizes the source between `start` and `end`, which is the whole
+    source by default. Token offsets are always relative to the whole source."""
+    if end is None:
+        end = len(source_code)
+
+    result = TokenBuffer(source_code, LineIndex(source_code, start=start, end=end))
+
+    for token_type, token_start, token_end, text in __scan(source_code, start, end):
+        result.append(token_type, token_start, token_end, text)
 
     return result
+
+
+def tokenize_parallel(source_code: SourceCode, jobs: int) -> TokenBuffer:
+    """Tokenizes large sources in `jobs` processes. The source is split
+    into chunks at line breaks outside block comments, so every token lies
+    within one chunk, and the chunks' tokens are joined in order."""
+    if jobs <= 1 or len(source_code) < parallel_threshold:
+        return tokenize(source_code)
+
+    chunk_starts = __chunk_starts(source_code, jobs)
+    chunk_ends = [*chunk_starts[1:], len(source_code)]
+
+    with ProcessPoolExecutor(jobs) as executor:
+        chunks = executor.map(
+            __tokenize_chunk,
+            [source_code[start:end] for start, end in zip(chunk_starts, chunk_ends)],
+        )
+
+        result = TokenBuffer(source_code)
+
+        for start, chunk in zip(chunk_starts, chunks):
+            if chunk is None:
+                # Tokenize serially to report the error with its real location
+                return tokenize(source_code)
+
+            result.extend(*chunk, offset=start)
+
+    return result
+
+
+def __chunk_starts(source_code: SourceCode, jobs: int) -> list[int]:
+    pattern: re.Pattern[Any] = (
+        comment_re if isinstance(source_code, str) else bytes_comment_re
+    )
+    newline: Any = "\n" if isinstance(source_code, str) else b"\n"
+
+    block_comments = [
+        match.span()
+        for match in pattern.finditer(source_code)
+        if match.lastgroup == "block"
+    ]
+    comment_starts = [start for start, _ in block_comments]
+
+    chunk_starts = [0]
+
+    for job in range(1, jobs):
+        start = source_code.find(newline, job * len(source_code) // jobs) + 1
+
+        # Move past the block comments that contain the line break, since
+        # the next line break can be inside another one
+        while start > 0:
+            comment = bisect_right(comment_starts, start) - 1
+            if comment < 0 or start >= block_comments[comment][1]:
+                break
+
+            start = source_code.find(newline, block_comments[comment][1]) + 1
+
+        if start > chunk_starts[-1]:
+            chunk_starts.append(start)
+
+    return chunk_starts
+
+
+def __tokenize_chunk(
+    source_code: SourceCode,
+) -> tuple[array[int], array[int], array[int], array[int], list[str]] | None:
+    try:
+        tokens = tokenize(source_code)
+    except Exception:
+        return None
+
+    return tokens.kinds, tokens.starts, tokens.ends, tokens.text_ids, tokens.texts
+
+
+def tokenize_stream(source_code: SourceCode) -> Iterator[Token]:
+    """Yields tokens one by one as they are scanned, so the parser can
+    start before the whole source is tokenized."""
+    lines = LineIndex(source_code)
+
+    for token_type, start, _, text in __scan(source_code, 0, len(source_code)):
+        yield Token(token_type, text, lines.location(start))
+
+
+def __scan(
+    source_code: SourceCode, start: int, end: int
+) -> Iterator[tuple[TokenType, int, int, str]]:
+    pattern: re.Pattern[Any] = (
+        token_re if isinstance(source_code, str) else bytes_token_re
+    )
+
+    for match in pattern.finditer(source_code, start, end):
+        group = match.lastgroup or "error"
+        token_start, token_end = match.span(group)
+
+        if group == "end":
+            break
+
+        text = match.group(group)
+
+        # Bytes sources are decoded token by token, never as a whole
+        if not isinstance(text, str):
+            text = text.decode(errors="replace")
+
+        if group == "error":
+            location = LineIndex(source_code).location(token_start)
+            raise Exception(f"{location}: wrong source code: {text}")
+
+        if group == "identifier":
+            token_type = keyword_types.get(text, TokenType.IDENTIFIER)
+        else:
+            token_type = group_types[group]
+
+        yield token_type, token_start, token_end, text
@@ -0,0 +1,46 @@
+from typing import Any, Generator, TypeVar
+
+T = TypeVar("T")
+
+# A recursive function written as a generator. Instead of calling itself
+# it yields the generator of the nested call and receives its result.
+Trampoline = Generator["Trampoline[Any]", Any, T]
+
+# How deep nested calls may delegate with `yield from` before they go
+# through the trampoline. Each delegation level is a Python frame.
+max_direct_depth = 50
+
+
+def run(computation: Trampoline[T]) -> T:
+    """Runs a trampolined computation with an explicit stack of generators,
+    so its nesting depth is not limited by Python's recursion limit.
+
+    Exceptions propagate from a nested call to its caller as with normal
+    calls, so `try` and `with` blocks around a `yield` work as expected."""
+    stack: list[Trampoline[Any]] = [computation]
+    value: Any = None
+    error: BaseException | None = None
+
+    while True:
+        try:
+            if error is None:
+                call = stack[-1].send(value)
+            else:
+                call = stack[-1].throw(error)
+        except StopIteration as e:
+            stack.pop()
+            if not stack:
+                return e.value  # type: ignore[no-any-return]
+
+            value = e.value
+            error = None
+        except Exception as e:
+            stack.pop()
+            if not stack:
+                raise
+
+            error = e
+        else:
+            stack.append(call)
+            value = None
+            error = None
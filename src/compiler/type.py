@@ -1,37 +1,51 @@
 from dataclasses import dataclass
 
 
-@dataclass(frozen=True)
+# There is one instance of each type, made by `primitive_type`, so types
+# are compared and hashed by identity
+
+
+@dataclass(frozen=True, eq=False)
 class PrimitiveType:
     name: str
 
-    def __eq__(self, other: object) -> bool:
-        if isinstance(other, ConstType):
-            return self.name == other.name
 
-        if isinstance(other, PrimitiveType):
-            return self.name == other.name
+@dataclass(frozen=True, eq=False)
+class ConstType:
+    name: str
 
-        return False
 
+Type = PrimitiveType | ConstType
 
-@dataclass(frozen=True)
-class ConstType:
-    name: str
+_primitive_types: dict[str, PrimitiveType] = {}
 
-    def __eq__(self, other: object) -> bool:
-        if isinstance(other, ConstType):
-            return self.name == other.name
+# The const variant of each type. A const type is its own const variant.
+const_types: dict[Type, ConstType] = {}
 
-        return False
+# The type that each type is the const variant of. A type that is not
+# const is its own base type.
+base_types: dict[Type, PrimitiveType] = {}
 
 
-Int = PrimitiveType("Int")
-Bool = PrimitiveType("Bool")
-Unit = PrimitiveType("Unit")
-Func = PrimitiveType("Function")
+def primitive_type(name: str) -> PrimitiveType:
+    """Returns the type called `name`, which is created with its const
+    variant the first time."""
+    t = _primitive_types.get(name)
 
-ConstInt = ConstType("Int")
-ConstBool = ConstType("Bool")
+    if t is None:
+        t = _primitive_types[name] = PrimitiveType(name)
+        const_t = ConstType(name)
 
-Type = PrimitiveType | ConstType
+        const_types[t] = const_types[const_t] = const_t
+        base_types[t] = base_types[const_t] = t
+
+    return t
+
+
+Int = primitive_type("Int")
+Bool = primitive_type("Bool")
+Unit = primitive_type("Unit")
+Func = primitive_type("Function")
+
+ConstInt = const_types[Int]
+ConstBool = const_types[Bool]
@@ -1,5 +1,6 @@
+import operator
 import typing
-from typing import Optional, Callable
+from typing import Any, Optional, Callable
 
 from compiler.ast import (
     Expression,
@@ -18,7 +19,10 @@ from compiler.ast import (
     BreakExpression,
     ContinueExpression,
 )
-from compiler.type import Int, Type, Bool, Unit, ConstType, PrimitiveType
+from compiler.builtin_type import builtin_signatures
+from compiler.dispatch import find_handler
+from compiler.trampoline import Trampoline, max_direct_depth, run
+from compiler.type import Int, Type, Bool, Unit, base_types, const_types
 from compiler.type_checker_exception import (
     UnknownTypeException,
     IncompatibleTypeException,
@@ -28,37 +32,40 @@ from compiler.type_checker_exception import (
 )
 
 
-def create_typecheck(
-    expected_types: list[Type], return_type: Optional[Type] = None
-) -> Callable[[list[Type]], Type]:
-    def _(types: list[Type]) -> Type:
+class TypecheckFunction:
+    """Checks the argument types of a call to a function or operator
+    and returns the type of its result."""
+
+    expected_types: list[Type]
+    return_type: Optional[Type]
+
+    def __init__(
+        self, expected_types: list[Type], return_type: Optional[Type] = None
+    ) -> None:
+        self.expected_types = expected_types
+        self.return_type = return_type
+
+    def __call__(self, types: list[Type]) -> Type:
         for i, t in enumerate(types):
-            if len(expected_types) <= i:
+            if len(self.expected_types) <= i:
                 raise WrongNumberOfArgumentsException(
-                    f"Too many arguments. Expect {len(expected_types)}, got: {len(types)}"
+                    f"Too many arguments. Expect {len(self.expected_types)}, got: {len(types)}"
                 )
 
-            if t is not expected_types[i]:
+            if t is not self.expected_types[i]:
                 raise IncompatibleTypeException(
-                    f"Incompatible types. Expect {expected_types}, got: {types}"
+                    f"Incompatible types. Expect {self.expected_types}, got: {types}"
                 )
 
-        return return_type if return_type is not None else expected_types[0]
-
-    return _
-
-
-def create_typecheck_binary_operator(
-    operators: list[str], expected_type: Type, return_type: Optional[Type] = None
-) -> Callable[[list[Type]], Type]:
-    def _(types: list[Type]) -> Type:
-        return create_typecheck([expected_type, expected_type], return_type)(types)
-
-    return _
+        return (
+            self.return_type if self.return_type is not None else self.expected_types[0]
+        )
 
 
 def typecheck_equal_operator(types: tuple[Type, Type]) -> Type:
-    if types[0] == types[1]:
+    # A value can be assigned to a variable of its type, and a const value
+    # also to a variable of its base type
+    if types[1] is types[0] or base_types[types[1]] is types[0]:
         return types[0]
 
     raise IncompatibleTypeException(
@@ -66,24 +73,6 @@ def typecheck_equal_operator(types: tuple[Type, Type]) -> Type:
     )
 
 
-operator_types: list[tuple[list[str], Callable[[list[Type]], Type]]] = [
-    (
-        ["+", "-", "*", "/", "%"],
-        create_typecheck_binary_operator(["+", "-", "*", "/", "%"], Int),
-    ),
-    (
-        ["<", ">", "<=", ">=", "==", "!="],
-        create_typecheck_binary_operator(["<", ">", "<=", ">=", "==", "!="], Int, Bool),
-    ),
-    (
-        ["and", "or", "-", "not"],
-        create_typecheck_binary_operator(["and", "or", "-", "not"], Bool, Bool),
-    ),
-    (["print_int"], create_typecheck([Int], Int)),
-    (["print_bool"], create_typecheck([Bool], Bool)),
-    (["read_int"], create_typecheck([], Int)),
-]
-
 ast_types: list[tuple[typing.Type[TypeExpression], Type]] = [
     (IntTypeExpression, Int),
     (BoolTypeExpression, Bool),
@@ -91,123 +80,400 @@ ast_types: list[tuple[typing.Type[TypeExpression], Type]] = [
 ]
 
 
-def typecheck(
-    node: Expression, identifier_types: Optional[dict[str, Type]] = None
-) -> Type:
-    node.type = __typecheck(node, identifier_types)
-    return node.type
+# The rules for the type of each kind of node, given the types of its
+# nested nodes. They are shared by `typecheck` and the fused pass in
+# `typed_ir_generator`.
 
 
-def __typecheck(
-    node: Expression, identifier_types: Optional[dict[str, Type]] = None
+def literal_type(value: int | bool | None) -> Type:
+    match value:
+        case bool():
+            return Bool
+        case int():
+            return Int
+        case None:
+            return Unit
+        case _:
+            raise UnknownTypeException(f"Unknown type: {value}")
+
+
+def binary_operator_type(op: str, left_type: Type, right_type: Type) -> Type:
+    if op == "=":
+        return typecheck_equal_operator((left_type, right_type))
+
+    signature = builtin_signatures.get(op)
+    if signature is None:
+        raise UnknownOperatorException(f"Unknown operator: {op}")
+
+    argument_types, result_type = signature
+    if (
+        len(argument_types) == 2
+        and left_type is argument_types[0]
+        and right_type is argument_types[1]
+    ):
+        return result_type
+
+    # Raises the error of the mismatch
+    return TypecheckFunction(list(argument_types), result_type)([left_type, right_type])
+
+
+def function_type(name: str, types: list[Type]) -> Type:
+    signature = builtin_signatures.get(name)
+    if signature is None:
+        # TODO: implement
+        return Unit
+
+    argument_types, result_type = signature
+    if len(argument_types) == len(types) and all(
+        map(operator.is_, types, argument_types)
+    ):
+        return result_type
+
+    # Raises the error of the mismatch, unless there are too few arguments
+    return TypecheckFunction(list(argument_types), result_type)(types)
+
+
+def check_condition_type(condition_type: Type) -> None:
+    if condition_type is not Bool:
+        raise IncompatibleTypeException(
+            f"Incompatible types. Expect Bool, got: {condition_type}"
+        )
+
+
+def if_type(then_type: Type, else_type: Optional[Type]) -> Type:
+    if else_type is None:
+        return Unit
+
+    if then_type is not else_type:
+        raise IncompatibleTypeException(
+            f"Incompatible types. Got {then_type} and {else_type}"
+        )
+
+    return then_type
+
+
+def variable_declaration_type(
+    node: VariableDeclarationExpression, value_type: Type
 ) -> Type:
-    match node:
-        case Literal():
-            match node.value:
-                case bool():
-                    return Bool
-                case int():
-                    return Int
-                case None:
-                    return Unit
-                case _:
-                    raise UnknownTypeException(f"Unknown type: {node.value}")
-        case BinaryOp():
-            if node.left is None:
-                return typecheck(node.right, identifier_types)
-
-            condition_type = typecheck(node.left, identifier_types)
-            then_type = typecheck(node.right, identifier_types)
-
-            if node.op == "=":
-                return typecheck_equal_operator((condition_type, then_type))
-            else:
-                for operator, func in operator_types:
-                    if node.op in operator:
-                        return func([condition_type, then_type])
-
-            raise UnknownOperatorException(f"Unknown operator: {node.op}")
-        case FunctionExpression():
-            types = [typecheck(arg, identifier_types) for arg in node.arguments]
-            for operator, func in operator_types:
-                if node.name in operator:
-                    return func(types)
-            else:
-                # TODO: implement
-                return Unit
-                # return create_typecheck(types, [Int, Bool], Func)
+    node_type = value_type
+    if node.is_const:
+        node_type = const_types[node_type]
 
-        case IfExpression():
-            condition_type = typecheck(node.condition, identifier_types)
-            if condition_type is not Bool:
-                raise IncompatibleTypeException(
-                    f"Incompatible types. Expect Bool, got: {condition_type}"
-                )
+    if node.type is not None:
+        for type_expression, _type in ast_types:
+            if isinstance(node.type_expression, type_expression):
+                if node_type is not _type:
+                    raise IncompatibleTypeException(
+                        f"Incompatible types. Expect {_type}, got: {node_type}"
+                    )
 
-            then_type = typecheck(node.then_clause, identifier_types)
+    return node_type
 
-            if node.else_clause is None:
-                return Unit
 
-            else_type = typecheck(node.else_clause, identifier_types)
-            if then_type is not else_type:
-                raise IncompatibleTypeException(
-                    f"Incompatible types. Got {then_type} and {else_type}"
-                )
+class TypeMemo:
+    """The types of the subtrees that occur more than once in a hash-consed
+    AST. Such a subtree has no identifiers, so its type does not depend on
+    where it is and it is only checked once. See `hash_cons`."""
 
-            return then_type
+    shared: set[int]
+    types: dict[int, Type]
+    hits: int
 
-        case VariableDeclarationExpression():
-            if identifier_types is None:
-                identifier_types = {}
+    def __init__(self, shared: set[int]) -> None:
+        self.shared = shared
+        self.types = {}
+        self.hits = 0
 
-            node_type = typecheck(node.value, identifier_types)
-            if node.is_const:
-                node_type = ConstType(node_type.name)
 
-            if node.type is not None:
-                for type_expression, _type in ast_types:
-                    if isinstance(node.type_expression, type_expression):
-                        if node_type is not _type:
-                            raise IncompatibleTypeException(
-                                f"Incompatible types. Expect {_type}, got: {node_type}"
-                            )
+class TypeEnvironment:
+    """The types of the identifiers in scope.
 
-            identifier_types[node.name] = node_type
-            return node_type
+    Every identifier has one entry in `types`, whatever the scope it was
+    declared in. A declaration in a block records the entry it replaces in
+    `undo_log`, and leaving the block restores those entries, so entering
+    and leaving a scope costs as much as its declarations."""
 
-        case Identifier():
-            if identifier_types is None:
-                raise UnknownIdentifierException("identifier_types must not be None")
+    types: dict[str, Type]
+    # The name of each declaration in a block and its previous type, if any
+    undo_log: list[tuple[str, Optional[Type]]]
+    # The length of `undo_log` when each enclosing block was entered
+    scope_starts: list[int]
 
-            if node.name not in identifier_types.keys():
-                raise UnknownIdentifierException(f"Unknown identifier: {node.name}")
+    def __init__(self, types: Optional[dict[str, Type]] = None) -> None:
+        self.types = {} if types is None else types
+        self.undo_log = []
+        self.scope_starts = []
 
-            return identifier_types[node.name]
+    def get(self, name: str) -> Optional[Type]:
+        return self.types.get(name)
 
-        case BlockExpression():
-            _identifier_types = identifier_types
-            if identifier_types is None:
-                _identifier_types = {}
+    def declare(self, name: str, t: Type) -> None:
+        # Declarations outside of any block are never undone
+        if self.scope_starts:
+            self.undo_log.append((name, self.types.get(name)))
 
-            for expression in node.expressions:
-                typecheck(expression, _identifier_types)
+        self.types[name] = t
 
-            return typecheck(node.result, _identifier_types)
+    def enter_scope(self) -> None:
+        self.scope_starts.append(len(self.undo_log))
 
-        case WhileExpression():
-            condition_type = typecheck(node.condition, identifier_types)
-            if condition_type is not Bool:
-                raise IncompatibleTypeException(
-                    f"Incompatible types. Expect Bool, got: {condition_type}"
-                )
+    def leave_scope(self) -> None:
+        start = self.scope_starts.pop()
+        types = self.types
+        undo_log = self.undo_log
 
-            typecheck(node.body, identifier_types)
+        while len(undo_log) > start:
+            name, t = undo_log.pop()
 
-            return Unit
+            if t is None:
+                del types[name]
+            else:
+                types[name] = t
 
-        case BreakExpression() | ContinueExpression():
-            return Unit
 
-        case _:
-            raise Exception(f"Unsupported expression: {type(node)}")
+def typecheck(
+    node: Expression,
+    identifier_types: Optional[dict[str, Type] | TypeEnvironment] = None,
+    memo: Optional[TypeMemo] = None,
+) -> Type:
+    """Returns the type of `node` and stores the type of every node in it.
+
+    Only declarations outside of any block are kept in `identifier_types`,
+    like that of a `node` that is a single declaration. A block removes its
+    declarations when it ends, and this includes the block that the parser
+    makes of a program with several top-level statements. To collect the
+    declarations of such a program, check its statements one at a time with
+    the same `identifier_types`, as incremental compilation does."""
+    environment = (
+        identifier_types
+        if isinstance(identifier_types, TypeEnvironment)
+        else TypeEnvironment(identifier_types)
+    )
+    node.type = run(__typecheck(node, environment, memo))
+    return node.type
+
+
+# Nested nodes are checked with `yield from`, which is nearly as cheap as a
+# call. Every `max_direct_depth` levels a node is handed to the trampoline
+# instead, to keep the chain of generators short. The caller stores the
+# type of a nested node.
+#
+# This is not a generator itself: it returns the generator of the handler
+# of the node's class, so dispatching adds no generator of its own.
+def __typecheck(
+    node: Expression,
+    identifier_types: TypeEnvironment,
+    memo: Optional[TypeMemo],
+    depth: int = 0,
+) -> Trampoline[Type]:
+    if depth >= max_direct_depth:
+        return __typecheck_later(node, identifier_types, memo)
+
+    handler = find_handler(typecheck_handlers, type(node))
+
+    if handler is None:
+        raise Exception(f"Unsupported expression: {type(node)}")
+
+    if memo is not None and id(node) in memo.shared:
+        return __typecheck_once(handler, node, identifier_types, memo, depth)
+
+    return handler(node, identifier_types, memo, depth)
+
+
+def __typecheck_later(
+    node: Expression,
+    identifier_types: TypeEnvironment,
+    memo: Optional[TypeMemo],
+) -> Trampoline[Type]:
+    return (yield __typecheck(node, identifier_types, memo))
+
+
+def __typecheck_once(
+    handler: Callable[[Any, Any, Optional[TypeMemo], int], Trampoline[Type]],
+    node: Expression,
+    identifier_types: TypeEnvironment,
+    memo: TypeMemo,
+    depth: int,
+) -> Trampoline[Type]:
+    node_type = memo.types.get(id(node))
+
+    if node_type is None:
+        node_type = yield from handler(node, identifier_types, memo, depth)
+        memo.types[id(node)] = node_type
+    else:
+        memo.hits += 1
+
+    return node_type
+
+
+# Handlers that check a node without nested nodes end with an unreachable
+# `yield`, which makes them generators like every other handler.
+
+
+def typecheck_literal(
+    node: Literal,
+    identifier_types: TypeEnvironment,
+    memo: Optional[TypeMemo],
+    depth: int,
+) -> Trampoline[Type]:
+    return literal_type(node.value)
+    yield
+
+
+def typecheck_binary_op(
+    node: BinaryOp,
+    identifier_types: TypeEnvironment,
+    memo: Optional[TypeMemo],
+    depth: int,
+) -> Trampoline[Type]:
+    if node.left is None:
+        node.right.type = yield from __typecheck(
+            node.right, identifier_types, memo, depth + 1
+        )
+        return node.right.type
+
+    condition_type = node.left.type = yield from __typecheck(
+        node.left, identifier_types, memo, depth + 1
+    )
+    then_type = node.right.type = yield from __typecheck(
+        node.right, identifier_types, memo, depth + 1
+    )
+
+    return binary_operator_type(node.op, condition_type, then_type)
+
+
+def typecheck_function(
+    node: FunctionExpression,
+    identifier_types: TypeEnvironment,
+    memo: Optional[TypeMemo],
+    depth: int,
+) -> Trampoline[Type]:
+    types = []
+    for arg in node.arguments:
+        arg.type = yield from __typecheck(arg, identifier_types, memo, depth + 1)
+        types.append(arg.type)
+
+    return function_type(node.name, types)
+
+
+def typecheck_if(
+    node: IfExpression,
+    identifier_types: TypeEnvironment,
+    memo: Optional[TypeMemo],
+    depth: int,
+) -> Trampoline[Type]:
+    node.condition.type = yield from __typecheck(
+        node.condition, identifier_types, memo, depth + 1
+    )
+    check_condition_type(node.condition.type)
+
+    then_type = node.then_clause.type = yield from __typecheck(
+        node.then_clause, identifier_types, memo, depth + 1
+    )
+
+    if node.else_clause is None:
+        return if_type(then_type, None)
+
+    else_type = node.else_clause.type = yield from __typecheck(
+        node.else_clause, identifier_types, memo, depth + 1
+    )
+    return if_type(then_type, else_type)
+
+
+def typecheck_variable_declaration(
+    node: VariableDeclarationExpression,
+    identifier_types: TypeEnvironment,
+    memo: Optional[TypeMemo],
+    depth: int,
+) -> Trampoline[Type]:
+    node.value.type = yield from __typecheck(
+        node.value, identifier_types, memo, depth + 1
+    )
+    node_type = variable_declaration_type(node, node.value.type)
+
+    identifier_types.declare(node.name, node_type)
+    return node_type
+
+
+def typecheck_identifier(
+    node: Identifier,
+    identifier_types: TypeEnvironment,
+    memo: Optional[TypeMemo],
+    depth: int,
+) -> Trampoline[Type]:
+    identifier_type = identifier_types.get(node.name)
+
+    if identifier_type is None:
+        raise UnknownIdentifierException(f"Unknown identifier: {node.name}")
+
+    return identifier_type
+    yield
+
+
+def typecheck_block(
+    node: BlockExpression,
+    identifier_types: TypeEnvironment,
+    memo: Optional[TypeMemo],
+    depth: int,
+) -> Trampoline[Type]:
+    identifier_types.enter_scope()
+
+    # Errors propagate through here, and a caller that catches one can keep
+    # using the environment
+    try:
+        for expression in node.expressions:
+            expression.type = yield from __typecheck(
+                expression, identifier_types, memo, depth + 1
+            )
+
+        node.result.type = yield from __typecheck(
+            node.result, identifier_types, memo, depth + 1
+        )
+    finally:
+        identifier_types.leave_scope()
+
+    return node.result.type
+
+
+def typecheck_while(
+    node: WhileExpression,
+    identifier_types: TypeEnvironment,
+    memo: Optional[TypeMemo],
+    depth: int,
+) -> Trampoline[Type]:
+    node.condition.type = yield from __typecheck(
+        node.condition, identifier_types, memo, depth + 1
+    )
+    check_condition_type(node.condition.type)
+
+    node.body.type = yield from __typecheck(
+        node.body, identifier_types, memo, depth + 1
+    )
+
+    return Unit
+
+
+def typecheck_loop_jump(
+    node: BreakExpression | ContinueExpression,
+    identifier_types: TypeEnvironment,
+    memo: Optional[TypeMemo],
+    depth: int,
+) -> Trampoline[Type]:
+    return Unit
+    yield
+
+
+typecheck_handlers: dict[
+    type, Callable[[Any, Any, Optional[TypeMemo], int], Trampoline[Type]]
+] = {
+    Literal: typecheck_literal,
+    Identifier: typecheck_identifier,
+    BinaryOp: typecheck_binary_op,
+    IfExpression: typecheck_if,
+    FunctionExpression: typecheck_function,
+    BlockExpression: typecheck_block,
+    VariableDeclarationExpression: typecheck_variable_declaration,
+    WhileExpression: typecheck_while,
+    BreakExpression: typecheck_loop_jump,
+    ContinueExpression: typecheck_loop_jump,
+}
@@ -0,0 +1,274 @@
+from typing import Any, Callable, Optional
+
+import compiler.ast as ast
+import compiler.ir as ir
+from compiler.dispatch import find_handler
+from compiler.ir import IRVar, Label, LoadBoolConst, LoadIntConst, Return, SymTab
+from compiler.ir_generator import IrGenerator
+from compiler.location import Location
+from compiler.trampoline import Trampoline, max_direct_depth
+from compiler.type import Type, Unit
+from compiler.type_checker import (
+    TypeMemo,
+    binary_operator_type,
+    check_condition_type,
+    function_type,
+    if_type,
+    literal_type,
+    variable_declaration_type,
+)
+from compiler.type_checker_exception import UnknownIdentifierException
+
+
+def typecheck_and_generate_ir(
+    root_types: dict[IRVar, Type],
+    root_expr: ast.Expression,
+    memo: Optional[TypeMemo] = None,
+) -> list[ir.Instruction]:
+    """Does the work of `typecheck` and then `generate_ir` in one traversal
+    of the AST, and returns the same IR. With a `memo`, each shared subtree
+    of a hash-consed AST is type checked once, like `typecheck` does."""
+    return [
+        Label(name="Start"),
+        *TypedIrGenerator(root_types, memo).generate(root_expr),
+        Return(),
+    ]
+
+
+class TypedIrGenerator(IrGenerator):
+    """Checks the type of every node as it generates its IR.
+
+    Each node is visited by the `IrGenerator` handler of its class, which
+    visits the nested nodes first, and then typed with the rules of the
+    type checker. The symbol table maps a name to its IR variable and
+    `var_types` maps that variable to its type, so they are the one
+    environment of both. Variables are scoped as in the IR generator.
+
+    The IR of a shared subtree is generated at every occurrence, but only
+    the first one is type checked. The others are visited by the plain
+    `IrGenerator` handlers, which read the types already stored in it."""
+
+    memo: Optional[TypeMemo]
+    # Whether the subtree being visited already has its types
+    types_known: bool
+
+    def __init__(
+        self, root_types: dict[IRVar, Type], memo: Optional[TypeMemo] = None
+    ) -> None:
+        super().__init__(root_types)
+        self.memo = memo
+        self.types_known = False
+
+    def visit(
+        self,
+        st: SymTab,
+        expr: ast.Expression,
+        depth: int = 0,
+        dest: Optional[IRVar] = None,
+    ) -> Trampoline[IRVar]:
+        if depth >= max_direct_depth:
+            return self.visit_later(st, expr, dest)
+
+        if self.types_known:
+            return IrGenerator.visit(self, st, expr, depth, dest)
+
+        handler = find_handler(typed_visit_handlers, type(expr))
+
+        if handler is None:
+            # loc = expr.location
+            loc: Optional[Location] = None
+            raise Exception(f"{loc}: unsupported expression: {type(expr)}")
+
+        if self.memo is not None and id(expr) in self.memo.shared:
+            return self.visit_shared(handler, st, expr, depth, dest)
+
+        return handler(self, st, expr, depth, dest)
+
+    def visit_shared(
+        self,
+        handler: Callable[
+            ["TypedIrGenerator", SymTab, Any, int, Optional[IRVar]], Trampoline[IRVar]
+        ],
+        st: SymTab,
+        expr: ast.Expression,
+        depth: int,
+        dest: Optional[IRVar],
+    ) -> Trampoline[IRVar]:
+        memo = self.memo
+        assert memo is not None
+
+        if id(expr) not in memo.types:
+            var = yield from handler(self, st, expr, depth, dest)
+            memo.types[id(expr)] = expr.type
+            return var
+
+        memo.hits += 1
+        self.types_known = True
+        var = yield from IrGenerator.visit(self, st, expr, depth, dest)
+        self.types_known = False
+        return var
+
+    def typed(
+        self, expr: ast.Expression, t: Type, var: IRVar, dest: Optional[IRVar]
+    ) -> IRVar:
+        """Stores the type of `expr` and of the variable holding its value.
+        The IR handlers create that variable before the type is known.
+        A destination given by the caller is typed by the caller."""
+        expr.type = t
+
+        if dest is None:
+            self.var_types[var] = t
+
+        return var
+
+    def visit_typed_literal(
+        self,
+        st: SymTab,
+        expr: ast.Literal,
+        depth: int,
+        dest: Optional[IRVar],
+    ) -> Trampoline[IRVar]:
+        # The most common node, so it emits its IR itself instead of
+        # delegating to the IR generator's handler
+        t = expr.type = literal_type(expr.value)
+
+        match expr.value:
+            case bool():
+                var = self.new_dest(dest, t)
+                self.ins.append(LoadBoolConst(expr.value, var))
+            case int():
+                var = self.new_dest(dest, t)
+                self.ins.append(LoadIntConst(expr.value, var))
+            case _:
+                var = self.copy_to_dest(self.var_unit, dest)
+
+        return var
+        yield
+
+    def visit_typed_identifier(
+        self,
+        st: SymTab,
+        expr: ast.Identifier,
+        depth: int,
+        dest: Optional[IRVar],
+    ) -> Trampoline[IRVar]:
+        var = st.find(expr.name)
+
+        # Built-ins are in the symbol table but are not values
+        if var is None or var in self.root_types:
+            raise UnknownIdentifierException(f"Unknown identifier: {expr.name}")
+
+        t = self.var_types[var]
+        return self.typed(expr, t, self.copy_to_dest(var, dest), dest)
+        yield
+
+    def visit_typed_binary_op(
+        self,
+        st: SymTab,
+        expr: ast.BinaryOp,
+        depth: int,
+        dest: Optional[IRVar],
+    ) -> Trampoline[IRVar]:
+        # The IR of an assignment does not visit its left-hand side
+        if expr.op == "=" and isinstance(expr.left, ast.Identifier):
+            yield from self.visit(st, expr.left, depth + 1)
+        elif expr.op == "=" and expr.left is not None:
+            # Typed like `typecheck` does before the IR generator rejects
+            # the target, so a type error is reported first
+            yield from self.visit(st, expr.left, depth + 1)
+            yield from self.visit(st, expr.right, depth + 1)
+            binary_operator_type(expr.op, expr.left.type, expr.right.type)
+
+        var = yield from self.visit_binary_op(st, expr, depth, dest)
+
+        if expr.left is None:
+            return self.typed(expr, expr.right.type, var, dest)
+
+        t = binary_operator_type(expr.op, expr.left.type, expr.right.type)
+        return self.typed(expr, t, var, dest)
+
+    def visit_typed_if(
+        self,
+        st: SymTab,
+        expr: ast.IfExpression,
+        depth: int,
+        dest: Optional[IRVar],
+    ) -> Trampoline[IRVar]:
+        var = yield from self.visit_if(st, expr, depth, dest)
+
+        check_condition_type(expr.condition.type)
+        else_type = None if expr.else_clause is None else expr.else_clause.type
+        return self.typed(expr, if_type(expr.then_clause.type, else_type), var, dest)
+
+    def visit_typed_block(
+        self,
+        st: SymTab,
+        expr: ast.BlockExpression,
+        depth: int,
+        dest: Optional[IRVar],
+    ) -> Trampoline[IRVar]:
+        var = yield from self.visit_block(st, expr, depth, dest)
+        return self.typed(expr, expr.result.type, var, dest)
+
+    def visit_typed_variable_declaration(
+        self,
+        st: SymTab,
+        expr: ast.VariableDeclarationExpression,
+        depth: int,
+        dest: Optional[IRVar],
+    ) -> Trampoline[IRVar]:
+        # The declared variable is typed here even if the value is copied
+        # to a destination
+        var = yield from self.visit_variable_declaration(st, expr, depth, None)
+        self.typed(expr, variable_declaration_type(expr, expr.value.type), var, None)
+        return self.copy_to_dest(var, dest)
+
+    def visit_typed_function(
+        self,
+        st: SymTab,
+        expr: ast.FunctionExpression,
+        depth: int,
+        dest: Optional[IRVar],
+    ) -> Trampoline[IRVar]:
+        var = yield from self.visit_function(st, expr, depth, dest)
+        t = function_type(expr.name, [arg.type for arg in expr.arguments])
+        return self.typed(expr, t, var, dest)
+
+    def visit_typed_while(
+        self,
+        st: SymTab,
+        expr: ast.WhileExpression,
+        depth: int,
+        dest: Optional[IRVar],
+    ) -> Trampoline[IRVar]:
+        var = yield from self.visit_while(st, expr, depth, dest)
+
+        check_condition_type(expr.condition.type)
+        return self.typed(expr, Unit, var, dest)
+
+    def visit_typed_loop_jump(
+        self,
+        st: SymTab,
+        expr: ast.BreakExpression | ast.ContinueExpression,
+        depth: int,
+        dest: Optional[IRVar],
+    ) -> Trampoline[IRVar]:
+        var = yield from self.visit_loop_jump(st, expr, depth, dest)
+        return self.typed(expr, Unit, var, dest)
+
+
+typed_visit_handlers: dict[
+    type,
+    Callable[[TypedIrGenerator, SymTab, Any, int, Optional[IRVar]], Trampoline[IRVar]],
+] = {
+    ast.Literal: TypedIrGenerator.visit_typed_literal,
+    ast.Identifier: TypedIrGenerator.visit_typed_identifier,
+    ast.BinaryOp: TypedIrGenerator.visit_typed_binary_op,
+    ast.IfExpression: TypedIrGenerator.visit_typed_if,
+    ast.BlockExpression: TypedIrGenerator.visit_typed_block,
+    ast.VariableDeclarationExpression: TypedIrGenerator.visit_typed_variable_declaration,
+    ast.FunctionExpression: TypedIrGenerator.visit_typed_function,
+    ast.WhileExpression: TypedIrGenerator.visit_typed_while,
+    ast.BreakExpression: TypedIrGenerator.visit_typed_loop_jump,
+    ast.ContinueExpression: TypedIrGenerator.visit_typed_loop_jump,
+}
@@ -1,6 +1,6 @@
 import pytest
 
-from compiler.analyzer import BasicBlock, create_basic_block
+from compiler.analyzer import BasicBlock, create_basic_block, create_state
 from compiler.ir import (
     Instruction,
     Label,
@@ -116,3 +116,24 @@ def test_analyzer_create_basic_block(
     test_input: list[Instruction], expected: list[BasicBlock]
 ) -> None:
     assert create_basic_block(test_input) == expected
+
+
+def test_analyzer_create_state() -> None:
+    instructions: list[Instruction] = [
+        Label("Start"),
+        LoadIntConst(1, IRVar("v0")),
+        LoadBoolConst(True, IRVar("v1")),
+        CondJump(IRVar("v1"), Label("L0"), Label("L1")),
+        Label("L0"),
+        Copy(IRVar("v0"), IRVar("v2")),
+        Jump(Label("L1")),
+        Label("L1"),
+        Call(IRVar("print_int"), [IRVar("v0")], IRVar("v2")),
+        Return(),
+    ]
+
+    assert create_state(instructions) == {
+        IRVar("v0"): {1},
+        IRVar("v1"): {2},
+        IRVar("v2"): {5, 8},
+    }
@@ -147,6 +147,11 @@ def cases() -> list[tuple[str, str]]:
         ("var a = 1; while (a < 10) do { a = a + 1 } a", "10"),
         ("var a = 1; var b = (a = 2); b", "2"),
         ("var a = 1; var b = 2; a = b = 3", "3"),
+        ("var a = 1; var b = 2; a = b = 3; a + b", "6"),
+        ("var a = 3; a = -a; a", "-3"),
+        ("var a = 3; a = if a > 2 then a * 2 else a; a", "6"),
+        ("var a = true; a = a and not a; a", "false"),
+        ("var a = 1; var b = { var c = a + 1; c * 2 }; a + b", "5"),
         ("const a = 1; a", "1"),
         ("var a = 10 / 2; a", "5"),
         ("var a = 10 % 2; a", "0"),
@@ -0,0 +1,103 @@
+import pytest
+
+from compiler.ast import BinaryOp, Literal, VariableDeclarationExpression
+from compiler.ast_arena import AstArena, views_supported
+from compiler.builtin_type import builtin_types
+from compiler.ir_generator import generate_ir
+from compiler.parser import parse
+from compiler.token import Tokens
+from compiler.tokenizer import tokenize
+from compiler.type import ConstInt, Int
+from compiler.type_checker import typecheck
+
+
+needs_views = pytest.mark.skipif(
+    not views_supported(), reason="arena views need the interpreted compiler"
+)
+
+
+def cases() -> list[str]:
+    return [
+        "1",
+        "-1 + 2 * 3",
+        "if 1 < 2 then 3",
+        "if not true then 1 else 2",
+        "print_int(1); print_bool(true)",
+        "{ var a: Int = 1; const b = 2; a = a + 1 }",
+        "var c: Bool = true; var u = { }; c or false",
+        "while true do { if true then break else continue }",
+        "var big = 18446744073709551616; big",
+    ]
+
+
+@pytest.mark.parametrize("source_code", cases())
+def test_round_trip(source_code: str) -> None:
+    expression = parse(Tokens(tokenize(source_code)))
+    typecheck(expression)
+
+    arena = AstArena()
+    handle = arena.add(expression)
+
+    assert arena.to_expression(handle) == expression
+
+
+@needs_views
+@pytest.mark.parametrize("source_code", cases())
+def test_typecheck_and_generate_ir_on_views(source_code: str) -> None:
+    expression = parse(Tokens(tokenize(source_code)))
+    arena = AstArena()
+    view = arena.view(arena.add(expression))
+
+    assert typecheck(view) == typecheck(expression)
+    assert arena.to_expression(0) == expression
+    assert generate_ir(builtin_types, view) == generate_ir(builtin_types, expression)
+
+
+@needs_views
+def test_fields() -> None:
+    arena = AstArena()
+    handle = arena.add(
+        VariableDeclarationExpression(
+            "a", BinaryOp(None, "-", Literal(1)), is_const=True, type=ConstInt
+        )
+    )
+
+    assert len(arena) == 3
+    assert list(arena.children_of(handle)) == [1]
+    assert list(arena.children_of(1)) == [2]
+    assert arena.name(handle) == "a"
+    assert arena.name(1) == "-"
+    assert arena.value(2) == 1
+    assert arena.type(handle) is ConstInt
+
+    view = arena.view(handle)
+    assert isinstance(view, VariableDeclarationExpression)
+    assert view.is_const and view.name == "a"
+
+    view.value.type = Int
+    assert arena.type(1) is Int
+    with pytest.raises(AttributeError):
+        view.name = "b"
+
+
+@needs_views
+def test_deeply_nested() -> None:
+    depth = 100_000
+    expression = parse(Tokens(tokenize("1 + (" * depth + "1" + ")" * depth)))
+    typecheck(expression)
+
+    arena = AstArena()
+    handle = arena.add(expression)
+
+    assert len(arena) == 2 * depth + 1
+    assert generate_ir(builtin_types, arena.to_expression(handle)) == generate_ir(
+        builtin_types, arena.view(handle)
+    )
+
+
+@pytest.mark.skipif(views_supported(), reason="arena views are supported")
+def test_views_unsupported() -> None:
+    arena = AstArena()
+
+    with pytest.raises(Exception, match="not supported"):
+        arena.view(arena.add(Literal(1)))
@@ -0,0 +1,60 @@
+import pytest
+
+import compiler.ir as ir
+from compiler.builtin_type import builtin_types
+from compiler.compact_ir import CompactIr
+from compiler.ir_generator import generate_ir
+from compiler.parser import parse
+from compiler.token import Tokens
+from compiler.tokenizer import tokenize
+from compiler.type_checker import typecheck
+
+
+def cases() -> list[str]:
+    return [
+        "1",
+        "-1 + 2 * 3",
+        "if 1 < 2 then 3",
+        "if not true then 1 else 2",
+        "print_int(1); print_bool(true); read_int()",
+        "{ var a: Int = 1; const b = 2; a = a + 1 }",
+        "var c: Bool = true; c or false and c",
+        "while true do { if true then break else continue }",
+        "var big = 18446744073709551616; big",
+    ]
+
+
+def instructions_of(source_code: str) -> list[ir.Instruction]:
+    expression = parse(Tokens(tokenize(source_code)))
+    typecheck(expression)
+    return generate_ir(builtin_types, expression)
+
+
+@pytest.mark.parametrize("source_code", cases())
+def test_round_trip(source_code: str) -> None:
+    instructions = instructions_of(source_code)
+    code = CompactIr(instructions)
+
+    assert len(code) == len(instructions)
+    assert code.instructions() == instructions
+    assert [code.format(i) for i in range(len(code))] == [
+        str(instruction) for instruction in instructions
+    ]
+
+
+def test_ids() -> None:
+    code = CompactIr(
+        [
+            ir.Label("Start"),
+            ir.LoadIntConst(2**63, ir.IRVar("x")),
+            ir.Call(ir.IRVar("+"), [ir.IRVar("x"), ir.IRVar("y")], ir.IRVar("z")),
+            ir.CondJump(ir.IRVar("z"), ir.Label("Start"), ir.Label("End")),
+        ]
+    )
+
+    assert code.var_names == ["x", "+", "y", "z"]
+    assert code.label_names == ["Start", "End"]
+    assert code.big_ints == [2**63]
+    assert list(code.call_args(2)) == [0, 2]
+    assert code.variables(2) == [1, 0, 2, 3]
+    assert code.variables(3) == [3]
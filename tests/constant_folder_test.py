@@ -0,0 +1,207 @@
+import os
+import pathlib
+import subprocess
+
+import pytest
+
+from compiler.assembler import assemble
+from compiler.assembly_generator import generate_assembly
+from compiler.ast import (
+    BinaryOp,
+    BlockExpression,
+    Expression,
+    FunctionExpression,
+    Identifier,
+    Literal,
+)
+from compiler.builtin_type import builtin_types
+from compiler.constant_folder import fold_constants, wrap
+from compiler.ir import Instruction
+from compiler.ir_generator import generate_ir
+from compiler.parser import parse
+from compiler.token import Tokens
+from compiler.tokenizer import tokenize
+from compiler.type import Int
+from compiler.type_checker import typecheck
+
+
+def typechecked(source_code: str) -> Expression:
+    expression = parse(Tokens(tokenize(source_code)))
+    typecheck(expression)
+    return expression
+
+
+def folded(source_code: str) -> Expression:
+    return fold_constants(typechecked(source_code)).expression
+
+
+def folded_result(source_code: str) -> Expression:
+    """The folded expression of the value of the program."""
+    expression = folded(source_code)
+
+    if isinstance(expression, BlockExpression):
+        return expression.result
+
+    return expression
+
+
+def instructions_of(expression: Expression) -> list[Instruction]:
+    return generate_ir(builtin_types, expression)
+
+
+@pytest.mark.parametrize(
+    "source_code,value",
+    [
+        ("1 + 2 * 3", 7),
+        ("(1 - 2) * 3", -3),
+        ("7 / 2", 3),
+        ("-7 / 2", -3),
+        ("7 / -2", -3),
+        ("-7 % 2", -1),
+        ("7 % -2", 1),
+        ("9223372036854775807 + 1", -(2**63)),
+        ("-9223372036854775807 - 2", 2**63 - 1),
+        ("4611686018427387904 * 2", -(2**63)),
+        ("--9223372036854775807", 2**63 - 1),
+        ("1 < 2", True),
+        ("2 <= 1", False),
+        ("1 == 1 and 2 != 2", False),
+        ("not (1 > 2) or false", True),
+        ("true and 1 >= 1", True),
+        ("if 1 < 2 then 3 else 4", 3),
+        ("if 1 > 2 then 3 else 4 + 5", 9),
+        ("const a = 2; a", 2),
+        ("const a = 2; const b = a; b", 2),
+        ("var a = 1; (2 + { 2 * 3 })", 8),
+    ],
+)
+def test_fold(source_code: str, value: int | bool) -> None:
+    result = folded_result(source_code)
+
+    if isinstance(result, BlockExpression):
+        result = result.result
+
+    assert isinstance(result, Literal)
+    assert result.value == value
+    assert type(result.value) is type(value)
+
+
+@pytest.mark.parametrize(
+    "source_code",
+    [
+        "1 / 0",
+        "1 % 0",
+        "(-9223372036854775807 - 1) / -1",
+        "18446744073709551616 + 1",
+        "read_int() + 1",
+        "var a = 1; a + 1",
+    ],
+)
+def test_not_folded(source_code: str) -> None:
+    assert isinstance(folded_result(source_code), BinaryOp)
+
+
+def test_type_kept() -> None:
+    result = folded_result("1 + 2")
+
+    assert result.type is Int
+
+
+def test_assigned_constant_not_substituted() -> None:
+    # A const can be assigned a const value
+    result = folded_result("const a = 1; const b = 2; while false do {} a = b; a")
+
+    assert isinstance(result, Identifier)
+
+
+def test_shadowed_constant_not_substituted() -> None:
+    result = folded("const a = 1; { var a = read_int(); print_int(a); } a")
+
+    assert isinstance(result, BlockExpression)
+    block = result.expressions[1]
+    assert isinstance(block, BlockExpression)
+    print_int = block.expressions[1]
+    assert isinstance(print_int, FunctionExpression)
+    assert isinstance(print_int.arguments[0], Identifier)
+
+    assert isinstance(result.result, Literal)
+    assert result.result.value == 1
+
+
+def test_prune() -> None:
+    result = folded(
+        "if false then print_int(1); while false do { print_int(2) } 3; 4 + 5"
+    )
+
+    assert isinstance(result, Literal)
+    assert result.value == 9
+
+
+def test_short_circuit() -> None:
+    result = folded_result("false and print_bool(true)")
+
+    assert isinstance(result, Literal)
+    assert result.value is False
+
+    result = folded_result("true and print_bool(true)")
+
+    assert isinstance(result, FunctionExpression)
+
+
+def test_stats() -> None:
+    result = fold_constants(
+        typechecked("const a = true; var b = false; b = a; if 1 < 2 then 3 * 4")
+    )
+
+    assert result.folded_operations == 2
+    assert result.substituted_constants == 1
+    assert result.pruned_branches == 1
+
+
+def test_wrap() -> None:
+    assert wrap(2**63) == -(2**63)
+    assert wrap(-(2**63) - 1) == 2**63 - 1
+    assert wrap(2**64 + 5) == 5
+
+
+@pytest.mark.parametrize(
+    "source_code,instructions,folded_instructions",
+    [
+        ("1 + 2 * 3", 8, 4),
+        ("if 1 < 2 then 3 else 4", 13, 4),
+        ("var a = 0; while 1 > 2 do { a = a + 1 } a", 14, 4),
+    ],
+)
+def test_ir_shrinks(
+    source_code: str, instructions: int, folded_instructions: int
+) -> None:
+    assert len(instructions_of(typechecked(source_code))) == instructions
+    assert len(instructions_of(folded(source_code))) == folded_instructions
+
+
+@pytest.mark.parametrize(
+    "source_code",
+    [
+        "9223372036854775807 + 1",
+        "-9223372036854775807 - 2",
+        "4611686018427387904 * 3",
+        "-7 / 2",
+        "-7 % 2",
+        "7 % -2",
+        "if 3 * 4 > 11 and not false then 1 else 2",
+        "const a = 3; var b = 0; b = a; b * 2",
+    ],
+)
+def test_compiled_output(source_code: str) -> None:
+    """The folded program prints what the compiled operations would."""
+    outputs = []
+
+    for expression in [typechecked(source_code), folded(source_code)]:
+        program_path = os.path.realpath("compiled_program_constant_folder_test")
+        assemble(generate_assembly(instructions_of(expression)), program_path)
+
+        result = subprocess.run(program_path, stdout=subprocess.PIPE)
+        pathlib.Path.unlink(pathlib.Path(program_path))
+        outputs.append(result.stdout)
+
+    assert outputs[0] == outputs[1]
@@ -0,0 +1,18 @@
+from compiler.ast import Expression, Identifier, Literal
+from compiler.dispatch import find_handler
+
+
+class LiteralSubclass(Literal):
+    pass
+
+
+def test_find_handler() -> None:
+    handlers: dict[type, str] = {Literal: "literal"}
+
+    assert find_handler(handlers, Literal) == "literal"
+    assert find_handler(handlers, Identifier) is None
+    assert find_handler(handlers, Expression) is None
+
+    # A subclass uses its base class's handler, which is then cached
+    assert find_handler(handlers, LiteralSubclass) == "literal"
+    assert handlers[LiteralSubclass] == "literal"
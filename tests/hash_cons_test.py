@@ -0,0 +1,123 @@
+import pytest
+
+from compiler.ast import (
+    BlockExpression,
+    Expression,
+    FunctionExpression,
+    VariableDeclarationExpression,
+)
+from compiler.builtin_type import builtin_types
+from compiler.hash_cons import hash_cons
+from compiler.ir_generator import generate_ir
+from compiler.parser import parse
+from compiler.token import Tokens
+from compiler.tokenizer import tokenize
+from compiler.type_checker import TypeMemo, typecheck
+from compiler.typed_ir_generator import typecheck_and_generate_ir
+
+
+def parse_source(source_code: str) -> Expression:
+    return parse(Tokens(tokenize(source_code)))
+
+
+def test_hash_cons_shares_closed_subtrees() -> None:
+    expression = parse_source("print_int(1 + 2 * 3); print_int(1 + 2 * 3);")
+    assert isinstance(expression, BlockExpression)
+
+    result = hash_cons(expression)
+
+    first, second = expression.expressions
+    assert isinstance(first, FunctionExpression)
+    assert first is second
+    assert result.nodes == 14
+    assert result.unique_nodes == 8
+    assert result.dedup_ratio == pytest.approx(6 / 14)
+    assert result.bytes_saved > 0
+    assert id(first) in result.shared
+
+
+def test_hash_cons_keeps_open_subtrees() -> None:
+    expression = parse_source("var a = 1; var b = a + 1; a + 1")
+    assert isinstance(expression, BlockExpression)
+
+    result = hash_cons(expression)
+
+    declaration = expression.expressions[1]
+    assert isinstance(declaration, VariableDeclarationExpression)
+    assert declaration.value is not expression.result
+    # Only the literals are shared
+    assert result.unique_nodes == result.nodes - 2
+
+
+def test_hash_cons_does_not_mix_booleans_and_integers() -> None:
+    expression = parse_source("print_int(1); print_bool(true);")
+    assert isinstance(expression, BlockExpression)
+
+    assert hash_cons(expression).unique_nodes == 6
+
+
+def cases() -> list[str]:
+    return [
+        "var a = if 1 < 2 then 3 * 4 else 3 * 4; a + 3 * 4",
+        "while true do { if 1 < 2 then break; if 1 < 2 then continue }",
+        "{ var x = 1; x } + { var x = 1; x }",
+        "print_bool(true and not false); print_bool(true and not false)",
+    ]
+
+
+@pytest.mark.parametrize("source_code", cases())
+def test_typecheck_and_ir_are_unchanged(source_code: str) -> None:
+    expected = parse_source(source_code)
+    expected_type = typecheck(expected)
+
+    expression = parse_source(source_code)
+    memo = TypeMemo(hash_cons(expression).shared)
+
+    assert typecheck(expression, memo=memo) == expected_type
+    assert generate_ir(builtin_types, expression) == generate_ir(
+        builtin_types, expected
+    )
+
+
+@pytest.mark.parametrize("source_code", cases())
+def test_typed_ir_is_unchanged(source_code: str) -> None:
+    expected = parse_source(source_code)
+    expected_type = typecheck(expected)
+
+    expression = parse_source(source_code)
+    memo = TypeMemo(hash_cons(expression).shared)
+
+    assert typecheck_and_generate_ir(builtin_types, expression, memo) == generate_ir(
+        builtin_types, expected
+    )
+    assert expression.type == expected_type
+
+
+def test_typecheck_checks_shared_subtrees_once() -> None:
+    expression = parse_source("(1 + 2) * (1 + 2) * (1 + 2)")
+    memo = TypeMemo(hash_cons(expression).shared)
+
+    typecheck(expression, memo=memo)
+
+    assert memo.hits == 2
+
+
+def test_typed_ir_checks_shared_subtrees_once() -> None:
+    expression = parse_source("(1 + 2) * (1 + 2) * (1 + 2)")
+    memo = TypeMemo(hash_cons(expression).shared)
+
+    instructions = typecheck_and_generate_ir(builtin_types, expression, memo)
+
+    assert memo.hits == 2
+    # Every occurrence still has its own IR
+    assert sum(1 for instruction in instructions if "Call(+" in str(instruction)) == 3
+
+
+def test_hash_cons_deeply_nested() -> None:
+    depth = 100_000
+    expression = parse_source("1 + (" * depth + "1" + ")" * depth)
+
+    result = hash_cons(expression)
+
+    # Every nested sum is distinct, only the literals repeat
+    assert result.unique_nodes == depth + 1
@@ -0,0 +1,173 @@
+import pytest
+
+from compiler import incremental
+from compiler.incremental import Compilation, Edit, compile_source, recompile
+from compiler.parser import parse
+from compiler.token import Tokens
+from compiler.tokenizer import tokenize
+from compiler.type_checker import typecheck
+from compiler.type_checker_exception import UnknownIdentifierException
+
+source_code = """var a = 1;
+var b: Int = a + 2;
+while a < b do {
+    a = a + 1;
+}
+if a == b then {
+    print_int(a);
+}
+a * b
+"""
+
+
+def full_compile(source_code: str) -> object:
+    expression = parse(Tokens(tokenize(source_code)))
+    typecheck(expression, {})
+    return expression
+
+
+def apply(source_code: str, edit: Edit) -> str:
+    return (
+        source_code[: edit.offset]
+        + edit.inserted
+        + source_code[edit.offset + edit.removed :]
+    )
+
+
+def edit_cases() -> list[Edit]:
+    return [
+        # Inside a statement
+        Edit(source_code.index("2;"), 1, "42"),
+        Edit(source_code.index("a + 2"), 5, "(a + 2) * 3"),
+        # Between statements
+        Edit(source_code.index("while"), 0, "var c = true;\n"),
+        Edit(source_code.index("var b"), 0, "\n\n"),
+        # Across statements
+        Edit(source_code.index("2;"), len("2;\nwhile a"), "3;\nwhile b"),
+        # A whole statement
+        Edit(
+            source_code.index("if"),
+            source_code.index("a * b") - source_code.index("if"),
+            "",
+        ),
+        # At the end
+        Edit(len(source_code), 0, "a;"),
+        Edit(source_code.index("a * b"), len("a * b\n"), ""),
+        # Inside a block
+        Edit(source_code.index("a = a + 1"), 0, "var d = 2;\n"),
+        # Turning a statement into the continuation of the previous one
+        Edit(source_code.index("a * b"), 0, "else {\n}\n"),
+    ]
+
+
+@pytest.mark.parametrize("edit", edit_cases())
+def test_recompile(edit: Edit) -> None:
+    edited_source_code = apply(source_code, edit)
+    compilation = compile_source(source_code)
+    recompile(compilation, edit)
+
+    assert compilation.source_code == edited_source_code
+    assert compilation.diagnostics == []
+    assert compilation.expression() == full_compile(edited_source_code)
+
+
+def test_recompile_keeps_untouched_statements() -> None:
+    compilation = compile_source(source_code)
+    previous = list(compilation.statements)
+    recompile(compilation, Edit(source_code.index("2;"), 1, "42"))
+
+    assert compilation.statements[0] is previous[0]
+    assert compilation.statements[2] is previous[2]
+    assert compilation.statements[1] is not previous[1]
+
+
+def test_recompile_offsets() -> None:
+    compilation = compile_source(source_code)
+    edited_source_code = source_code
+
+    for marker, inserted in [
+        ("while", "var c = 0;\n"),
+        ("var a", "var d = 0;\n"),
+        ("\n", " "),
+        ("\na * b", ";"),
+    ]:
+        edit = Edit(edited_source_code.index(marker), 0, inserted)
+        edited_source_code = apply(edited_source_code, edit)
+        recompile(compilation, edit)
+
+        assert compilation.spans() == compile_source(edited_source_code).spans()
+
+
+def test_recompile_edit_sequence() -> None:
+    compilation = compile_source(source_code)
+    current_source_code = source_code
+
+    # Typing a new statement one character at a time
+    for i, character in enumerate("var c = a + b;\n"):
+        edit = Edit(source_code.index("while") + i, 0, character)
+        current_source_code = apply(current_source_code, edit)
+        recompile(compilation, edit)
+
+    assert compilation.diagnostics == []
+    assert compilation.expression() == full_compile(current_source_code)
+
+
+def test_recompile_type_error() -> None:
+    compilation = compile_source(source_code)
+    recompile(compilation, Edit(source_code.index("var a"), 5, "var x"))
+
+    assert len(compilation.diagnostics) > 0
+    assert all(
+        isinstance(e, UnknownIdentifierException) for e in compilation.diagnostics
+    )
+
+    recompile(compilation, Edit(compilation.source_code.index("var x"), 5, "var a"))
+
+    assert compilation.diagnostics == []
+    assert compilation.expression() == full_compile(source_code)
+
+
+def test_recompile_syntax_error() -> None:
+    compilation = compile_source(source_code)
+    recompile(compilation, Edit(source_code.index("var b"), 0, "{"))
+
+    assert len(compilation.diagnostics) == 1
+
+    recompile(compilation, Edit(source_code.index("var b"), 1, ""))
+
+    assert compilation.diagnostics == []
+    assert compilation.expression() == full_compile(source_code)
+
+
+def test_recompile_comment() -> None:
+    compilation = compile_source(source_code)
+    recompile(compilation, Edit(source_code.index("var b"), 0, "# "))
+
+    assert len(compilation.diagnostics) == 1
+
+
+def test_compile_source_empty() -> None:
+    compilation = compile_source("")
+
+    assert isinstance(compilation, Compilation)
+    assert compilation.statements == []
+    assert compilation.expression() == full_compile("")
+
+
+def test_recompile_checkpoints(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(incremental, "checkpoint_interval", 2)
+    compilation = compile_source(source_code)
+    edited_source_code = source_code
+
+    for edit in edit_cases():
+        if edit.offset + edit.removed > len(edited_source_code):
+            continue
+
+        edited_source_code = apply(edited_source_code, edit)
+        recompile(compilation, edit)
+
+        expected = compile_source(edited_source_code)
+        assert compilation.spans() == expected.spans()
+        assert [type(e) for e in compilation.diagnostics] == [
+            type(e) for e in expected.diagnostics
+        ]
@@ -27,7 +27,6 @@ def cases() -> list[tuple[str, list[Instruction]]]:
             [
                 Label("Start"),
                 LoadIntConst(1, IRVar("v0")),
-                Copy(IRVar("v0"), IRVar("v1")),
                 Return(),
             ],
         ),
@@ -64,20 +63,18 @@ def cases() -> list[tuple[str, list[Instruction]]]:
             [
                 Label(name="Start"),
                 LoadBoolConst(False, IRVar("v0")),
-                Copy(IRVar("v0"), IRVar("v1")),
-                # v2 is or result
-                LoadBoolConst(True, IRVar("v3")),
-                CondJump(IRVar("v3"), Label("L0"), Label("L1")),
-                Label(name="L0"),
+                # v1 is or result
                 LoadBoolConst(True, IRVar("v2")),
+                CondJump(IRVar("v2"), Label("L0"), Label("L1")),
+                Label(name="L0"),
+                LoadBoolConst(True, IRVar("v1")),
                 Jump(Label("L2")),
                 Label(name="L1"),
-                LoadBoolConst(True, IRVar("v4")),
-                Copy(IRVar("v4"), IRVar("v1")),
-                Copy(IRVar("v1"), IRVar("v2")),
+                LoadBoolConst(True, IRVar("v0")),
+                Copy(IRVar("v0"), IRVar("v1")),
                 Jump(Label("L2")),
                 Label(name="L2"),
-                Call(IRVar("print_bool"), [IRVar("v1")], IRVar("v5")),
+                Call(IRVar("print_bool"), [IRVar("v0")], IRVar("v3")),
                 Return(),
             ],
         ),
@@ -90,22 +87,19 @@ def cases() -> list[tuple[str, list[Instruction]]]:
             [
                 Label(name="Start"),
                 LoadIntConst(1, IRVar("v0")),
-                Copy(IRVar("v0"), IRVar("v1")),
-                # v2 is and result
-                LoadBoolConst(False, IRVar("v3")),
-                CondJump(IRVar("v3"), Label("L1"), Label("L0")),
-                Label(name="L0"),
+                # v1 is and result
                 LoadBoolConst(False, IRVar("v2")),
+                CondJump(IRVar("v2"), Label("L1"), Label("L0")),
+                Label(name="L0"),
+                LoadBoolConst(False, IRVar("v1")),
                 Jump(Label("L2")),
                 Label(name="L1"),
-                LoadIntConst(2, IRVar("v4")),
-                Copy(IRVar("v4"), IRVar("v1")),
-                LoadIntConst(2, IRVar("v5")),
-                Call(IRVar("=="), [IRVar("v1"), IRVar("v5")], IRVar("v6")),
-                Copy(IRVar("v6"), IRVar("v2")),
+                LoadIntConst(2, IRVar("v0")),
+                LoadIntConst(2, IRVar("v3")),
+                Call(IRVar("=="), [IRVar("v0"), IRVar("v3")], IRVar("v1")),
                 Jump(Label("L2")),
                 Label(name="L2"),
-                Call(IRVar("print_int"), [IRVar("v1")], IRVar("v7")),
+                Call(IRVar("print_int"), [IRVar("v0")], IRVar("v4")),
                 Return(),
             ],
         ),
@@ -132,14 +126,12 @@ def cases() -> list[tuple[str, list[Instruction]]]:
                 Call(IRVar("=="), [IRVar("v0"), IRVar("v1")], IRVar("v2")),
                 CondJump(IRVar("v2"), Label("L0"), Label("L1")),
                 Label(name="L0"),
-                LoadIntConst(1, IRVar("v4")),
-                Copy(IRVar("v4"), IRVar("v3")),
+                LoadIntConst(1, IRVar("v3")),
                 Jump(Label("L2")),
                 Label(name="L1"),
-                LoadIntConst(2, IRVar("v5")),
-                Copy(IRVar("v5"), IRVar("v3")),
+                LoadIntConst(2, IRVar("v3")),
                 Label(name="L2"),
-                Call(IRVar("print_int"), [IRVar("v3")], IRVar("v6")),
+                Call(IRVar("print_int"), [IRVar("v3")], IRVar("v4")),
                 Return(),
             ],
         ),
@@ -148,9 +140,7 @@ def cases() -> list[tuple[str, list[Instruction]]]:
             [
                 Label(name="Start"),
                 LoadIntConst(1, IRVar("v0")),
-                Copy(IRVar("v0"), IRVar("v1")),
-                LoadIntConst(2, IRVar("v2")),
-                Copy(IRVar("v2"), IRVar("v3")),
+                LoadIntConst(2, IRVar("v1")),
                 Return(),
             ],
         ),
@@ -159,8 +149,7 @@ def cases() -> list[tuple[str, list[Instruction]]]:
             [
                 Label(name="Start"),
                 LoadIntConst(1, IRVar("v0")),
-                Copy(IRVar("v0"), IRVar("v1")),
-                Call(IRVar("print_int"), [IRVar("v1")], IRVar("v2")),
+                Call(IRVar("print_int"), [IRVar("v0")], IRVar("v1")),
                 Return(),
             ],
         ),
@@ -169,12 +158,9 @@ def cases() -> list[tuple[str, list[Instruction]]]:
             [
                 Label(name="Start"),
                 LoadIntConst(1, IRVar("v0")),
-                Copy(IRVar("v0"), IRVar("v1")),
-                LoadIntConst(2, IRVar("v2")),
-                Copy(IRVar("v2"), IRVar("v3")),
-                LoadIntConst(3, IRVar("v4")),
-                Copy(IRVar("v4"), IRVar("v1")),
-                Call(IRVar("print_int"), [IRVar("v1")], IRVar("v5")),
+                LoadIntConst(2, IRVar("v1")),
+                LoadIntConst(3, IRVar("v0")),
+                Call(IRVar("print_int"), [IRVar("v0")], IRVar("v2")),
                 Return(),
             ],
         ),
@@ -217,18 +203,16 @@ def cases() -> list[tuple[str, list[Instruction]]]:
                 Call(
                     fun=IRVar(name="unary_-"),
                     args=[IRVar(name="v3")],
-                    dest=IRVar(name="v4"),
+                    dest=IRVar(name="v2"),
                 ),
-                Copy(source=IRVar(name="v4"), dest=IRVar(name="v2")),
                 Jump(label=Label(name="L2")),
                 Label(name="L1"),
-                LoadIntConst(value=0, dest=IRVar(name="v5")),
-                Copy(source=IRVar(name="v5"), dest=IRVar(name="v2")),
+                LoadIntConst(value=0, dest=IRVar(name="v2")),
                 Label(name="L2"),
                 Call(
                     fun=IRVar(name="print_int"),
                     args=[IRVar(name="v2")],
-                    dest=IRVar(name="v6"),
+                    dest=IRVar(name="v4"),
                 ),
                 Return(),
             ],
@@ -238,17 +222,16 @@ def cases() -> list[tuple[str, list[Instruction]]]:
             [
                 Label(name="Start"),
                 LoadIntConst(value=2, dest=IRVar(name="v0")),
-                Copy(source=IRVar(name="v0"), dest=IRVar(name="v1")),
-                LoadIntConst(value=2, dest=IRVar(name="v2")),
+                LoadIntConst(value=2, dest=IRVar(name="v1")),
                 Call(
                     fun=IRVar(name="/"),
-                    args=[IRVar(name="v1"), IRVar(name="v2")],
-                    dest=IRVar(name="v3"),
+                    args=[IRVar(name="v0"), IRVar(name="v1")],
+                    dest=IRVar(name="v2"),
                 ),
                 Call(
                     fun=IRVar(name="print_int"),
-                    args=[IRVar(name="v3")],
-                    dest=IRVar(name="v4"),
+                    args=[IRVar(name="v2")],
+                    dest=IRVar(name="v3"),
                 ),
                 Return(),
             ],
@@ -266,7 +249,6 @@ def cases() -> list[tuple[str, list[Instruction]]]:
                 ),
                 Label(name="L1"),
                 LoadIntConst(value=1, dest=IRVar(name="v1")),
-                Copy(IRVar(name="v1"), IRVar(name="v2")),
                 Jump(label=Label(name="L0")),
                 Label(name="L2"),
                 Return(),
@@ -277,22 +259,42 @@ def cases() -> list[tuple[str, list[Instruction]]]:
             [
                 Label(name="Start"),
                 LoadIntConst(value=1, dest=IRVar(name="v0")),
-                Copy(IRVar(name="v0"), IRVar(name="v1")),
                 Label(name="L0"),
-                LoadBoolConst(value=True, dest=IRVar(name="v2")),
+                LoadBoolConst(value=True, dest=IRVar(name="v1")),
                 CondJump(
-                    cond=IRVar(name="v2"),
+                    cond=IRVar(name="v1"),
                     then_label=Label(name="L1"),
                     else_label=Label(name="L2"),
                 ),
                 Label(name="L1"),
-                LoadIntConst(value=1, dest=IRVar(name="v3")),
-                Copy(IRVar(name="v3"), IRVar(name="v1")),
+                LoadIntConst(value=1, dest=IRVar(name="v0")),
                 Jump(label=Label(name="L0")),
                 Label(name="L2"),
                 Return(),
             ],
         ),
+        (
+            "var a = 1; a = a + 1",
+            [
+                Label(name="Start"),
+                LoadIntConst(1, IRVar("v0")),
+                LoadIntConst(1, IRVar("v1")),
+                Call(IRVar("+"), [IRVar("v0"), IRVar("v1")], IRVar("v0")),
+                Call(IRVar("print_int"), [IRVar("v0")], IRVar("v2")),
+                Return(),
+            ],
+        ),
+        (
+            "var a = 1; var b = (a = 2); b",
+            [
+                Label(name="Start"),
+                LoadIntConst(1, IRVar("v0")),
+                LoadIntConst(2, IRVar("v0")),
+                Copy(IRVar("v0"), IRVar("v1")),
+                Call(IRVar("print_int"), [IRVar("v1")], IRVar("v2")),
+                Return(),
+            ],
+        ),
         (
             "while true do { if true then break else continue }",
             [
@@ -313,11 +315,9 @@ def cases() -> list[tuple[str, list[Instruction]]]:
                 ),
                 Label(name="L3"),
                 Jump(label=Label(name="L2")),
-                Copy(source=IRVar(name="unit"), dest=IRVar(name="v2")),
                 Jump(label=Label(name="L5")),
                 Label(name="L4"),
                 Jump(label=Label(name="L0")),
-                Copy(source=IRVar(name="unit"), dest=IRVar(name="v2")),
                 Label(name="L5"),
                 Jump(label=Label(name="L0")),
                 Label(name="L2"),
@@ -333,3 +333,17 @@ def test_generate_ir(test_input: str, expected: list[Instruction]) -> None:
     typecheck(node)
 
     assert generate_ir(builtin_types, node) == expected
+
+
+def test_generate_ir_deeply_nested() -> None:
+    depth = 100_000
+    expression = parse(Tokens(tokenize("1 + (" * depth + "1" + ")" * depth)))
+    typecheck(expression)
+
+    instructions = generate_ir(builtin_types, expression)
+
+    # A constant per operand and a call per operator, then print_int
+    assert len(instructions) == 2 + (depth + 1) + depth + 1
+    assert instructions[-2] == Call(
+        IRVar("print_int"), [IRVar(f"v{2 * depth}")], IRVar(f"v{2 * depth + 1}")
+    )
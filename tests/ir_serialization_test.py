@@ -0,0 +1,144 @@
+import pytest
+
+import compiler.ir as ir
+from compiler.assembly_generator import generate_assembly
+from compiler.builtin_type import builtin_types
+from compiler.compact_ir import CompactIr
+from compiler.ir_generator import generate_ir
+from compiler.ir_serialization import (
+    dump_binary_ir,
+    format_ir,
+    is_binary_ir,
+    load_binary_ir,
+    parse_ir,
+)
+from compiler.parser import parse
+from compiler.token import Tokens
+from compiler.tokenizer import tokenize
+from compiler.type_checker import typecheck
+
+
+def cases() -> list[str]:
+    return [
+        "1",
+        "-1 + 2 * 3",
+        "if 1 < 2 then 3",
+        "if not true then 1 else 2",
+        "print_int(1); print_bool(true); read_int()",
+        "{ var a: Int = 1; const b = 2; a = a + 1 }",
+        "var c: Bool = true; c or false and c",
+        "while true do { if true then break else continue }",
+        "var big = 18446744073709551616; big",
+        "var small = -9223372036854775808; small",
+    ]
+
+
+def instructions_of(source_code: str) -> list[ir.Instruction]:
+    expression = parse(Tokens(tokenize(source_code)))
+    typecheck(expression)
+    return generate_ir(builtin_types, expression)
+
+
+@pytest.mark.parametrize("source_code", cases())
+def test_text_round_trip(source_code: str) -> None:
+    instructions = instructions_of(source_code)
+
+    assert parse_ir(format_ir(instructions)) == instructions
+
+
+@pytest.mark.parametrize("source_code", cases())
+def test_binary_round_trip(source_code: str) -> None:
+    instructions = instructions_of(source_code)
+    data = dump_binary_ir(CompactIr(instructions))
+    code = load_binary_ir(data)
+
+    assert is_binary_ir(data)
+    assert code.instructions() == instructions
+    assert generate_assembly(code) == generate_assembly(instructions)
+
+
+def test_empty() -> None:
+    assert parse_ir("") == []
+    assert load_binary_ir(dump_binary_ir(CompactIr())).instructions() == []
+
+
+def test_parse_ir() -> None:
+    text = """
+        # A comment
+        Label(Start)
+        LoadIntConst(-1, x)
+
+        LoadBoolConst(False, y)
+        Copy(x, z)
+        Call(read_int, [], v)
+        Call(+, [x, v], w)
+        CondJump(y, Label(Start), Label(End))
+        Jump(Label(End))
+        Label(End)
+        Return()
+    """
+
+    assert parse_ir(text) == [
+        ir.Label("Start"),
+        ir.LoadIntConst(-1, ir.IRVar("x")),
+        ir.LoadBoolConst(False, ir.IRVar("y")),
+        ir.Copy(ir.IRVar("x"), ir.IRVar("z")),
+        ir.Call(ir.IRVar("read_int"), [], ir.IRVar("v")),
+        ir.Call(ir.IRVar("+"), [ir.IRVar("x"), ir.IRVar("v")], ir.IRVar("w")),
+        ir.CondJump(ir.IRVar("y"), ir.Label("Start"), ir.Label("End")),
+        ir.Jump(ir.Label("End")),
+        ir.Label("End"),
+        ir.Return(),
+    ]
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "Nop()",
+        "LoadIntConst(one, x)",
+        "LoadIntConst(1)",
+        "LoadBoolConst(yes, x)",
+        "Copy(x)",
+        "Call(f, x, y)",
+        "Jump(End)",
+        "Return(x)",
+        "Label(Start",
+    ],
+)
+def test_parse_ir_error(line: str) -> None:
+    with pytest.raises(ValueError, match=r"^Line 2: invalid instruction"):
+        parse_ir(f"Label(Start)\n{line}\n")
+
+
+def test_load_binary_ir_error() -> None:
+    data = dump_binary_ir(CompactIr(instructions_of("1 + 2")))
+
+    with pytest.raises(ValueError, match="Not binary IR"):
+        load_binary_ir(b"XXXX" + data[4:])
+
+    with pytest.raises(ValueError, match="wrong size"):
+        load_binary_ir(data + b"\0")
+
+    with pytest.raises(ValueError, match="truncated"):
+        load_binary_ir(data[:10])
+
+
+@pytest.mark.parametrize(
+    "column,index,value",
+    [
+        ("opcodes", 1, 9),
+        ("dests", 1, 100),
+        ("a", 0, -1),
+        ("a", 3, 100),
+        ("b", 3, 100),
+        ("args", 0, 100),
+    ],
+)
+def test_load_binary_ir_invalid_id(column: str, index: int, value: int) -> None:
+    """A corrupted opcode or id is reported, not found when reading it."""
+    code = CompactIr(instructions_of("1 + 2"))
+    getattr(code, column)[index] = value
+
+    with pytest.raises(ValueError, match="invalid"):
+        load_binary_ir(dump_binary_ir(code))
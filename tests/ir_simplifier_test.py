@@ -0,0 +1,269 @@
+import os
+import pathlib
+import subprocess
+
+import pytest
+
+from compiler.assembler import assemble
+from compiler.assembly_generator import generate_assembly
+from compiler.builtin_type import builtin_types
+from compiler.ir import Instruction
+from compiler.ir_generator import generate_ir
+from compiler.ir_serialization import format_ir, parse_ir
+from compiler.ir_simplifier import simplify_ir
+from compiler.parser import parse
+from compiler.token import Tokens
+from compiler.tokenizer import tokenize
+from compiler.type_checker import typecheck
+
+
+def instructions_of(source_code: str) -> list[Instruction]:
+    expression = parse(Tokens(tokenize(source_code)))
+    typecheck(expression)
+    return generate_ir(builtin_types, expression)
+
+
+def simplified(ir_text: str) -> str:
+    return format_ir(simplify_ir(parse_ir(ir_text)).instructions)
+
+
+def program(body: str) -> str:
+    """IR that reads `x` and prints `y`, so both stay in the result."""
+    return f"""
+        Call(read_int, [], x)
+        {body}
+        Call(print_int, [y], u)
+    """
+
+
+@pytest.mark.parametrize(
+    "body,rule",
+    [
+        ("LoadIntConst(0, z)\nCall(+, [x, z], y)", "add_zero"),
+        ("LoadIntConst(0, z)\nCall(+, [z, x], y)", "add_zero"),
+        ("LoadIntConst(0, z)\nCall(-, [x, z], y)", "subtract_zero"),
+        ("LoadIntConst(1, z)\nCall(*, [z, x], y)", "multiply_one"),
+        ("Call(unary_-, [x], z)\nCall(unary_-, [z], y)", "double_negation"),
+    ],
+)
+def test_identity(body: str, rule: str) -> None:
+    """The result becomes a copy of x, which is then propagated."""
+    result = simplify_ir(parse_ir(program(body)))
+
+    assert format_ir(result.instructions) == format_ir(
+        parse_ir("Call(read_int, [], x)\nCall(print_int, [x], u)")
+    )
+    assert result.rule_hits[rule] == 1
+    assert result.rule_hits["copy_propagation"] == 1
+
+
+@pytest.mark.parametrize(
+    "body,value",
+    [
+        ("LoadIntConst(0, z)\nCall(*, [x, z], y)", "0"),
+        ("Call(-, [x, x], y)", "0"),
+        ("LoadIntConst(2, z)\nLoadIntConst(3, w)\nCall(*, [z, w], y)", "6"),
+        ("LoadIntConst(2, z)\nCall(unary_-, [z], y)", "-2"),
+    ],
+)
+def test_known_int(body: str, value: str) -> None:
+    assert simplified(program(body)) == simplified(program(f"LoadIntConst({value}, y)"))
+
+
+@pytest.mark.parametrize(
+    "op,value",
+    [("==", True), ("<=", True), (">=", True), ("!=", False), ("<", False)],
+)
+def test_compare_self(op: str, value: bool) -> None:
+    ir_text = f"""
+        Call(read_int, [], x)
+        Call({op}, [x, x], y)
+        Call(print_bool, [y], u)
+    """
+
+    assert simplified(ir_text) == format_ir(
+        parse_ir(
+            f"""
+                Call(read_int, [], x)
+                LoadBoolConst({value}, y)
+                Call(print_bool, [y], u)
+            """
+        )
+    )
+
+
+def test_double_not() -> None:
+    ir_text = """
+        Call(read_int, [], x)
+        LoadIntConst(0, z)
+        Call(<, [x, z], b)
+        Call(unary_not, [b], c)
+        Call(unary_not, [c], d)
+        Call(print_bool, [d], u)
+    """
+    result = simplify_ir(parse_ir(ir_text))
+
+    assert result.rule_hits["double_not"] == 1
+    assert format_ir(result.instructions) == format_ir(
+        parse_ir(
+            """
+                Call(read_int, [], x)
+                LoadIntConst(0, z)
+                Call(<, [x, z], b)
+                Call(print_bool, [b], u)
+            """
+        )
+    )
+
+
+def test_reassociate_to_fixed_point() -> None:
+    """((x + 1) + 2) - 3 needs several passes to become x + 0 and then x."""
+    ir_text = program(
+        """
+        LoadIntConst(1, c1)
+        Call(+, [x, c1], t1)
+        LoadIntConst(2, c2)
+        Call(+, [t1, c2], t2)
+        LoadIntConst(3, c3)
+        Call(-, [t2, c3], y)
+        """
+    )
+    result = simplify_ir(parse_ir(ir_text))
+
+    assert format_ir(result.instructions) == format_ir(
+        parse_ir("Call(read_int, [], x)\nCall(print_int, [x], u)")
+    )
+    assert result.rule_hits["reassociate"] == 3
+    assert result.rule_hits["add_zero"] == 1
+    assert result.passes > 2
+
+
+def test_reassociate_multiply() -> None:
+    ir_text = program(
+        """
+        LoadIntConst(4611686018427387904, c1)
+        Call(*, [c1, x], t)
+        LoadIntConst(2, c2)
+        Call(*, [t, c2], y)
+        """
+    )
+
+    # The product of the constants wraps around to -2**63
+    assert simplified(ir_text) == format_ir(
+        parse_ir(
+            program(
+                """
+                LoadIntConst(-9223372036854775808, s0)
+                Call(*, [x, s0], y)
+                """
+            )
+        )
+    )
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        # The inner sum is used twice
+        """
+        LoadIntConst(1, c1)
+        Call(+, [x, c1], t)
+        LoadIntConst(2, c2)
+        Call(+, [t, c2], y)
+        Call(print_int, [t], w)
+        """,
+        # x changes between the sums
+        """
+        LoadIntConst(1, c1)
+        Call(+, [x, c1], t)
+        Call(read_int, [], x)
+        LoadIntConst(2, c2)
+        Call(+, [t, c2], y)
+        """,
+        # The sums are in different basic blocks
+        """
+        LoadIntConst(1, c1)
+        Call(+, [x, c1], t)
+        Label(L0)
+        LoadIntConst(2, c2)
+        Call(+, [t, c2], y)
+        """,
+        # Mixed operators
+        """
+        LoadIntConst(1, c1)
+        Call(+, [x, c1], t)
+        LoadIntConst(2, c2)
+        Call(*, [t, c2], y)
+        """,
+    ],
+)
+def test_not_reassociated(body: str) -> None:
+    assert simplify_ir(parse_ir(program(body))).rule_hits["reassociate"] == 0
+
+
+def test_effects_kept() -> None:
+    """Calls with effects and divisions that could fault are not removed,
+    even if their results are unused."""
+    ir_text = """
+        Call(read_int, [], x)
+        LoadIntConst(0, z)
+        Call(/, [x, z], y)
+        Call(print_int, [x], u)
+        Return()
+    """
+
+    assert simplified(ir_text) == format_ir(parse_ir(ir_text))
+
+
+def test_multiply_assigned_constant_not_used() -> None:
+    """A variable with several values is not a known constant."""
+    ir_text = """
+        LoadIntConst(0, z)
+        Label(L0)
+        Call(read_int, [], x)
+        Call(+, [x, z], y)
+        Call(print_int, [y], u)
+        LoadIntConst(1, z)
+        Jump(Label(L0))
+    """
+
+    assert simplified(ir_text) == format_ir(parse_ir(ir_text))
+
+
+@pytest.mark.parametrize(
+    "source_code",
+    [
+        "var x = read_int(); print_int(x + 0 + 1 + 2 - 3); print_bool(x == x)",
+        "var x = read_int(); print_int(- - x * 1); print_int(x * 0 + x - x)",
+        "var a = read_int(); var b = not not (a < 3); if b then a * 2 else a - a",
+        "var s = 0; var i = 0; while i < 10 do { s = s + i + 1 + 2; i = i + 1 } s",
+        "9223372036854775807 + 1 + 1",
+        "var x = 1; var y = x; x = 2; y",
+    ],
+)
+def test_compiled_output(source_code: str) -> None:
+    """The simplified program prints what the original one does."""
+    instructions = instructions_of(source_code)
+    outputs = []
+
+    for code in [instructions, simplify_ir(instructions).instructions]:
+        program_path = os.path.realpath("compiled_program_ir_simplifier_test")
+        assemble(generate_assembly(code), program_path)
+
+        result = subprocess.run(
+            program_path, input=b"5\n", stdout=subprocess.PIPE, check=True
+        )
+        pathlib.Path.unlink(pathlib.Path(program_path))
+        outputs.append(result.stdout)
+
+    assert outputs[0] == outputs[1]
+
+
+def test_ir_shrinks() -> None:
+    instructions = instructions_of("var x = read_int(); x * 1 + 0 + 1 + 2")
+    result = simplify_ir(instructions)
+
+    assert len(result.instructions) < len(instructions)
+    assert simplify_ir(result.instructions).rule_hits == {
+        name: 0 for name in result.rule_hits
+    }
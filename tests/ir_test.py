@@ -0,0 +1,55 @@
+import pytest
+
+from compiler.ir import IRVar, SymTab
+
+
+@pytest.mark.parametrize("cached", [False, True])
+def test_symtab(cached: bool) -> None:
+    root = SymTab([("a", IRVar("a")), ("b", IRVar("b"))], cached=cached)
+    child = SymTab(parent=root)
+    child.add_local("a", IRVar("x1"))
+    grandchild = SymTab(parent=child)
+
+    assert grandchild.require("a") == IRVar("x1")
+    assert grandchild.require("b") == IRVar("b")
+    assert grandchild.find("c") is None
+    assert root.require("a") == IRVar("a")
+
+    with pytest.raises(Exception):
+        grandchild.require("c")
+
+    with pytest.raises(Exception):
+        child.add_local("a", IRVar("x2"))
+
+
+def test_symtab_cached_shadowing() -> None:
+    root = SymTab([("a", IRVar("a"))], cached=True)
+    child = SymTab(parent=root)
+    grandchild = SymTab(parent=child)
+    assert grandchild.require("a") == IRVar("a")
+
+    # The grandchild remembers `a` of the root until it is shadowed
+    child.add_local("a", IRVar("x1"))
+    assert grandchild.require("a") == IRVar("x1")
+
+
+def test_symtab_cached_child_of_uncached_scope() -> None:
+    root = SymTab([("a", IRVar("a"))])
+    child = SymTab(parent=root)
+    grandchild = SymTab(parent=child, cached=True)
+    assert grandchild.require("a") == IRVar("a")
+
+    # An uncached scope that shadows `a` makes the grandchild forget it too
+    child.add_local("a", IRVar("x1"))
+    assert grandchild.require("a") == IRVar("x1")
+
+
+def test_symtab_deeply_nested() -> None:
+    root = SymTab([("a", IRVar("a"))], cached=True)
+    symtab = root
+
+    for i in range(100_000):
+        symtab = SymTab([(f"v{i}", IRVar(f"x{i}"))], parent=symtab)
+
+    assert symtab.require("a") == IRVar("a")
+    assert symtab.require("v0") == IRVar("x0")
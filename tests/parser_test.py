@@ -16,9 +16,11 @@ from compiler.ast import (
     WhileExpression,
     ContinueExpression,
     BreakExpression,
+    ErrorExpression,
 )
 from compiler.parser import parse
 from compiler.parser_exception import (
+    Diagnostic,
     EndOfInputException,
     VariableCannotBeDeclaredException,
     MissingSemicolonException,
@@ -26,8 +28,8 @@ from compiler.parser_exception import (
     WrongTokenException,
     WrongScopeException,
 )
-from compiler.token import Tokens
-from compiler.tokenizer import tokenize
+from compiler.token import StreamingTokens, Tokens
+from compiler.tokenizer import tokenize, tokenize_stream
 
 
 def cases() -> list[tuple[str, Expression]]:
@@ -191,6 +193,39 @@ def cases() -> list[tuple[str, Expression]]:
                 ),
             ),
         ),
+        (
+            "a or b = c and d",
+            BinaryOp(
+                left=BinaryOp(
+                    left=Identifier(name="a"), op="or", right=Identifier(name="b")
+                ),
+                op="=",
+                right=BinaryOp(
+                    left=Identifier(name="c"), op="and", right=Identifier(name="d")
+                ),
+            ),
+        ),
+        (
+            "a - b - c * d",
+            BinaryOp(
+                left=BinaryOp(
+                    left=Identifier(name="a"), op="-", right=Identifier(name="b")
+                ),
+                op="-",
+                right=BinaryOp(
+                    left=Identifier(name="c"), op="*", right=Identifier(name="d")
+                ),
+            ),
+        ),
+        (
+            "a = 1; b",
+            BlockExpression(
+                expressions=[
+                    BinaryOp(left=Identifier(name="a"), op="=", right=Literal(value=1))
+                ],
+                result=Identifier(name="b"),
+            ),
+        ),
         (
             "var x = 1234;",
             BlockExpression(
@@ -645,6 +680,12 @@ def test_parse(test_input: str, expected: Expression) -> None:
     assert result == expected
 
 
+@pytest.mark.parametrize("test_input,expected", cases())
+def test_parse_streaming(test_input: str, expected: Expression) -> None:
+    result = parse(StreamingTokens(tokenize_stream(test_input)))
+    assert result == expected
+
+
 def error_cases() -> list[tuple[str, Type[Exception]]]:
     return [
         ("a + b c", EndOfInputException),
@@ -667,3 +708,127 @@ def test_parse_error(test_input: str, expected_exception: Type[Exception]) -> No
         parse(Tokens(tokens=tokenize(test_input)))
 
     assert e.type is expected_exception
+
+
+@pytest.mark.parametrize("test_input,expected_exception", error_cases())
+def test_parse_streaming_error(
+    test_input: str, expected_exception: Type[Exception]
+) -> None:
+    with pytest.raises(Exception) as e:
+        parse(StreamingTokens(tokenize_stream(test_input)))
+
+    assert e.type is expected_exception
+
+
+@pytest.mark.parametrize("test_input,expected", cases())
+def test_parse_recovering_without_errors(test_input: str, expected: Expression) -> None:
+    diagnostics: list[Diagnostic] = []
+    result = parse(Tokens(tokenize(test_input)), diagnostics=diagnostics)
+
+    assert result == expected
+    assert diagnostics == []
+
+
+@pytest.mark.parametrize(
+    "test_input,expected_errors",
+    [
+        ("a + b c", [(0, 7, EndOfInputException)]),
+        ("{ a b }", [(0, 5, MissingSemicolonException)]),
+        ("{ 1 + ", [(0, 5, WrongTokenException)]),
+        ("{ { { 1", [(0, 7, MissingSemicolonException)]),
+        (
+            "var x = ; var y = 1 + ; z",
+            [(0, 9, WrongTokenException), (0, 23, WrongTokenException)],
+        ),
+        ("a; }; b +;", [(0, 4, WrongTokenException), (0, 10, WrongTokenException)]),
+        (
+            "var a = 1;\nbreak;\n{ x = ; y }\n1 +* 2;\nf(a, ;",
+            [
+                (1, 1, WrongScopeException),
+                (2, 7, WrongTokenException),
+                (3, 4, WrongTokenException),
+                (4, 6, WrongTokenException),
+            ],
+        ),
+    ],
+)
+def test_parse_recovering(
+    test_input: str, expected_errors: list[tuple[int, int, Type[Exception]]]
+) -> None:
+    diagnostics: list[Diagnostic] = []
+    parse(Tokens(tokenize(test_input)), diagnostics=diagnostics)
+
+    assert [
+        (d.location.line, d.location.column, type(d.error))
+        for d in diagnostics
+        if d.location is not None
+    ] == expected_errors
+
+
+def test_parse_recovering_error_nodes() -> None:
+    diagnostics: list[Diagnostic] = []
+    result = parse(
+        Tokens(tokenize("a = 1; b = ; { c = ; d }")), diagnostics=diagnostics
+    )
+
+    assert result == BlockExpression(
+        expressions=[
+            BinaryOp(left=Identifier(name="a"), op="=", right=Literal(value=1)),
+            ErrorExpression(),
+            BlockExpression(expressions=[ErrorExpression()], result=Identifier("d")),
+        ],
+    )
+    assert len(diagnostics) == 2
+
+
+def test_parse_recovering_reports_every_error() -> None:
+    lines = 10_000
+    source_code = "\n".join(
+        "var x = 1 + ;" if i % 10 == 0 else f"x = x + {i};" for i in range(lines)
+    )
+
+    diagnostics: list[Diagnostic] = []
+    parse(StreamingTokens(tokenize_stream(source_code)), diagnostics=diagnostics)
+
+    assert [d.location.line for d in diagnostics if d.location is not None] == list(
+        range(0, lines, 10)
+    )
+
+
+depth = 100_000
+
+
+@pytest.mark.parametrize(
+    "test_input, node_type",
+    [
+        ("1 + (" * depth + "1" + ")" * depth, BinaryOp),
+        ("{" * depth + "1" + "}" * depth, BlockExpression),
+        ("if true then " * depth + "1", IfExpression),
+        ("-" * depth + "1", BinaryOp),
+        ("f(" * depth + ")" * depth, FunctionExpression),
+    ],
+)
+def test_parse_deeply_nested(test_input: str, node_type: type[Expression]) -> None:
+    expression = parse(Tokens(tokenize(test_input)))
+    nesting = 0
+
+    while isinstance(expression, node_type):
+        match expression:
+            case BinaryOp():
+                expression = expression.right
+            case BlockExpression():
+                expression = expression.result
+            case IfExpression():
+                expression = expression.then_clause
+            case FunctionExpression():
+                expression = (
+                    expression.arguments[0] if expression.arguments else Literal(None)
+                )
+        nesting += 1
+
+    assert nesting == depth
+
+
+def test_parse_deeply_nested_error() -> None:
+    with pytest.raises(MissingSemicolonException):
+        parse(Tokens(tokenize("{" * depth + "1" + "}" * (depth - 1))))
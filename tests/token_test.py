@@ -0,0 +1,72 @@
+import pytest
+
+from compiler.location import L, Location
+from compiler.token import StreamingTokens, Token, TokenBuffer, Tokens, TokenType
+from compiler.tokenizer import tokenize, tokenize_stream
+
+
+def test_token_buffer() -> None:
+    tokens = tokenize("var a = a + 1 // a")
+
+    assert len(tokens) == 7
+    assert tokens.text_ids[1] == tokens.text_ids[3]
+    assert tokens[-1].text == "// a"
+    assert tokens[1:3] == [
+        Token(TokenType.IDENTIFIER, "a", L),
+        Token(TokenType.OPERATOR, "=", L),
+    ]
+
+    with pytest.raises(IndexError):
+        tokens[7]
+
+
+def test_token_buffer_large_offsets() -> None:
+    chunk = tokenize("a + 1")
+    tokens = TokenBuffer("")
+    tokens.extend(
+        chunk.kinds, chunk.starts, chunk.ends, chunk.text_ids, chunk.texts, 2**32
+    )
+
+    assert list(tokens.starts) == [2**32, 2**32 + 2, 2**32 + 4]
+    assert list(tokens.ends) == [2**32 + 1, 2**32 + 3, 2**32 + 5]
+
+
+def test_token_slots() -> None:
+    token = Token(TokenType.IDENTIFIER, "a", Location("", 0, 1))
+
+    assert not hasattr(token, "__dict__")
+    assert not hasattr(token.location, "__dict__")
+    assert token == Token(TokenType.IDENTIFIER, "a", L)
+    assert token != Token(TokenType.IDENTIFIER, "a", Location("", 0, 1))
+
+
+def test_tokens_end() -> None:
+    tokens = Tokens(tokenize("a"))
+
+    assert tokens.consume().text == "a"
+    assert tokens.peek() is tokens.next_token()
+    assert tokens.peek().type == TokenType.END
+    location = tokens.peek().location
+    assert location is not None and location.column == 1
+
+
+def test_tokens_consume_expected() -> None:
+    tokens = Tokens(tokenize("if a"))
+
+    assert tokens.consume({"if", "while"}).text == "if"
+
+    with pytest.raises(Exception, match='expected one of: "\\(", "{"'):
+        tokens.consume({"{", "("})
+
+
+def test_streaming_tokens() -> None:
+    tokens = StreamingTokens(tokenize_stream("a b"))
+
+    assert not tokens.empty()
+    assert tokens.next_token().text == "b"
+    assert tokens.consume().text == "a"
+    assert tokens.consume().text == "b"
+    assert tokens.prev_token().text == "b"
+    assert tokens.peek().type == TokenType.END
+    assert tokens.peek().location is tokens.prev_token().location
+    assert StreamingTokens(tokenize_stream("  ")).empty()
@@ -1,8 +1,13 @@
+import mmap
+import pathlib
+from collections.abc import Iterable, Sequence
+
 import pytest
 
 from compiler.location import L
 from compiler.token import Token, TokenType
-from compiler.tokenizer import tokenize
+from compiler import tokenizer
+from compiler.tokenizer import tokenize, tokenize_parallel, tokenize_stream
 
 
 def cases() -> list[tuple[str, list[Token]]]:
@@ -91,6 +96,15 @@ comment. */""",
                 Token(text=";", type=TokenType.PUNCTUATION, location=L),
             ],
         ),
+        (
+            "Integer trueish Int falsey",
+            [
+                Token(text="Integer", type=TokenType.IDENTIFIER, location=L),
+                Token(text="trueish", type=TokenType.IDENTIFIER, location=L),
+                Token(text="Int", type=TokenType.TYPE, location=L),
+                Token(text="falsey", type=TokenType.IDENTIFIER, location=L),
+            ],
+        ),
     ]
 
 
@@ -99,3 +113,105 @@ def test_tokenize(test_input: str, expected: list[Token]) -> None:
     got = tokenize(test_input)
 
     assert got == expected
+
+
+@pytest.mark.parametrize("test_input,expected", cases())
+def test_tokenize_bytes(test_input: str, expected: list[Token]) -> None:
+    assert tokenize(test_input.encode()) == expected
+
+
+def test_tokenize_mmap(tmp_path: pathlib.Path) -> None:
+    source_file = tmp_path / "program.src"
+    source_file.write_text("var a = 1;\n/* é */ a")
+
+    with open(source_file, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as source_code:
+            got = [(t.type, t.text) for t in tokenize_stream(source_code)]
+
+    assert got == [(t.type, t.text) for t in tokenize("var a = 1;\n/* é */ a")]
+
+
+def test_tokenize_bytes_location(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Columns count characters, not bytes, in every path."""
+    source_code = "/* é */ a + /* ü€ */ 1\n# ñ\nb /* 😀 */ c\n" * 2
+    source_file = tmp_path / "program.src"
+    source_file.write_text(source_code)
+
+    def described(tokens: Iterable[Token]) -> list[tuple[str, int, int]]:
+        return [
+            (t.text, t.location.line, t.location.column) for t in tokens if t.location
+        ]
+
+    expected = described(tokenize(source_code))
+    assert described(tokenize(source_code.encode())) == expected
+
+    with open(source_file, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            assert described(tokenize_stream(mapped)) == expected
+            monkeypatch.setattr(tokenizer, "parallel_threshold", 0)
+            assert described(tokenize_parallel(mapped, 2)) == expected
+
+    with pytest.raises(Exception, match="column=11"):
+        tokenize("/* é */ a $".encode())
+
+
+@pytest.mark.parametrize("test_input,expected", cases())
+def test_tokenize_stream(test_input: str, expected: list[Token]) -> None:
+    assert list(tokenize_stream(test_input)) == expected
+
+
+def test_tokenize_error() -> None:
+    with pytest.raises(Exception, match="wrong source code"):
+        tokenize("1 + $")
+
+
+def test_tokenize_parallel(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(tokenizer, "parallel_threshold", 0)
+    source_code = "var a = 1;\n/* b\n\n c */ a\n# /*\nprint_int(a);\n" * 20
+
+    def described(tokens: Sequence[Token]) -> list[tuple[TokenType, str, int, int]]:
+        return [
+            (t.type, t.text, t.location.line, t.location.column)
+            for t in tokens
+            if t.location
+        ]
+
+    assert described(tokenize_parallel(source_code, 3)) == described(
+        tokenize(source_code)
+    )
+
+    with pytest.raises(Exception, match="line=120"):
+        tokenize_parallel(source_code + "$", 3)
+
+
+@pytest.mark.parametrize("jobs", range(2, 9))
+def test_tokenize_parallel_adjacent_block_comments(
+    monkeypatch: pytest.MonkeyPatch, jobs: int
+) -> None:
+    """A chunk does not start in a comment after the one it was moved past."""
+    monkeypatch.setattr(tokenizer, "parallel_threshold", 0)
+    source_code = "/* a\nb */ /* z\nw */ /* y\nv */ 1\n" * 2
+
+    assert [t.text for t in tokenize_parallel(source_code, jobs)] == [
+        t.text for t in tokenize(source_code)
+    ]
+
+
+def test_tokenize_location() -> None:
+    got = tokenize("var a = 1;\n  /* x\n y */ a +\n\nb")
+
+    assert [
+        (t.text, t.location.line, t.location.column) for t in got if t.location
+    ] == [
+        ("var", 0, 1),
+        ("a", 0, 5),
+        ("=", 0, 7),
+        ("1", 0, 9),
+        (";", 0, 10),
+        ("/* x\n y */", 1, 3),
+        ("a", 2, 7),
+        ("+", 2, 9),
+        ("b", 4, 1),
+    ]
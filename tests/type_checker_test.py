@@ -2,11 +2,13 @@ import typing
 
 import pytest
 
+from compiler.builtin_type import builtin_signatures, builtin_types, register_builtin
+from compiler.ir import IRVar
 from compiler.parser import parse
 from compiler.token import Tokens
 from compiler.tokenizer import tokenize
 from compiler.type import Int, Bool, Type, Unit, ConstInt, ConstBool
-from compiler.type_checker import typecheck
+from compiler.type_checker import TypeEnvironment, typecheck
 from compiler.type_checker_exception import (
     IncompatibleTypeException,
     UnknownTypeException,
@@ -38,6 +40,12 @@ def cases() -> list[tuple[str, Type]]:
         ("var a = -1", Int),
         ("var a = -true; a", Bool),
         ("var a = not true; a", Bool),
+        ("var a = 1; if { var a = true; a } then a else 2", Int),
+        ("var a = 1; { var a = true; }; a", Int),
+        ("var a = 1; { var a = true; { var a = 2; } a = false; }; a + 1", Int),
+        ("var a = 1; { a = 2; }; a", Int),
+        ("var a = 1; const b = 2; a = b", Int),
+        ("const a = 1; const b = a; b", ConstInt),
         ("while true do { 1 }", Unit),
         ("read_int()", Int),
         ("const a = 1", ConstInt),
@@ -75,6 +83,12 @@ def error_cases() -> list[tuple[str, typing.Type[Exception]]]:
         ("const a = 1; a = 2", IncompatibleTypeException),
         ("const a = 1; a = 1", IncompatibleTypeException),
         ("const a = false; a = true", IncompatibleTypeException),
+        ("const a = 1; a + 1", IncompatibleTypeException),
+        ("{ var a = 1; }; a", UnknownIdentifierException),
+        ("{ var a = 1; { var b = a; } b }", UnknownIdentifierException),
+        ("var a = 1; { var a = true; }; a = false", IncompatibleTypeException),
+        ("while true do { var a = 1; }; a", UnknownIdentifierException),
+        ("const a = 1; print_int(a)", IncompatibleTypeException),
     ]
 
 
@@ -84,3 +98,84 @@ def test_typecheck_error(
 ) -> None:
     with pytest.raises(expected_exception):
         typecheck(parse(Tokens(tokenize(test_input))))
+
+
+def test_typecheck_error_message() -> None:
+    with pytest.raises(IncompatibleTypeException) as error:
+        typecheck(parse(Tokens(tokenize("true - false"))))
+
+    assert str(error.value) == (
+        "Incompatible types. Expect [PrimitiveType(name='Int'), "
+        "PrimitiveType(name='Int')], got: [PrimitiveType(name='Bool'), "
+        "PrimitiveType(name='Bool')]"
+    )
+
+
+def test_type_environment() -> None:
+    environment = TypeEnvironment({"a": Int})
+
+    environment.enter_scope()
+    environment.declare("a", Bool)
+    environment.declare("b", Int)
+    environment.enter_scope()
+    environment.declare("a", Unit)
+    assert environment.get("a") is Unit
+
+    environment.leave_scope()
+    assert environment.get("a") is Bool
+    assert environment.get("b") is Int
+
+    environment.leave_scope()
+    assert environment.types == {"a": Int}
+
+
+def test_typecheck_environment() -> None:
+    identifier_types: dict[str, Type] = {}
+    typecheck(parse(Tokens(tokenize("var a = 1"))), identifier_types)
+    assert identifier_types == {"a": Int}
+
+    with pytest.raises(IncompatibleTypeException):
+        typecheck(
+            parse(Tokens(tokenize("{ var b = 1; { var a = true; 1 + a } }"))),
+            identifier_types,
+        )
+
+    # The declarations in the blocks the error was in are out of scope
+    assert identifier_types == {"a": Int}
+
+    # Several top-level statements are a block too
+    typecheck(parse(Tokens(tokenize("var c = 1; var d = true"))), identifier_types)
+    assert identifier_types == {"a": Int}
+
+
+def test_register_builtin(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Removes the registration after the test
+    monkeypatch.setitem(builtin_types, IRVar("max"), Unit)
+    monkeypatch.setitem(builtin_signatures, "max", ((), Unit))
+
+    register_builtin("max", (Int, Int), Int)
+
+    assert builtin_types[IRVar("max")] is Int
+    assert typecheck(parse(Tokens(tokenize("max(1, 2)")))) is Int
+    with pytest.raises(IncompatibleTypeException):
+        typecheck(parse(Tokens(tokenize("max(1, true)"))))
+
+
+depth = 100_000
+
+
+@pytest.mark.parametrize(
+    "test_input, expected",
+    [
+        ("1 + (" * depth + "1" + ")" * depth, Int),
+        ("{" * depth + "true" + "}" * depth, Bool),
+        ("if true then " * depth + "1", Unit),
+    ],
+)
+def test_typecheck_deeply_nested(test_input: str, expected: Type) -> None:
+    assert typecheck(parse(Tokens(tokenize(test_input)))) is expected
+
+
+def test_typecheck_deeply_nested_error() -> None:
+    with pytest.raises(IncompatibleTypeException):
+        typecheck(parse(Tokens(tokenize("1 + (" * depth + "true" + ")" * depth))))
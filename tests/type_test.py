@@ -1,9 +1,27 @@
-import pytest
-
-from compiler.type import Int, ConstInt, ConstType, PrimitiveType
+from compiler.type import (
+    Bool,
+    ConstInt,
+    Int,
+    PrimitiveType,
+    base_types,
+    const_types,
+    primitive_type,
+)
 
 
 def test_type() -> None:
-    assert Int == ConstInt
+    assert Int != ConstInt
     assert ConstInt != Int
-    assert not ConstInt == Int
+    assert Int != PrimitiveType("Int")
+
+
+def test_primitive_type() -> None:
+    assert primitive_type("Int") is Int
+    assert primitive_type("Bool") is not Int
+
+
+def test_const_type() -> None:
+    assert const_types[Int] is ConstInt
+    assert const_types[ConstInt] is ConstInt
+    assert base_types[ConstInt] is Int
+    assert base_types[Bool] is Bool
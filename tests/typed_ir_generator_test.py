@@ -0,0 +1,97 @@
+import re
+
+import pytest
+
+from compiler.ast import Expression
+from compiler.builtin_type import builtin_types
+from compiler.ir_generator import generate_ir
+from compiler.parser import parse
+from compiler.token import Tokens
+from compiler.tokenizer import tokenize
+from compiler.type_checker import typecheck
+from compiler.type_checker_exception import (
+    IncompatibleTypeException,
+    UnknownIdentifierException,
+)
+from compiler.typed_ir_generator import typecheck_and_generate_ir
+
+
+def parse_source(source_code: str) -> Expression:
+    return parse(Tokens(tokenize(source_code)))
+
+
+def cases() -> list[str]:
+    return [
+        "var a = 1;",
+        "1 + 2 * 3",
+        "var a = false; true or { a = true; a }; print_bool(a);",
+        "var a = 1; false and { a = 2; a == 2 } print_int(a);",
+        "if 1 == 1 then 1",
+        "if 1 == 1 then 1 else 2",
+        "{ var a = 1; var b = 2; a = 3 }",
+        "if not true then -10 else 0",
+        "var a: Int = 1; while true do { a = 1 }",
+        "while true do { if true then break else continue }",
+        "const a = 1; var b: Bool = true; a",
+        "var x = { var a = 1; { var a = true; a } }; x",
+        "var n = read_int(); print_int(n % 2)",
+        "var u = { }; u",
+    ]
+
+
+@pytest.mark.parametrize("source_code", cases())
+def test_typecheck_and_generate_ir(source_code: str) -> None:
+    expected = parse_source(source_code)
+    expected_type = typecheck(expected)
+
+    expression = parse_source(source_code)
+
+    assert typecheck_and_generate_ir(builtin_types, expression) == generate_ir(
+        builtin_types, expected
+    )
+    assert expression.type == expected_type
+
+
+@pytest.mark.parametrize(
+    "source_code,exception",
+    [
+        ("a + 1", UnknownIdentifierException),
+        ("print_int", UnknownIdentifierException),
+        ("{ var a = 1; b = 2 }", UnknownIdentifierException),
+        ("if 1 then 2", IncompatibleTypeException),
+        ("while 1 do { 2 }", IncompatibleTypeException),
+        ("if true then 1 else false", IncompatibleTypeException),
+        ("var a: Bool = 1", IncompatibleTypeException),
+        ("var a = 1; a = true", IncompatibleTypeException),
+        ("1 + true", IncompatibleTypeException),
+        ("print_int(true)", IncompatibleTypeException),
+    ],
+)
+def test_typecheck_and_generate_ir_errors(
+    source_code: str, exception: type[Exception]
+) -> None:
+    with pytest.raises(exception):
+        typecheck_and_generate_ir(builtin_types, parse_source(source_code))
+
+
+@pytest.mark.parametrize("source_code", ["true = 1", "1 = 2", "{ } = 1"])
+def test_assignment_to_non_identifier(source_code: str) -> None:
+    """The fused pass reports the error of the separate passes."""
+    with pytest.raises(Exception) as expected:
+        expression = parse_source(source_code)
+        typecheck(expression)
+        generate_ir(builtin_types, expression)
+
+    with pytest.raises(expected.type, match=re.escape(str(expected.value))):
+        typecheck_and_generate_ir(builtin_types, parse_source(source_code))
+
+
+def test_typecheck_and_generate_ir_deeply_nested() -> None:
+    depth = 100_000
+    source_code = "1 + (" * depth + "1" + ")" * depth
+    expected = parse_source(source_code)
+    typecheck(expected)
+
+    assert typecheck_and_generate_ir(
+        builtin_types, parse_source(source_code)
+    ) == generate_ir(builtin_types, expected)